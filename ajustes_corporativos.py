@@ -0,0 +1,240 @@
+#!/usr/bin/env python3
+"""
+AJUSTES CORPORATIVOS LOCALES (dividendos y splits)
+
+Los descargadores guardan precios SIN ajustar (auto_adjust=False).
+Este módulo guarda los eventos corporativos de cada ticker y calcula
+las series ajustadas localmente, sin volver a descargar nada:
+
+  MERVAL_Eventos/[TICKER]_eventos.csv              → fecha, tipo, valor
+  MERVAL_Datos_Ajustados/[TICKER]_ajustado_5A.csv  → OHLCV ajustado + factores
+  MERVAL_Datos_Ajustados/estado_ajustes.json       → eventos ya aplicados
+
+Cuando llega un evento NUEVO solo se reescala la historia anterior a su
+fecha (precio × factor); las filas nuevas se agregan con factor 1.
+
+NOTA: Yahoo entrega OHLC ya ajustado por los splits ocurridos hasta el
+momento de la descarga. Por eso, al construir la serie desde cero los
+splits existentes se marcan como aplicados sin reescalar; solo los
+splits que aparecen DESPUÉS reescalan la historia guardada.
+
+EJECUTA:
+  python ajustes_corporativos.py                 # Actualiza con eventos nuevos
+  python ajustes_corporativos.py --reconstruir   # Recalcula todo desde cero (sin red)
+"""
+
+import argparse
+import json
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from perfilador import perfilador_desde_argv
+
+warnings.filterwarnings('ignore')
+
+DATA_DIR = Path("MERVAL_Datos_Limpio")
+EVENTOS_DIR = Path("MERVAL_Eventos")
+AJUSTADOS_DIR = Path("MERVAL_Datos_Ajustados")
+ESTADO_PATH = AJUSTADOS_DIR / "estado_ajustes.json"
+
+COLUMNAS_PRECIO = ['Open', 'High', 'Low', 'Close']
+COLUMNAS_EVENTOS = ['fecha', 'tipo', 'valor']
+
+
+def extraer_eventos(df_descarga):
+    """
+    Eventos de un DataFrame de yf.download(..., actions=True).
+    Devuelve DataFrame [fecha, tipo, valor] con tipo 'dividendo' o 'split'.
+    """
+    partes = []
+    for columna, tipo in (('Dividends', 'dividendo'), ('Stock Splits', 'split')):
+        if columna not in df_descarga.columns:
+            continue
+        serie = df_descarga[columna]
+        if isinstance(serie, pd.DataFrame):  # Columnas MultiIndex (yfinance 0.2.48+)
+            serie = serie.iloc[:, 0]
+        serie = pd.to_numeric(serie, errors='coerce')
+        serie = serie[serie > 0]
+        partes.append(pd.DataFrame({
+            'fecha': pd.to_datetime(serie.index).strftime('%Y-%m-%d'),
+            'tipo': tipo,
+            'valor': serie.to_numpy(dtype=float),
+        }))
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS_EVENTOS)
+    return pd.concat(partes, ignore_index=True)
+
+
+def cargar_eventos(ticker):
+    path = EVENTOS_DIR / f"{ticker}_eventos.csv"
+    if not path.exists():
+        return pd.DataFrame(columns=COLUMNAS_EVENTOS)
+    return pd.read_csv(path, dtype={'fecha': str, 'tipo': str, 'valor': float})
+
+
+def guardar_eventos(ticker, eventos_nuevos):
+    """Une los eventos descargados con los ya guardados (la ventana de 5 años se mueve)"""
+    EVENTOS_DIR.mkdir(exist_ok=True)
+    eventos = pd.concat([cargar_eventos(ticker), eventos_nuevos], ignore_index=True)
+    eventos = eventos.drop_duplicates(subset=['fecha', 'tipo'], keep='last')
+    eventos = eventos.sort_values(['fecha', 'tipo'], ignore_index=True)
+    eventos.to_csv(EVENTOS_DIR / f"{ticker}_eventos.csv", index=False)
+    return eventos
+
+
+def clave_evento(fecha, tipo):
+    return f"{fecha}|{tipo}"
+
+
+def cargar_estado():
+    if ESTADO_PATH.exists():
+        return json.loads(ESTADO_PATH.read_text(encoding='utf-8'))
+    return {}
+
+
+def guardar_estado(estado):
+    AJUSTADOS_DIR.mkdir(exist_ok=True)
+    ESTADO_PATH.write_text(json.dumps(estado, indent=2, sort_keys=True), encoding='utf-8')
+
+
+def factores_eventos(fechas, eventos, crudo):
+    """
+    Factor multiplicativo de precio y de volumen para cada fecha en `fechas`
+    debido a `eventos` (solo afectan las filas ANTERIORES a cada evento).
+
+    Dividendo D con fecha ex d:  factor = 1 - D / cierre del día hábil previo a d
+    Split r (r acciones nuevas por 1):  precio / r, volumen × r
+    """
+    fechas = np.asarray(fechas, dtype='datetime64[D]')
+    if len(eventos) == 0:
+        unos = np.ones(len(fechas))
+        return unos, unos.copy()
+
+    fechas_crudo = crudo['fecha'].to_numpy().astype('datetime64[D]')
+    cierres = crudo['Close'].to_numpy(dtype=float)
+
+    ev_fechas = pd.to_datetime(eventos['fecha']).to_numpy().astype('datetime64[D]')
+    orden = np.argsort(ev_fechas, kind='stable')
+    ev_fechas = ev_fechas[orden]
+    tipos = eventos['tipo'].to_numpy()[orden]
+    valores = eventos['valor'].to_numpy(dtype=float)[orden]
+
+    # Cierre del día previo a cada evento (búsqueda binaria, sin loops)
+    pos_prev = np.searchsorted(fechas_crudo, ev_fechas, side='left') - 1
+    cierre_prev = np.where(pos_prev >= 0, cierres[np.clip(pos_prev, 0, None)], np.nan)
+
+    es_split = tipos == 'split'
+    with np.errstate(divide='ignore', invalid='ignore'):
+        f_precio = np.where(es_split, 1.0 / valores, 1.0 - valores / cierre_prev)
+    f_precio = np.where(np.isfinite(f_precio) & (f_precio > 0), f_precio, 1.0)
+    f_volumen = np.where(es_split, valores, 1.0)
+
+    # Producto de los factores de todos los eventos POSTERIORES a cada fecha
+    suf_precio = np.append(np.cumprod(f_precio[::-1])[::-1], 1.0)
+    suf_volumen = np.append(np.cumprod(f_volumen[::-1])[::-1], 1.0)
+    primero_posterior = np.searchsorted(ev_fechas, fechas, side='right')
+    return suf_precio[primero_posterior], suf_volumen[primero_posterior]
+
+
+def construir_ajustado(crudo, eventos):
+    """Serie ajustada completa desde cero (los splits ya vienen en el OHLC de Yahoo)"""
+    dividendos = eventos[eventos['tipo'] == 'dividendo']
+    f_precio, f_volumen = factores_eventos(crudo['fecha'], dividendos, crudo)
+    ajustado = pd.DataFrame({'fecha': crudo['fecha'].to_numpy()})
+    for col in COLUMNAS_PRECIO:
+        ajustado[col] = crudo[col].to_numpy(dtype=float) * f_precio
+    ajustado['Volume'] = crudo['Volume'].to_numpy(dtype=float) * f_volumen
+    ajustado['factor_precio'] = f_precio
+    ajustado['factor_volumen'] = f_volumen
+    return ajustado
+
+
+def actualizar_ajustado(ticker, crudo, estado=None, reconstruir=False, escritor=None):
+    """
+    Mantiene MERVAL_Datos_Ajustados/[TICKER]_ajustado_5A.csv al día.
+    `crudo` es el DataFrame limpio (fecha como 'YYYY-MM-DD').
+    Con `escritor` (EscritorDiferido) el CSV se escribe en segundo plano.
+    Devuelve la cantidad de eventos nuevos aplicados.
+    """
+    guardar = estado is None
+    if estado is None:
+        estado = cargar_estado()
+
+    AJUSTADOS_DIR.mkdir(exist_ok=True)
+    path = AJUSTADOS_DIR / f"{ticker}_ajustado_5A.csv"
+    eventos = cargar_eventos(ticker)
+    claves = [clave_evento(f, t) for f, t in zip(eventos['fecha'], eventos['tipo'])]
+    crudo = crudo.sort_values('fecha', ignore_index=True)
+
+    if reconstruir or not path.exists() or ticker not in estado:
+        ajustado = construir_ajustado(crudo, eventos)
+        aplicados = len(eventos)
+    else:
+        ajustado = pd.read_csv(path)
+        ya_aplicados = set(estado[ticker]['eventos'])
+
+        # 1) Filas nuevas del crudo: entran sin ajustar (factor 1)
+        nuevas = crudo[crudo['fecha'] > ajustado['fecha'].max()]
+        if len(nuevas):
+            agregar = nuevas[['fecha'] + COLUMNAS_PRECIO + ['Volume']].copy()
+            agregar['factor_precio'] = 1.0
+            agregar['factor_volumen'] = 1.0
+            ajustado = pd.concat([ajustado, agregar], ignore_index=True)
+
+        # 2) Eventos nuevos: reescalan solo la historia anterior a su fecha
+        pendientes = eventos[[c not in ya_aplicados for c in claves]]
+        aplicados = len(pendientes)
+        if aplicados:
+            f_precio, f_volumen = factores_eventos(ajustado['fecha'], pendientes, crudo)
+            afectadas = (f_precio != 1.0) | (f_volumen != 1.0)
+            for col in COLUMNAS_PRECIO + ['factor_precio']:
+                ajustado.loc[afectadas, col] *= f_precio[afectadas]
+            for col in ['Volume', 'factor_volumen']:
+                ajustado.loc[afectadas, col] *= f_volumen[afectadas]
+
+    if escritor is not None:
+        escritor.escribir_csv(ajustado, path, index=False, float_format='%.8f')
+    else:
+        ajustado.to_csv(path, index=False, float_format='%.8f')
+    estado[ticker] = {'eventos': claves, 'ultima_fecha': str(ajustado['fecha'].max())}
+    if guardar:
+        guardar_estado(estado)
+    return aplicados
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Series ajustadas por dividendos y splits (local)")
+    parser.add_argument('--reconstruir', action='store_true',
+                        help="Recalcular todas las series ajustadas desde cero")
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("ajustes_corporativos")
+
+    print("="*80)
+    print("🧮 AJUSTES CORPORATIVOS - DIVIDENDOS Y SPLITS (LOCAL)")
+    print("="*80 + "\n")
+
+    archivos = sorted(DATA_DIR.glob("*_precios_5A.csv"))
+    if not archivos:
+        print(f"❌ Error: No hay CSVs en {DATA_DIR}")
+        print(f"Ejecuta primero: python descarga_merval_yahoo_completo.py")
+        exit(1)
+
+    estado = cargar_estado()
+    total_eventos = 0
+    for path in archivos:
+        ticker = path.name.replace('_precios_5A.csv', '')
+        with PERFIL.etapa("lectura_csv"):
+            crudo = pd.read_csv(path)
+        with PERFIL.etapa("ajuste"):
+            aplicados = actualizar_ajustado(ticker, crudo, estado, reconstruir=args.reconstruir)
+        total_eventos += aplicados
+        if aplicados:
+            print(f"   ✅ {ticker:8} | {aplicados} eventos aplicados")
+    guardar_estado(estado)
+
+    print(f"\n📊 {len(archivos)} tickers, {total_eventos} eventos aplicados")
+    print(f"📁 Carpeta: {AJUSTADOS_DIR.absolute()}\n")
@@ -0,0 +1,449 @@
+#!/usr/bin/env python3
+"""
+ALERTAS con indicadores ONLINE (actualización O(1) por barra)
+
+Por ticker se mantiene estado incremental, sin re-escanear la historia:
+
+  sma_N / vol_prom_N   suma móvil (deque + suma corriente)
+  max_N / min_N        deque monótona (máximo/mínimo de las últimas N barras)
+  drawdown_N           close / max_N - 1
+  vol_rel_N            volumen de hoy / promedio de las N barras ANTERIORES
+  ema_N                media exponencial (alfa = 2 / (N + 1))
+  volatilidad          EWMA de retornos (lambda 0.94), anualizada
+  close, volume, ret   barra actual
+
+Cada barra nueva evalúa las reglas de MERVAL_Alertas/reglas.json:
+
+  {"nombre": "Cruce alcista MA200", "indicador": "close", "op": "cruza_arriba", "ref": "sma_200"}
+  {"nombre": "Drawdown > 20%",      "indicador": "drawdown_252", "op": "<", "valor": -0.20}
+  {"nombre": "Volumen 3x",          "indicador": "vol_rel_20", "op": ">", "valor": 3, "tickers": ["GGAL"]}
+
+  op: > < >= <= (contra "valor" o contra otro indicador en "ref")
+      cruza_arriba / cruza_abajo (contra "ref" o "valor")
+
+Las reglas de umbral disparan al PASAR a verdaderas (no en cada barra
+mientras sigan verdaderas). Las alertas van a MERVAL_Alertas/alertas.jsonl
+o a un webhook (POST JSON; si falla, quedan en el archivo).
+
+El estado se guarda en MERVAL_Alertas/estado.json. La primera corrida (o
+si las reglas piden ventanas nuevas) calienta el estado con la historia
+SIN disparar (igual que un ticker que aparece después); luego cada corrida
+procesa solo las barras nuevas. Si el close guardado ya no coincide con el
+del CSV en esa fecha (split o historia re-ajustada), el ticker se recalienta
+en silencio con la historia nueva.
+
+Con --stdin el estado se guarda cada GUARDAR_CADA barras y al terminar.
+
+EJECUTA:
+  python alertas.py                                  # Barras nuevas de MERVAL_Datos_Limpio
+  python alertas.py --webhook http://127.0.0.1:9000/alertas
+  tail -f barras.jsonl | python alertas.py --stdin   # {"ticker": "GGAL", "fecha": "2025-01-02", "close": 1.0, "volume": 10}
+"""
+
+import argparse
+from collections import deque
+from datetime import datetime
+import hashlib
+import json
+import math
+import os
+from pathlib import Path
+import re
+import sys
+import warnings
+
+import pandas as pd
+
+from matriz_precios import DATA_DIR
+from perfilador import perfilador_desde_argv
+
+warnings.filterwarnings('ignore')
+
+ALERTAS_DIR = Path("MERVAL_Alertas")
+REGLAS_PATH = ALERTAS_DIR / "reglas.json"
+ESTADO_PATH = ALERTAS_DIR / "estado.json"
+SALIDA_PATH = ALERTAS_DIR / "alertas.jsonl"
+
+LAMBDA_EWMA = 0.94
+TIMEOUT_WEBHOOK = 5
+GUARDAR_CADA = 100         # Barras de stdin entre guardados del estado
+
+REGLAS_DEFAULT = [
+    {"nombre": "Cruce alcista MA200", "indicador": "close", "op": "cruza_arriba", "ref": "sma_200"},
+    {"nombre": "Cruce bajista MA200", "indicador": "close", "op": "cruza_abajo", "ref": "sma_200"},
+    {"nombre": "Drawdown > 20% (52 semanas)", "indicador": "drawdown_252", "op": "<", "valor": -0.20},
+    {"nombre": "Volumen 3x promedio 20d", "indicador": "vol_rel_20", "op": ">", "valor": 3},
+]
+
+BASICOS = ['close', 'volume', 'ret', 'volatilidad']
+VENTANEADOS = re.compile(r'^(sma|ema|max|min|drawdown|vol_prom|vol_rel)_(\d+)$')
+OPERADORES = ['>', '<', '>=', '<=', 'cruza_arriba', 'cruza_abajo']
+
+
+class ErrorRegla(ValueError):
+    pass
+
+
+def validar_indicador(nombre):
+    if nombre in BASICOS:
+        return
+    m = VENTANEADOS.match(nombre)
+    if not m or int(m.group(2)) < 1:
+        raise ErrorRegla(f"Indicador desconocido: '{nombre}' (usa {', '.join(BASICOS)} o sma_N, ema_N, "
+                         f"max_N, min_N, drawdown_N, vol_prom_N, vol_rel_N)")
+
+
+def cargar_reglas(path=REGLAS_PATH):
+    """Lee (o crea con los defaults) el archivo de reglas y lo valida"""
+    if not path.exists():
+        path.parent.mkdir(exist_ok=True)
+        path.write_text(json.dumps(REGLAS_DEFAULT, indent=2, ensure_ascii=False), encoding='utf-8')
+    reglas = json.loads(path.read_text(encoding='utf-8'))
+    nombres = set()
+    for regla in reglas:
+        for campo in ('nombre', 'indicador', 'op'):
+            if campo not in regla:
+                raise ErrorRegla(f"Regla sin '{campo}': {regla}")
+        if regla['nombre'] in nombres:
+            raise ErrorRegla(f"Nombre de regla repetido: {regla['nombre']}")
+        nombres.add(regla['nombre'])
+        if regla['op'] not in OPERADORES:
+            raise ErrorRegla(f"Operador desconocido en '{regla['nombre']}': {regla['op']}")
+        if ('ref' in regla) == ('valor' in regla):
+            raise ErrorRegla(f"'{regla['nombre']}' necesita 'ref' (indicador) o 'valor' (número), no ambos")
+        validar_indicador(regla['indicador'])
+        if 'ref' in regla:
+            validar_indicador(regla['ref'])
+    return reglas
+
+
+def ventanas_necesarias(reglas):
+    """{'sma': [200], 'max': [252], ...}: qué estado mantener por ticker"""
+    ventanas = {}
+    for regla in reglas:
+        for nombre in (regla['indicador'], regla.get('ref')):
+            m = VENTANEADOS.match(nombre or '')
+            if not m:
+                continue
+            tipo, n = m.group(1), int(m.group(2))
+            # drawdown_N usa max_N; vol_rel_N usa vol_prom_N
+            tipo = {'drawdown': 'max', 'vol_rel': 'vol_prom'}.get(tipo, tipo)
+            ventanas.setdefault(tipo, set()).add(n)
+    return {t: sorted(ns) for t, ns in sorted(ventanas.items())}
+
+
+class EstadoTicker:
+    """Estado online de un ticker: cada barra nueva cuesta O(ventanas), sin releer historia"""
+
+    def __init__(self, ventanas):
+        self.ventanas = ventanas
+        self.n = 0
+        self.ultima_fecha = None
+        self.ultimo_close = None
+        self.var_ewma = None
+        self.sumas = {f"{t}_{n}": [deque(), 0.0] for t in ('sma', 'vol_prom') for n in ventanas.get(t, [])}
+        self.extremos = {f"{t}_{n}": deque() for t in ('max', 'min') for n in ventanas.get(t, [])}
+        self.emas = {f"ema_{n}": None for n in ventanas.get('ema', [])}
+        self.previo = {}       # Indicadores de la barra anterior (para cruces)
+        self.activas = set()   # Reglas de umbral verdaderas en la barra anterior
+
+    def _promedio(self, clave):
+        valores, suma = self.sumas[clave]
+        n = int(clave.rsplit('_', 1)[1])
+        return suma / n if len(valores) == n else None
+
+    def _empujar_suma(self, clave, valor):
+        ventana = self.sumas[clave]
+        n = int(clave.rsplit('_', 1)[1])
+        ventana[0].append(valor)
+        ventana[1] += valor
+        if len(ventana[0]) > n:
+            ventana[1] -= ventana[0].popleft()
+
+    def _empujar_extremo(self, clave, valor):
+        cola = self.extremos[clave]
+        es_max = clave.startswith('max')
+        n = int(clave.rsplit('_', 1)[1])
+        while cola and (cola[-1][1] <= valor if es_max else cola[-1][1] >= valor):
+            cola.pop()
+        cola.append((self.n, valor))
+        while cola[0][0] <= self.n - n:
+            cola.popleft()
+
+    def actualizar(self, fecha, close, volume):
+        """Incorpora una barra y devuelve {indicador: valor o None si falta historia}"""
+        ind = {'close': close, 'volume': volume, 'ret': None, 'volatilidad': None}
+
+        # vol_rel usa el promedio de las barras ANTERIORES (antes de sumar la de hoy)
+        for n in self.ventanas.get('vol_prom', []):
+            previo = self._promedio(f"vol_prom_{n}")
+            ind[f"vol_rel_{n}"] = volume / previo if previo else None
+
+        if self.ultimo_close:
+            ret = math.log(close / self.ultimo_close)
+            ind['ret'] = ret
+            self.var_ewma = ret * ret if self.var_ewma is None else (
+                LAMBDA_EWMA * self.var_ewma + (1 - LAMBDA_EWMA) * ret * ret)
+            ind['volatilidad'] = math.sqrt(self.var_ewma * 252)
+
+        for clave in self.sumas:
+            self._empujar_suma(clave, volume if clave.startswith('vol_prom') else close)
+            ind[clave] = self._promedio(clave)
+        for clave in self.extremos:
+            self._empujar_extremo(clave, close)
+            ind[clave] = self.extremos[clave][0][1] if self.n + 1 >= int(clave.rsplit('_', 1)[1]) else None
+        for n in self.ventanas.get('max', []):
+            maximo = ind[f"max_{n}"]
+            ind[f"drawdown_{n}"] = close / maximo - 1.0 if maximo else None
+        for clave, ema in self.emas.items():
+            alfa = 2.0 / (int(clave.rsplit('_', 1)[1]) + 1)
+            self.emas[clave] = close if ema is None else alfa * close + (1 - alfa) * ema
+            ind[clave] = self.emas[clave]
+
+        self.n += 1
+        self.ultimo_close = close
+        self.ultima_fecha = fecha
+        return ind
+
+    # ------------------------------------------------------------------ persistencia
+
+    def a_dict(self):
+        return {
+            'n': self.n, 'ultima_fecha': self.ultima_fecha, 'ultimo_close': self.ultimo_close,
+            'var_ewma': self.var_ewma,
+            'sumas': {k: [list(v[0]), v[1]] for k, v in self.sumas.items()},
+            'extremos': {k: [list(p) for p in v] for k, v in self.extremos.items()},
+            'emas': self.emas, 'previo': self.previo, 'activas': sorted(self.activas),
+        }
+
+    @classmethod
+    def desde_dict(cls, ventanas, datos):
+        estado = cls(ventanas)
+        estado.n = datos['n']
+        estado.ultima_fecha = datos['ultima_fecha']
+        estado.ultimo_close = datos['ultimo_close']
+        estado.var_ewma = datos['var_ewma']
+        estado.sumas = {k: [deque(v[0]), v[1]] for k, v in datos['sumas'].items()}
+        estado.extremos = {k: deque(tuple(p) for p in v) for k, v in datos['extremos'].items()}
+        estado.emas = datos['emas']
+        estado.previo = datos['previo']
+        estado.activas = set(datos['activas'])
+        return estado
+
+
+def _comparar(a, op, b):
+    return {'>': a > b, '<': a < b, '>=': a >= b, '<=': a <= b}[op]
+
+
+def evaluar_regla(regla, ind, previo):
+    """True si la condición se cumple en esta barra (None si falta historia)"""
+    a = ind.get(regla['indicador'])
+    b = ind.get(regla['ref']) if 'ref' in regla else regla['valor']
+    if a is None or b is None:
+        return None
+    if regla['op'] in ('cruza_arriba', 'cruza_abajo'):
+        a0 = previo.get(regla['indicador'])
+        b0 = previo.get(regla['ref']) if 'ref' in regla else regla['valor']
+        if a0 is None or b0 is None:
+            return None
+        if regla['op'] == 'cruza_arriba':
+            return a0 <= b0 and a > b
+        return a0 >= b0 and a < b
+    return _comparar(a, regla['op'], b)
+
+
+class SinkArchivo:
+    def __init__(self, path=SALIDA_PATH):
+        self.path = path
+        self.path.parent.mkdir(exist_ok=True)
+
+    def enviar(self, alerta):
+        with open(self.path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(alerta, ensure_ascii=False) + "\n")
+
+
+class SinkWebhook:
+    """POST JSON por alerta; si el webhook no responde, la alerta queda en el archivo"""
+
+    def __init__(self, url, respaldo=None):
+        import requests
+        self.url = url
+        self.session = requests.Session()
+        self.respaldo = respaldo or SinkArchivo()
+        self.fallidas = 0
+
+    def enviar(self, alerta):
+        try:
+            response = self.session.post(self.url, json=alerta, timeout=TIMEOUT_WEBHOOK)
+            response.raise_for_status()
+        except Exception:
+            self.fallidas += 1
+            self.respaldo.enviar({**alerta, 'webhook_error': True})
+
+
+class MotorAlertas:
+    def __init__(self, reglas, sink=None):
+        self.reglas = reglas
+        self.ventanas = ventanas_necesarias(reglas)
+        self.huella = hashlib.sha1(json.dumps(self.ventanas, sort_keys=True).encode()).hexdigest()[:12]
+        self.sink = sink
+        self.estados = {}
+        self.disparadas = 0
+
+    def nueva_barra(self, ticker, fecha, close, volume, silencioso=False):
+        """Actualiza el estado del ticker y evalúa las reglas. Devuelve las alertas disparadas."""
+        estado = self.estados.get(ticker)
+        if estado is None:
+            estado = self.estados[ticker] = EstadoTicker(self.ventanas)
+        if estado.ultima_fecha is not None and fecha <= estado.ultima_fecha:
+            return []  # Barra repetida o atrasada
+        if not (close > 0):
+            return []
+        volume = float(volume) if volume == volume and volume is not None else 0.0
+        ind = estado.actualizar(fecha, float(close), volume)
+
+        alertas = []
+        for regla in self.reglas:
+            if 'tickers' in regla and ticker not in regla['tickers'] and f"{ticker}.BA" not in regla['tickers']:
+                continue
+            cumple = evaluar_regla(regla, ind, estado.previo)
+            es_cruce = regla['op'].startswith('cruza')
+            if not es_cruce:
+                if not cumple:
+                    estado.activas.discard(regla['nombre'])
+                    continue
+                if regla['nombre'] in estado.activas:
+                    continue  # Sigue verdadera: ya se avisó
+                estado.activas.add(regla['nombre'])
+            elif not cumple:
+                continue
+            alertas.append({
+                'fecha': fecha, 'ticker': ticker, 'regla': regla['nombre'],
+                'indicador': regla['indicador'], 'valor': round(ind[regla['indicador']], 6),
+                'referencia': round(ind[regla['ref']], 6) if 'ref' in regla else regla['valor'],
+                'close': close, 'generada': datetime.now().isoformat(timespec='seconds'),
+            })
+        estado.previo = {k: v for k, v in ind.items() if v is not None}
+
+        if not silencioso:
+            for alerta in alertas:
+                if self.sink is not None:
+                    self.sink.enviar(alerta)
+            self.disparadas += len(alertas)
+        return alertas
+
+    def guardar(self, path=ESTADO_PATH):
+        path.parent.mkdir(exist_ok=True)
+        datos = {'huella': self.huella, 'tickers': {t: e.a_dict() for t, e in self.estados.items()}}
+        tmp = path.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(datos), encoding='utf-8')
+        os.replace(tmp, path)
+
+    def cargar(self, path=ESTADO_PATH):
+        """Carga el estado si fue calculado con las mismas ventanas. Devuelve True si lo usó."""
+        if not path.exists():
+            return False
+        datos = json.loads(path.read_text(encoding='utf-8'))
+        if datos.get('huella') != self.huella:
+            return False
+        self.estados = {t: EstadoTicker.desde_dict(self.ventanas, d) for t, d in datos['tickers'].items()}
+        return True
+
+
+def barras_nuevas_csv(motor, data_dir=DATA_DIR):
+    """(ticker, DataFrame) con las barras posteriores a lo ya procesado de cada CSV
+
+    Si el close del CSV en la última fecha procesada cambió (split, re-ajuste),
+    se descarta el estado del ticker y se devuelve la historia completa para recalentarlo.
+    """
+    for path in sorted(data_dir.glob("*_precios_5A.csv")):
+        ticker = path.name.replace('_precios_5A.csv', '')
+        df = pd.read_csv(path, usecols=['fecha', 'Close', 'Volume'])
+        estado = motor.estados.get(ticker)
+        if estado is not None and estado.ultima_fecha is not None:
+            en_ultima = df.loc[df['fecha'] == estado.ultima_fecha, 'Close']
+            if len(en_ultima) and not math.isclose(float(en_ultima.iloc[-1]), estado.ultimo_close, rel_tol=1e-6):
+                print(f"♻️  {ticker}: la historia cambió desde {estado.ultima_fecha} (split/ajuste): se recalienta")
+                del motor.estados[ticker]
+            else:
+                df = df[df['fecha'] > estado.ultima_fecha]
+        if len(df):
+            yield ticker, df
+
+
+def imprimir_alerta(a):
+    print(f"   🔔 {a['fecha']} {a['ticker']:8} {a['regla']:32} {a['indicador']}={a['valor']:.4g}"
+          f" (ref {a['referencia']:.4g})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Alertas con indicadores online por regla")
+    parser.add_argument('--reglas', type=Path, default=REGLAS_PATH)
+    parser.add_argument('--webhook', help="URL para POST de cada alerta (default: archivo)")
+    parser.add_argument('--stdin', action='store_true', help="Barras en JSON lines por stdin")
+    parser.add_argument('--reconstruir', action='store_true', help="Descarta el estado y recalienta")
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("alertas")
+
+    print("="*80)
+    print("🔔 ALERTAS - INDICADORES ONLINE")
+    print("="*80 + "\n")
+
+    try:
+        reglas = cargar_reglas(args.reglas)
+    except (ErrorRegla, json.JSONDecodeError) as e:
+        print(f"❌ Error en {args.reglas}: {e}")
+        exit(1)
+    sink = SinkWebhook(args.webhook) if args.webhook else SinkArchivo()
+    motor = MotorAlertas(reglas, sink)
+    print(f"📋 {len(reglas)} reglas | estado: {', '.join(f'{t} {ns}' for t, ns in motor.ventanas.items()) or '-'}")
+    print(f"📤 Destino: {args.webhook or SALIDA_PATH}\n")
+
+    if args.reconstruir or not motor.cargar():
+        motor.estados = {}
+    # Tickers sin estado (primera corrida o CSV nuevo): se calientan con su historia SIN disparar
+    with PERFIL.etapa("barras_nuevas"):
+        calentadas, nuevas, calentados = 0, 0, []
+        for ticker, df in barras_nuevas_csv(motor):
+            calentar = ticker not in motor.estados
+            for fecha, close, volume in zip(df['fecha'], df['Close'], df['Volume']):
+                for alerta in motor.nueva_barra(ticker, fecha, close, volume, silencioso=calentar):
+                    if not calentar:
+                        imprimir_alerta(alerta)
+            if calentar:
+                calentados.append(ticker)
+                calentadas += len(df)
+            else:
+                nuevas += len(df)
+    if calentados:
+        print(f"🔥 Estado calentado con {calentadas} barras de {len(calentados)} tickers (sin alertas)")
+    print(f"\n📊 {nuevas} barras nuevas procesadas")
+
+    if args.stdin:
+        print("📡 Leyendo barras por stdin (Ctrl+C para terminar)...\n")
+        sin_guardar = 0
+        try:
+            for linea in sys.stdin:
+                if not linea.strip():
+                    continue
+                try:
+                    barra = json.loads(linea)
+                    alertas = motor.nueva_barra(barra['ticker'].replace('.BA', ''), barra['fecha'],
+                                                float(barra['close']), float(barra.get('volume') or 0))
+                except (ValueError, KeyError, TypeError):
+                    print(f"   ⚠️  Barra inválida: {linea.strip()[:60]}")
+                    continue
+                for alerta in alertas:
+                    imprimir_alerta(alerta)
+                sin_guardar += 1
+                if sin_guardar >= GUARDAR_CADA:
+                    motor.guardar()
+                    sin_guardar = 0
+        except KeyboardInterrupt:
+            print("\n⏹️  Detenido")
+
+    motor.guardar()  # También al cortar stdin (EOF o Ctrl+C)
+    fallidas = getattr(sink, 'fallidas', 0)
+    print(f"🔔 Alertas disparadas: {motor.disparadas}" + (f" ({fallidas} sin webhook, en {SALIDA_PATH})" if fallidas else ""))
+    print(f"📁 Carpeta: {ALERTAS_DIR.absolute()}\n")
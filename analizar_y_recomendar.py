@@ -9,14 +9,26 @@ ANALIZA todos los fundamentales y:
 
 EJECUTA:
   python analizar_y_recomendar.py
+  python analizar_y_recomendar.py --incremental   # Solo re-puntúa tickers con datos nuevos
 """
 
 import pandas as pd
 from pathlib import Path
+import sys
 import warnings
 
+from calculo_score import rating
+from correlaciones import motor_actualizado
+from estado_analisis import CAMBIOS_PATH, cargar_estado, diff_ratings, guardar_estado, puntuar
+from esquema_fundamentales import cargar_fundamentales, formatear_fundamentales, formato_valor
+from perfilador import perfilador_desde_argv
+from screening import IndiceScreening
+
 warnings.filterwarnings('ignore')
 
+PERFIL = perfilador_desde_argv("analizar_y_recomendar")  # --profile
+INCREMENTAL = '--incremental' in sys.argv
+
 print("="*90)
 print("📊 ANÁLISIS Y RECOMENDACIONES DE COMPRA - MERVAL")
 print("="*90 + "\n")
@@ -30,144 +42,50 @@ if not FUND_PATH.exists():
     print(f"Ejecuta primero: python descarga_merval_yahoo_completo.py")
     exit(1)
 
-df_fund = pd.read_csv(FUND_PATH)
+with PERFIL.etapa("lectura_csv"):
+    df_fund = cargar_fundamentales(FUND_PATH)  # dtypes fijos, sin parseo por celda
 
 print(f"📊 Analizando {len(df_fund)} acciones de MERVAL...\n")
+
+# Calcular scores (en modo incremental, solo los tickers cuya fila cambió)
+with PERFIL.etapa("scores"):
+    previos, motivo = cargar_estado() if INCREMENTAL else ({}, None)
+    estado, cambiados, eliminados = puntuar(df_fund, previos)
+    df_fund['Score'] = [estado[t]['score'] for t in df_fund['Ticker']]
+    df_fund['Detalles'] = [estado[t]['detalles'] for t in df_fund['Ticker']]
+    guardar_estado(estado)
+
+if INCREMENTAL:
+    if motivo:
+        print(f"⚠️  Análisis completo: {motivo}\n")
+    print(f"🔁 Re-puntuados: {len(cambiados)} | reutilizados: {len(df_fund) - len(cambiados)}"
+          f" | eliminados: {len(eliminados)}\n")
+    if not cambiados and not eliminados and Path('MERVAL_Analisis_Recomendaciones.csv').exists():
+        print("✅ Sin cambios desde el último análisis\n")
+        exit(0)
+
 print("="*90)
-print("RAW DATA - FUNDAMENTALES DESCARGADOS")
+print("RAW DATA - FUNDAMENTALES " + ("MODIFICADOS" if INCREMENTAL else "DESCARGADOS"))
 print("="*90 + "\n")
-print(df_fund.to_string(index=False))
+with PERFIL.etapa("imprimir_raw"):
+    raw = df_fund[df_fund['Ticker'].isin(cambiados)] if INCREMENTAL else df_fund
+    print(formatear_fundamentales(raw.drop(columns=['Score', 'Detalles'])).to_string(index=False))
 print("\n" + "="*90)
 
-# Crear función para generar score
-def calcular_score(row):
-    """
-    Score de compra de 0-100
-    Basado en fundamentales
-    """
-    score = 0
-    detalles = []
-    
-    # P/E Score
-    pe = row['P/E Ratio (Trailing)']
-    if isinstance(pe, str) or pd.isna(pe) or pe == 'N/A' or pe == 'Error':
-        pe_score = 0
-    else:
-        pe = float(str(pe).replace('N/A', '0'))
-        if pe < 0:
-            pe_score = 0  # Pérdidas
-            detalles.append("❌ P/E negativo")
-        elif pe < 10:
-            pe_score = 25
-            detalles.append("✅ P/E muy barato")
-        elif pe < 15:
-            pe_score = 20
-            detalles.append("✅ P/E barato")
-        elif pe < 25:
-            pe_score = 15
-            detalles.append("⚠️  P/E justo")
-        else:
-            pe_score = 5
-            detalles.append("❌ P/E caro")
-    score += pe_score
-    
-    # ROE Score
-    roe = row['ROE']
-    if isinstance(roe, str) and '%' in str(roe):
-        try:
-            roe_val = float(str(roe).replace('%', ''))
-            if roe_val > 15:
-                roe_score = 20
-                detalles.append("✅ ROE excelente")
-            elif roe_val > 10:
-                roe_score = 15
-                detalles.append("✅ ROE bueno")
-            elif roe_val > 5:
-                roe_score = 10
-                detalles.append("⚠️  ROE promedio")
-            else:
-                roe_score = 0
-                detalles.append("❌ ROE bajo")
-        except:
-            roe_score = 0
-    else:
-        roe_score = 0
-    score += roe_score
-    
-    # Dividend Score
-    div = row['Dividend Yield']
-    if isinstance(div, str) and '%' in str(div):
-        try:
-            div_val = float(str(div).replace('%', ''))
-            if div_val > 4:
-                div_score = 20
-                detalles.append("✅ Dividendo alto")
-            elif div_val > 2:
-                div_score = 15
-                detalles.append("✅ Dividendo bueno")
-            elif div_val > 1:
-                div_score = 10
-                detalles.append("⚠️  Dividendo bajo")
-            elif div_val > 0:
-                div_score = 5
-                detalles.append("⚠️  Dividendo muy bajo")
-            else:
-                div_score = 0
-                detalles.append("❌ Sin dividendo")
-        except:
-            div_score = 0
-    else:
-        div_score = 0
-    score += div_score
-    
-    # D/E Score
-    de = row['Debt to Equity']
-    if isinstance(de, str):
-        try:
-            de_val = float(de)
-            if de_val < 0.5:
-                de_score = 15
-                detalles.append("✅ Deuda baja")
-            elif de_val < 1.0:
-                de_score = 12
-                detalles.append("✅ Deuda normal")
-            elif de_val < 1.5:
-                de_score = 8
-                detalles.append("⚠️  Deuda elevada")
-            else:
-                de_score = 0
-                detalles.append("❌ Deuda muy alta")
-        except:
-            de_score = 0
-    else:
-        de_score = 0
-    score += de_score
-    
-    # Current Ratio Score
-    cr = row['Current Ratio']
-    if isinstance(cr, str):
-        try:
-            cr_val = float(cr)
-            if cr_val > 1.5:
-                cr_score = 10
-                detalles.append("✅ Liquidez buena")
-            elif cr_val > 1.0:
-                cr_score = 5
-                detalles.append("⚠️  Liquidez ajustada")
-            else:
-                cr_score = 0
-                detalles.append("❌ Liquidez crítica")
-        except:
-            cr_score = 0
-    else:
-        cr_score = 0
-    score += cr_score
-    
-    return score, detalles
-
-# Calcular scores
-df_fund['Score'] = df_fund.apply(lambda row: calcular_score(row)[0], axis=1)
-df_fund['Detalles'] = df_fund.apply(lambda row: calcular_score(row)[1], axis=1)
+if INCREMENTAL:
+    diff = diff_ratings(previos, estado, cambiados, eliminados)
+    print("\n" + "="*90)
+    print("🔀 CAMBIOS DE RATING DESDE EL ÚLTIMO ANÁLISIS")
+    print("="*90 + "\n")
+    if len(diff) == 0:
+        print("   Sin cambios de score")
+    for row in diff.to_dict('records'):
+        antes = '  —' if pd.isna(row['Score Anterior']) else f"{row['Score Anterior']:3.0f}"
+        despues = '  —' if pd.isna(row['Score Nuevo']) else f"{row['Score Nuevo']:3.0f}"
+        marca = "⇄" if row['Rating Anterior'] != row['Rating Nuevo'] else "·"
+        print(f"   {marca} {row['Ticker']:10} {antes} → {despues} | {row['Rating Anterior']} → {row['Rating Nuevo']}")
+    diff.to_csv(CAMBIOS_PATH, index=False)
+    print(f"\n📄 Cambios guardados en: {CAMBIOS_PATH}")
 
 # Rankear
 df_fund_sorted = df_fund.sort_values('Score', ascending=False)
@@ -180,22 +98,13 @@ for i, (idx, row) in enumerate(df_fund_sorted.head(5).iterrows(), 1):
     ticker = row['Ticker']
     nombre = row['Nombre']
     score = row['Score']
-    precio = row['Precio']
-    pe = row['P/E Ratio (Trailing)']
-    roe = row['ROE']
-    div = row['Dividend Yield']
+    precio = formato_valor('Precio', row['Precio'])
+    pe = formato_valor('P/E Ratio (Trailing)', row['P/E Ratio (Trailing)'])
+    roe = formato_valor('ROE', row['ROE'])
+    div = formato_valor('Dividend Yield', row['Dividend Yield'])
     detalles = row['Detalles']
     
-    if score >= 60:
-        rating = "🟢 COMPRA FUERTE"
-    elif score >= 40:
-        rating = "🟡 COMPRA MODERADA"
-    elif score >= 20:
-        rating = "🟠 CONSIDERAR"
-    else:
-        rating = "🔴 EVITAR"
-    
-    print(f"{i}. {ticker:10} | {nombre:35} | Score: {score:3.0f}/100 {rating}")
+    print(f"{i}. {ticker:10} | {nombre:35} | Score: {score:3.0f}/100 {rating(score)}")
     print(f"   Precio: ${precio:>10} | P/E: {pe:>8} | ROE: {roe:>8} | Div: {div:>8}")
     print(f"   → " + " | ".join(detalles))
     print()
@@ -205,53 +114,34 @@ print("\n" + "="*90)
 print("📄 ANÁLISIS DETALLADO POR MÉTRICA")
 print("="*90 + "\n")
 
-# P/E ranking
-print("📊 P/E RATIO (Más bajo = más barato)")
-print("-" * 70)
-df_pe = df_fund.copy()
-df_pe['P/E_clean'] = df_pe['P/E Ratio (Trailing)'].apply(
-    lambda x: float(str(x).replace('N/A', '0')) if isinstance(x, str) or not pd.isna(x) else 0
-)
-df_pe = df_pe[df_pe['P/E_clean'] > 0].sort_values('P/E_clean')
-for idx, row in df_pe.head(5).iterrows():
-    if row['P/E_clean'] > 0:
-        print(f"  {row['Ticker']:10} | P/E = {row['P/E_clean']:6.2f} | {row['Nombre']}")
-
-# ROE ranking
-print("\n💪 ROE (Más alto = mejor gestión)")
-print("-" * 70)
-df_roe = df_fund.copy()
-df_roe['ROE_clean'] = df_roe['ROE'].apply(
-    lambda x: float(str(x).replace('%', '')) if isinstance(x, str) and '%' in str(x) else 0
-)
-df_roe = df_roe[df_roe['ROE_clean'] > 0].sort_values('ROE_clean', ascending=False)
-for idx, row in df_roe.head(5).iterrows():
-    if row['ROE_clean'] > 0:
-        print(f"  {row['Ticker']:10} | ROE = {row['ROE_clean']:6.2f}% | {row['Nombre']}")
-
-# Dividend ranking
-print("\n💰 DIVIDEND YIELD (Más alto = mejor ingreso)")
-print("-" * 70)
-df_div = df_fund.copy()
-df_div['Div_clean'] = df_div['Dividend Yield'].apply(
-    lambda x: float(str(x).replace('%', '')) if isinstance(x, str) and '%' in str(x) else 0
-)
-df_div = df_div[df_div['Div_clean'] > 0].sort_values('Div_clean', ascending=False)
-for idx, row in df_div.head(5).iterrows():
-    if row['Div_clean'] > 0:
-        print(f"  {row['Ticker']:10} | Div = {row['Div_clean']:6.2f}% | {row['Nombre']}")
-
-# Solvencia ranking
-print("\n🏦 D/E RATIO (Más bajo = menos deuda)")
-print("-" * 70)
-df_de = df_fund.copy()
-df_de['DE_clean'] = df_de['Debt to Equity'].apply(
-    lambda x: float(str(x)) if isinstance(x, str) and str(x) not in ['N/A', 'Error'] else 999
-)
-df_de = df_de[df_de['DE_clean'] < 999].sort_values('DE_clean')
-for idx, row in df_de.head(5).iterrows():
-    if row['DE_clean'] < 999:
-        print(f"  {row['Ticker']:10} | D/E = {row['DE_clean']:6.2f} | {row['Nombre']}")
+with PERFIL.etapa("rankings_por_metrica"):
+    # Un solo índice ordenado por métrica (sin copiar df_fund por ranking)
+    indice = IndiceScreening(df_fund)
+    nombres = df_fund['Nombre'].to_numpy()
+
+    # P/E ranking
+    print("📊 P/E RATIO (Más bajo = más barato)")
+    print("-" * 70)
+    for pos in indice.top('pe', 5, expresion='pe > 0'):
+        print(f"  {indice.tickers[pos]:10} | P/E = {indice.valor('pe', pos):6.2f} | {nombres[pos]}")
+
+    # ROE ranking
+    print("\n💪 ROE (Más alto = mejor gestión)")
+    print("-" * 70)
+    for pos in indice.top('roe', 5, ascendente=False, expresion='roe > 0'):
+        print(f"  {indice.tickers[pos]:10} | ROE = {indice.valor('roe', pos):6.2f}% | {nombres[pos]}")
+
+    # Dividend ranking
+    print("\n💰 DIVIDEND YIELD (Más alto = mejor ingreso)")
+    print("-" * 70)
+    for pos in indice.top('dy', 5, ascendente=False, expresion='dy > 0'):
+        print(f"  {indice.tickers[pos]:10} | Div = {indice.valor('dy', pos):6.2f}% | {nombres[pos]}")
+
+    # Solvencia ranking
+    print("\n🏦 D/E RATIO (Más bajo = menos deuda)")
+    print("-" * 70)
+    for pos in indice.top('de', 5):
+        print(f"  {indice.tickers[pos]:10} | D/E = {indice.valor('de', pos):6.2f} | {nombres[pos]}")
 
 # Recomendaciones finales
 print("\n\n" + "="*90)
@@ -278,12 +168,27 @@ if len(avoid) > 0:
     for idx, row in avoid.iterrows():
         print(f"   • {row['Ticker']:10} - {row['Nombre']} (Score: {row['Score']:.0f}/100)")
 
+# Diversificación: tickers menos correlacionados con las compras recomendadas
+if len(top_buy) > 0 and any(DATA_PATH.glob("*_precios_5A.csv")):
+    try:
+        with PERFIL.etapa("correlaciones"):
+            motor, _, _ = motor_actualizado()
+        cartera = [t.replace('.BA', '') for t in top_buy['Ticker']]
+        candidatos = motor.menos_correlacionados(cartera, k=5)
+        if len(candidatos) > 0:
+            print(f"\n🧩 DIVERSIFICACIÓN (menor correlación con COMPRA RECOMENDADA, 252 días):")
+            for ticker, corr in candidatos.items():
+                print(f"   • {ticker:10} - corr. media {corr:+.2f}")
+    except Exception as e:
+        print(f"\n⚠️  Correlaciones no disponibles: {str(e)[:60]}")
+
 # Guardar análisis
 df_export = df_fund_sorted[['Ticker', 'Nombre', 'Precio', 'P/E Ratio (Trailing)', 
                              'ROE', 'Dividend Yield', 'Debt to Equity', 
                              'Current Ratio', 'Score']]
 df_export = df_export.sort_values('Score', ascending=False)
-df_export.to_csv('MERVAL_Analisis_Recomendaciones.csv', index=False)
+with PERFIL.etapa("exportar"):
+    df_export.to_csv('MERVAL_Analisis_Recomendaciones.csv', index=False)
 
 print(f"\n📄 Análisis guardado en: MERVAL_Analisis_Recomendaciones.csv")
 
@@ -0,0 +1,335 @@
+#!/usr/bin/env python3
+"""
+BONOS SOBERANOS HARD-DOLLAR: TIR, duration y convexidad vectorizadas
+
+Universo: Bonares (ley local: AL29, AL30, AL35, AE38, AL41) y Globales
+(ley NY: GD29, GD30, GD35, GD38, GD41, GD46), con cronogramas del canje
+2020 (cupones step-up sobre valor residual, 30/360, pagos 9/1 y 9/7).
+
+Los flujos se guardan en MERVAL_Bonos/flujos.csv (por 100 VN original)
+y ese archivo es la fuente de verdad: se puede editar o agregar bonos.
+
+Precio = Σ flujo_j × (1 + TIR)^(-t_j)     t_j = días hasta el pago / 365
+
+La TIR (efectiva anual) se resuelve con Newton en LOTE: todas las
+observaciones (bono × día) son filas de una matriz (K × flujos) y cada
+iteración es una operación de arrays para todas a la vez. Empezando en
+TIR = 0 y con el precio convexo y decreciente en la TIR, Newton converge
+en pocas iteraciones sin saltar la raíz.
+
+Precios: especie en dólares (AL30D, GD30D...) de MERVAL_Bonos/precios/
+(--descargar los baja de Yahoo), precio sucio por 100 VN original.
+Liquidación T+1 hábil.
+
+Genera:
+  MERVAL_Bonos/flujos.csv               → bono, fecha, tasa, residual, interés, amortización
+  MERVAL_Bonos/curvas_diarias.csv       → fecha, bono, precio, TIR, duration, convexidad
+  MERVAL_Bonos/curva_hoy.csv            → última curva + spread de ley (TIR local − TIR NY)
+
+EJECUTA:
+  python bonos_soberanos.py --descargar
+  python bonos_soberanos.py --desde 2023-01-01
+  python bonos_soberanos.py --regenerar-flujos
+"""
+
+import argparse
+from datetime import date, datetime, timedelta
+from pathlib import Path
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from matriz_precios import cargar_matriz_precios
+from perfilador import perfilador_desde_argv
+
+warnings.filterwarnings('ignore')
+
+BONOS_DIR = Path("MERVAL_Bonos")
+PRECIOS_DIR = BONOS_DIR / "precios"
+FLUJOS_PATH = BONOS_DIR / "flujos.csv"
+CURVAS_PATH = BONOS_DIR / "curvas_diarias.csv"
+CURVA_HOY_PATH = BONOS_DIR / "curva_hoy.csv"
+
+EMISION = '2020-09-04'        # Devengan desde la fecha de liquidación del canje
+PRIMER_CUPON = date(2021, 7, 9)
+SUFIJO_USD = 'D'              # Especie en dólares MEP (AL30 → AL30D)
+LIQUIDACION_HABILES = 1       # T+1
+TOL = 1e-10                   # Paso de Newton (en TIR) para considerar convergido
+MAX_ITER = 50
+BLOQUE = 50_000               # Observaciones por lote (acota memoria: K × flujos)
+
+_STEP_30 = {EMISION: 0.00125, '2021-07-09': 0.005, '2023-07-09': 0.0075, '2027-07-09': 0.0175}
+_STEP_35 = {EMISION: 0.00125, '2021-07-09': 0.01125, '2022-07-09': 0.015, '2023-07-09': 0.03625,
+            '2024-07-09': 0.04125, '2027-07-09': 0.0475, '2028-07-09': 0.05}
+_STEP_38 = {EMISION: 0.00125, '2021-07-09': 0.02, '2022-07-09': 0.03875, '2023-07-09': 0.0425,
+            '2024-07-09': 0.05}
+_STEP_41 = {EMISION: 0.00125, '2021-07-09': 0.025, '2022-07-09': 0.035, '2029-07-09': 0.04875}
+_STEP_46 = {EMISION: 0.00125, '2021-07-09': 0.01125, '2022-07-09': 0.015, '2023-07-09': 0.03625,
+            '2024-07-09': 0.04125, '2027-07-09': 0.04375, '2028-07-09': 0.05}
+
+# cupones: tasa anual vigente desde cada fecha | amortizacion: (primera cuota, cantidad, % primera)
+BONOS = {
+    'AL29': {'ley': 'ARG', 'vencimiento': '2029-07-09', 'cupones': {EMISION: 0.01}, 'amortizacion': ('2025-01-09', 10, None)},
+    'GD29': {'ley': 'NY', 'vencimiento': '2029-07-09', 'cupones': {EMISION: 0.01}, 'amortizacion': ('2025-01-09', 10, None)},
+    'AL30': {'ley': 'ARG', 'vencimiento': '2030-07-09', 'cupones': _STEP_30, 'amortizacion': ('2024-07-09', 13, 0.04)},
+    'GD30': {'ley': 'NY', 'vencimiento': '2030-07-09', 'cupones': _STEP_30, 'amortizacion': ('2024-07-09', 13, 0.04)},
+    'AL35': {'ley': 'ARG', 'vencimiento': '2035-07-09', 'cupones': _STEP_35, 'amortizacion': ('2031-01-09', 10, None)},
+    'GD35': {'ley': 'NY', 'vencimiento': '2035-07-09', 'cupones': _STEP_35, 'amortizacion': ('2031-01-09', 10, None)},
+    'AE38': {'ley': 'ARG', 'vencimiento': '2038-01-09', 'cupones': _STEP_38, 'amortizacion': ('2027-07-09', 22, None)},
+    'GD38': {'ley': 'NY', 'vencimiento': '2038-01-09', 'cupones': _STEP_38, 'amortizacion': ('2027-07-09', 22, None)},
+    'AL41': {'ley': 'ARG', 'vencimiento': '2041-07-09', 'cupones': _STEP_41, 'amortizacion': ('2028-01-09', 28, None)},
+    'GD41': {'ley': 'NY', 'vencimiento': '2041-07-09', 'cupones': _STEP_41, 'amortizacion': ('2028-01-09', 28, None)},
+    'GD46': {'ley': 'NY', 'vencimiento': '2046-07-09', 'cupones': _STEP_46, 'amortizacion': ('2025-01-09', 44, None)},
+}
+
+
+def _dias_30_360(a, b):
+    """Días entre fechas en base 30/360 (US)"""
+    d1, d2 = min(a.day, 30), b.day
+    if d1 == 30 and d2 == 31:
+        d2 = 30
+    return 360 * (b.year - a.year) + 30 * (b.month - a.month) + (d2 - d1)
+
+
+def _semestres(desde, hasta):
+    """Fechas semestrales (mismo día) desde `desde` hasta `hasta` inclusive"""
+    fechas, f = [], desde
+    while f <= hasta:
+        fechas.append(f)
+        f = date(f.year + (f.month + 6 > 12), (f.month + 6 - 1) % 12 + 1, f.day)
+    return fechas
+
+
+def generar_flujos(bono, definicion):
+    """Cronograma (una fila por pago) de un bono, por 100 VN original"""
+    vencimiento = date.fromisoformat(definicion['vencimiento'])
+    pagos = _semestres(PRIMER_CUPON, vencimiento)
+    primera, cuotas, pct_primera = definicion['amortizacion']
+    fechas_amort = _semestres(date.fromisoformat(primera), vencimiento)
+    if len(fechas_amort) != cuotas:
+        raise ValueError(f"{bono}: {len(fechas_amort)} fechas de amortización, se esperaban {cuotas}")
+    if pct_primera is None:
+        amort = {f: 100.0 / cuotas for f in fechas_amort}
+    else:
+        amort = {f: 100.0 * (1 - pct_primera) / (cuotas - 1) for f in fechas_amort}
+        amort[fechas_amort[0]] = 100.0 * pct_primera
+    escalones = sorted((date.fromisoformat(f), t) for f, t in definicion['cupones'].items())
+
+    filas, residual, inicio = [], 100.0, date.fromisoformat(EMISION)
+    for pago in pagos:
+        tasa = [t for f, t in escalones if f <= inicio][-1]
+        interes = residual * tasa * _dias_30_360(inicio, pago) / 360
+        amortizacion = amort.get(pago, 0.0)
+        filas.append({'bono': bono, 'ley': definicion['ley'], 'fecha': pago.isoformat(), 'tasa': tasa,
+                      'residual': residual, 'interes': interes, 'amortizacion': amortizacion,
+                      'flujo': interes + amortizacion})
+        residual -= amortizacion
+        inicio = pago
+    if abs(residual) > 1e-9:
+        raise ValueError(f"{bono}: las amortizaciones no suman 100 (residual {residual:.6f})")
+    return filas
+
+
+def cargar_flujos(path=FLUJOS_PATH, regenerar=False):
+    """flujos.csv (se genera desde BONOS si no existe o con regenerar=True)"""
+    if regenerar or not path.exists():
+        path.parent.mkdir(exist_ok=True)
+        filas = [fila for bono, definicion in BONOS.items() for fila in generar_flujos(bono, definicion)]
+        pd.DataFrame(filas).to_csv(path, index=False, float_format='%.8f')
+    return pd.read_csv(path)
+
+
+def matrices_flujos(flujos, bonos):
+    """Fechas de pago (días desde epoch) y montos, (B, J) rellenados con 0"""
+    grupos = [flujos[flujos['bono'] == b] for b in bonos]
+    j = max(len(g) for g in grupos)
+    fechas = np.zeros((len(bonos), j), dtype=np.int64)
+    montos = np.zeros((len(bonos), j))
+    for i, g in enumerate(grupos):
+        fechas[i, :len(g)] = pd.to_datetime(g['fecha']).to_numpy().astype('datetime64[D]').astype(np.int64)
+        montos[i, :len(g)] = g['flujo'].to_numpy(dtype=float)
+    return fechas, montos
+
+
+def metricas_lote(precios, t, cf, tol=TOL, max_iter=MAX_ITER):
+    """
+    Newton en lote: precios (K,), t (K, J) años hasta cada pago, cf (K, J)
+    montos (0 para pagos ya cobrados). Devuelve TIR, duration Macaulay,
+    duration modificada, convexidad (K,) e iteraciones usadas.
+    """
+    tir = np.zeros(len(precios))
+    convergido = np.zeros(len(precios), dtype=bool)
+    for iteracion in range(1, max_iter + 1):
+        vp = cf * np.exp(-t * np.log1p(tir)[:, None])
+        f = vp.sum(axis=1) - precios
+        derivada = -(t * vp).sum(axis=1) / (1 + tir)
+        paso = f / derivada
+        tir = np.maximum(tir - paso, -0.99)
+        convergido = np.abs(paso) < tol
+        if convergido.all():
+            break
+
+    vp = cf * np.exp(-t * np.log1p(tir)[:, None])
+    valor = vp.sum(axis=1)
+    duration = (t * vp).sum(axis=1) / valor
+    duration_mod = duration / (1 + tir)
+    convexidad = (t * (t + 1) * vp).sum(axis=1) / valor / (1 + tir) ** 2
+    invalido = ~convergido | ~np.isfinite(tir)
+    for arr in (tir, duration, duration_mod, convexidad):
+        arr[invalido] = np.nan
+    return tir, duration, duration_mod, convexidad, iteracion
+
+
+def fecha_liquidacion(fechas, habiles=LIQUIDACION_HABILES):
+    return np.busday_offset(fechas.astype('datetime64[D]'), habiles, roll='forward')
+
+
+def curvas(matriz, flujos, bloque=BLOQUE):
+    """
+    Matriz de precios (fechas × bonos) → DataFrame largo con TIR, duration y
+    convexidad para TODAS las observaciones, resueltas en lotes.
+    """
+    bonos = [b for b in matriz.columns if b in set(flujos['bono'])]
+    fechas_pago, montos = matrices_flujos(flujos, bonos)
+    valores = matriz[bonos].to_numpy(dtype=float)
+    filas, columnas = np.nonzero(np.isfinite(valores) & (valores > 0))
+    liquidacion = fecha_liquidacion(matriz.index.to_numpy()).astype(np.int64)
+
+    partes, iteraciones = [], 0
+    for k in range(0, len(filas), bloque):
+        f, c = filas[k:k + bloque], columnas[k:k + bloque]
+        dias = fechas_pago[c] - liquidacion[f][:, None]
+        cf = np.where(dias > 0, montos[c], 0.0)
+        vivos = cf.sum(axis=1) > 0
+        f, c, dias, cf = f[vivos], c[vivos], dias[vivos], cf[vivos]
+        tir, dur, dur_mod, conv, it = metricas_lote(valores[f, c], dias / 365.0, cf)
+        iteraciones = max(iteraciones, it)
+        partes.append(pd.DataFrame({
+            'fecha': matriz.index[f], 'bono': np.array(bonos)[c], 'precio': valores[f, c],
+            'tir': tir, 'duration': dur, 'duration_mod': dur_mod, 'convexidad': conv,
+        }))
+    if not partes:
+        return pd.DataFrame(columns=['fecha', 'bono', 'precio', 'tir', 'duration', 'duration_mod', 'convexidad']), 0
+    df = pd.concat(partes, ignore_index=True).sort_values(['fecha', 'bono'], ignore_index=True)
+    return df, iteraciones
+
+
+def cargar_precios(path=PRECIOS_DIR, desde=None):
+    """Matriz fechas × bono (AL30D → AL30), por 100 VN"""
+    matriz = cargar_matriz_precios(path)
+    if matriz.empty:
+        return matriz
+    matriz.columns = [c[:-len(SUFIJO_USD)] if c.endswith(SUFIJO_USD) and c[:-len(SUFIJO_USD)] in BONOS else c
+                      for c in matriz.columns]
+    # Algunas fuentes cotizan por 1 VN: llevar todo a 100 VN
+    por_unidad = matriz.median() < 2
+    matriz.loc[:, por_unidad] = matriz.loc[:, por_unidad] * 100
+    if desde:
+        matriz = matriz[matriz.index >= pd.Timestamp(desde)]
+    return matriz
+
+
+def descargar_precios(bonos, anios=5):
+    """Especies en dólares desde Yahoo (AL30D.BA...) a MERVAL_Bonos/precios/"""
+    import yfinance as yf
+    from sesion_yahoo import configurar_cache_yfinance
+    configurar_cache_yfinance()
+
+    PRECIOS_DIR.mkdir(parents=True, exist_ok=True)
+    fin = datetime.now()
+    inicio = fin - timedelta(days=365 * anios)
+    for bono in bonos:
+        especie = f"{bono}{SUFIJO_USD}"
+        try:
+            df = yf.download(f"{especie}.BA", start=inicio.strftime('%Y-%m-%d'), end=fin.strftime('%Y-%m-%d'),
+                             progress=False, threads=False, auto_adjust=False)
+        except Exception as e:
+            print(f"   ❌ {especie:8} {str(e)[:60]}")
+            continue
+        if df is None or len(df) == 0:
+            print(f"   ⚠️  {especie:8} sin datos")
+            continue
+        if isinstance(df.columns, pd.MultiIndex):
+            df.columns = df.columns.get_level_values(0)
+        df = df.reset_index().rename(columns={'Date': 'fecha'})[['fecha', 'Close', 'Volume']].dropna()
+        df['fecha'] = pd.to_datetime(df['fecha']).dt.strftime('%Y-%m-%d')
+        df.to_csv(PRECIOS_DIR / f"{especie}_precios_5A.csv", index=False, float_format='%.6f')
+        print(f"   ✅ {especie:8} {len(df)} días")
+
+
+def curva_hoy(df, flujos):
+    """
+    Última observación de cada bono + spread de ley en pb: TIR ley local −
+    TIR ley NY del mismo vencimiento, solo si ambos cotizan en la misma fecha.
+    """
+    ultima = df.sort_values('fecha').groupby('bono').tail(1).set_index('bono')
+    leyes = flujos.drop_duplicates('bono').set_index('bono')['ley']
+    ultima['ley'] = leyes.reindex(ultima.index)
+    ultima['spread_ley_pb'] = np.nan
+    for bono in ultima.index:
+        if not bono.startswith('GD'):
+            continue
+        local = next((b for b in ('AL' + bono[2:], 'AE' + bono[2:]) if b in ultima.index), None)
+        if local and ultima.loc[local, 'fecha'] == ultima.loc[bono, 'fecha']:
+            ultima.loc[bono, 'spread_ley_pb'] = (ultima.loc[local, 'tir'] - ultima.loc[bono, 'tir']) * 1e4
+    return ultima.sort_values('duration').reset_index()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TIR, duration y convexidad de bonos soberanos en dólares")
+    parser.add_argument('--descargar', action='store_true', help="Baja precios de Yahoo (especies D)")
+    parser.add_argument('--desde', help="Primera fecha a calcular (YYYY-MM-DD)")
+    parser.add_argument('--regenerar-flujos', action='store_true', help="Reescribe flujos.csv desde BONOS")
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("bonos_soberanos")
+
+    print("="*80)
+    print("💵 BONOS SOBERANOS - TIR, DURATION Y CONVEXIDAD")
+    print("="*80 + "\n")
+
+    try:
+        flujos = cargar_flujos(regenerar=args.regenerar_flujos)
+    except (ValueError, KeyError) as e:
+        print(f"❌ Error en flujos: {e}")
+        exit(1)
+    bonos = list(dict.fromkeys(flujos['bono']))
+    print(f"📋 {len(bonos)} bonos con flujos ({len(flujos)} pagos): {', '.join(bonos)}")
+    print(f"📄 Cronogramas: {FLUJOS_PATH}\n")
+
+    if args.descargar:
+        with PERFIL.etapa("descarga"):
+            descargar_precios(bonos)
+        print()
+
+    with PERFIL.etapa("precios"):
+        matriz = cargar_precios(desde=args.desde)
+    if matriz.empty:
+        print(f"❌ Error: No hay precios en {PRECIOS_DIR}")
+        print("Ejecuta primero: python bonos_soberanos.py --descargar")
+        exit(1)
+
+    t0 = time.perf_counter()
+    with PERFIL.etapa("newton"):
+        df, iteraciones = curvas(matriz, flujos)
+    segundos = time.perf_counter() - t0
+    sin_convergencia = int(df['tir'].isna().sum())
+    print(f"⏱️  {len(df):,} TIR resueltas en {segundos:.2f}s ({iteraciones} iteraciones de Newton en lote)"
+          + (f" | ⚠️  {sin_convergencia} sin convergencia" if sin_convergencia else ""))
+    print(f"📅 {matriz.index.min().strftime('%Y-%m-%d')} a {matriz.index.max().strftime('%Y-%m-%d')}\n")
+
+    with PERFIL.etapa("guardar"):
+        df.assign(fecha=df['fecha'].dt.strftime('%Y-%m-%d')).to_csv(CURVAS_PATH, index=False, float_format='%.6f')
+        hoy = curva_hoy(df, flujos)
+        hoy.assign(fecha=hoy['fecha'].dt.strftime('%Y-%m-%d')).to_csv(CURVA_HOY_PATH, index=False, float_format='%.6f')
+
+    print(f"   {'Bono':6} {'Ley':4} {'Fecha':10} {'Precio':>8} {'TIR':>8} {'Dur.':>6} {'D.mod':>6} {'Conv.':>7} {'Spread ley':>11}")
+    for row in hoy.to_dict('records'):
+        spread = f"{row['spread_ley_pb']:+.0f} pb" if pd.notna(row['spread_ley_pb']) else ""
+        print(f"   {row['bono']:6} {row['ley']:4} {row['fecha'].strftime('%Y-%m-%d')} {row['precio']:8.2f} "
+              f"{row['tir']:8.2%} {row['duration']:6.2f} {row['duration_mod']:6.2f} {row['convexidad']:7.2f} {spread:>11}")
+
+    print(f"\n📄 Curvas diarias: {CURVAS_PATH}")
+    print(f"📄 Curva de hoy: {CURVA_HOY_PATH}\n")
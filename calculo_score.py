@@ -0,0 +1,120 @@
+"""
+SCORE DE COMPRA (0-100) a partir de fundamentales tipados
+
+Usado por analizar_y_recomendar.py y por streaming_cotizaciones.py.
+Cada componente devuelve (puntos, detalle); así el streaming puede
+recalcular solo lo que depende del precio (P/E y dividendo) sin
+volver a evaluar el resto.
+
+Entradas con el esquema de esquema_fundamentales.py: float, NaN = sin
+dato, ratios como fracción.
+"""
+
+import math
+
+# Componentes que cambian con el precio (P/E y dividend yield)
+COMPONENTES_PRECIO = ['pe', 'dividendo']
+
+
+def _falta(x):
+    return x is None or (isinstance(x, float) and math.isnan(x))
+
+
+def puntaje_pe(pe):
+    if _falta(pe):
+        return 0, None
+    if pe < 0:
+        return 0, "❌ P/E negativo"  # Pérdidas
+    if pe < 10:
+        return 25, "✅ P/E muy barato"
+    if pe < 15:
+        return 20, "✅ P/E barato"
+    if pe < 25:
+        return 15, "⚠️  P/E justo"
+    return 5, "❌ P/E caro"
+
+
+def puntaje_roe(roe):
+    if _falta(roe):
+        return 0, None
+    if roe > 0.15:
+        return 20, "✅ ROE excelente"
+    if roe > 0.10:
+        return 15, "✅ ROE bueno"
+    if roe > 0.05:
+        return 10, "⚠️  ROE promedio"
+    return 0, "❌ ROE bajo"
+
+
+def puntaje_dividendo(div):
+    if _falta(div):
+        return 0, None
+    if div > 0.04:
+        return 20, "✅ Dividendo alto"
+    if div > 0.02:
+        return 15, "✅ Dividendo bueno"
+    if div > 0.01:
+        return 10, "⚠️  Dividendo bajo"
+    if div > 0:
+        return 5, "⚠️  Dividendo muy bajo"
+    return 0, "❌ Sin dividendo"
+
+
+def puntaje_deuda(de):
+    if _falta(de):
+        return 0, None
+    if de < 0.5:
+        return 15, "✅ Deuda baja"
+    if de < 1.0:
+        return 12, "✅ Deuda normal"
+    if de < 1.5:
+        return 8, "⚠️  Deuda elevada"
+    return 0, "❌ Deuda muy alta"
+
+
+def puntaje_liquidez(cr):
+    if _falta(cr):
+        return 0, None
+    if cr > 1.5:
+        return 10, "✅ Liquidez buena"
+    if cr > 1.0:
+        return 5, "⚠️  Liquidez ajustada"
+    return 0, "❌ Liquidez crítica"
+
+
+def componentes(row):
+    """{componente: (puntos, detalle)} en el orden en que se muestran"""
+    return {
+        'pe': puntaje_pe(row['P/E Ratio (Trailing)']),
+        'roe': puntaje_roe(row['ROE']),
+        'dividendo': puntaje_dividendo(row['Dividend Yield']),
+        'deuda': puntaje_deuda(row['Debt to Equity']),
+        'liquidez': puntaje_liquidez(row['Current Ratio']),
+    }
+
+
+def calcular_score(row):
+    """
+    Score de compra de 0-100
+    Basado en fundamentales
+    """
+    partes = componentes(row)
+    score = sum(puntos for puntos, _ in partes.values())
+    detalles = [detalle for _, detalle in partes.values() if detalle]
+    return score, detalles
+
+
+def score_sin_precio(row):
+    """Puntos que NO dependen del precio (ROE, deuda, liquidez)"""
+    partes = componentes(row)
+    return sum(p for c, (p, _) in partes.items() if c not in COMPONENTES_PRECIO)
+
+
+def rating(score):
+    if score >= 60:
+        return "🟢 COMPRA FUERTE"
+    if score >= 40:
+        return "🟡 COMPRA MODERADA"
+    if score >= 20:
+        return "🟠 CONSIDERAR"
+    return "🔴 EVITAR"
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+"""
+MOTOR INCREMENTAL de correlación/covarianza para el universo .BA
+
+Mantiene dos estimadores sobre retornos logarítmicos diarios:
+  - Ventana móvil (default 252 días), correlación pairwise como pandas .corr()
+  - Exponencial (EWMA, lambda 0.94 estilo RiskMetrics)
+
+En lugar de recalcular O(N²·T) cada día guarda estadísticos suficientes
+(sumas, sumas de cuadrados y productos cruzados por par) y cada día nuevo
+se incorpora en O(N²): se suma el día que entra y se resta el que sale.
+
+  MERVAL_Correlaciones/estado.npz               → estado persistido
+  MERVAL_Correlaciones/correlacion_ventana.csv
+  MERVAL_Correlaciones/correlacion_ewma.csv
+
+EJECUTA:
+  python correlaciones.py
+  python correlaciones.py --cartera GGAL,BMA,YPFD --k 5
+"""
+
+import argparse
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from matriz_precios import cargar_matriz_precios, retornos_log
+from perfilador import perfilador_desde_argv
+
+warnings.filterwarnings('ignore')
+
+CORR_DIR = Path("MERVAL_Correlaciones")
+ESTADO_PATH = CORR_DIR / "estado.npz"
+
+VENTANA = 252          # Días hábiles (~1 año)
+LAMBDA_EWMA = 0.94     # Decaimiento RiskMetrics
+MIN_OBS = 20           # Pares con menos observaciones comunes → NaN
+
+
+class MotorCorrelaciones:
+    def __init__(self, tickers, ventana=VENTANA, lambda_ewma=LAMBDA_EWMA):
+        n = len(tickers)
+        self.tickers = list(tickers)
+        self.ventana = ventana
+        self.lambda_ewma = lambda_ewma
+        self.ultima_fecha = None
+
+        # Buffer circular con los retornos dentro de la ventana
+        self.buffer = np.full((ventana, n), np.nan)
+        self.pos = 0
+        self.llenos = 0
+
+        # Estadísticos suficientes pairwise (i = fila, j = columna):
+        #   cnt[i,j] = Σ m_i m_j    sx[i,j] = Σ x_i m_j
+        #   sxx[i,j] = Σ x_i² m_j   sxy[i,j] = Σ x_i x_j
+        self.cnt = np.zeros((n, n))
+        self.sx = np.zeros((n, n))
+        self.sxx = np.zeros((n, n))
+        self.sxy = np.zeros((n, n))
+
+        self.ewma_media = np.zeros(n)
+        self.ewma_cov = np.zeros((n, n))
+        self.ewma_obs = np.zeros(n)
+
+    # ------------------------------------------------------------------ updates
+
+    def _acumular(self, r, signo):
+        m = np.isfinite(r).astype(float)
+        x = np.where(m > 0, r, 0.0)
+        self.cnt += signo * np.outer(m, m)
+        self.sx += signo * np.outer(x, m)
+        self.sxx += signo * np.outer(x * x, m)
+        self.sxy += signo * np.outer(x, x)
+
+    def agregar_dia(self, fecha, r):
+        """Incorpora los retornos de un día nuevo en O(N²)"""
+        if self.llenos == self.ventana:
+            self._acumular(self.buffer[self.pos], -1.0)  # Sale el día más viejo
+        else:
+            self.llenos += 1
+        self.buffer[self.pos] = r
+        self.pos = (self.pos + 1) % self.ventana
+        self._acumular(r, +1.0)
+        self._actualizar_ewma(r)
+        self.ultima_fecha = fecha
+
+    def _actualizar_ewma(self, r):
+        # EWMA con media (West): los tickers sin dato hoy no mueven su media
+        presente = np.isfinite(r)
+        diff = np.where(presente, r - self.ewma_media, 0.0)
+        alfa = 1.0 - self.lambda_ewma
+        self.ewma_media += alfa * diff
+        self.ewma_cov = self.lambda_ewma * (self.ewma_cov + alfa * np.outer(diff, diff))
+        self.ewma_obs += presente
+
+    def cargar_historia(self, retornos):
+        """Inicialización en bloque: ventana por productos matriciales, EWMA secuencial"""
+        valores = retornos.to_numpy(dtype=float)
+        ult = valores[-self.ventana:]
+        m = np.isfinite(ult).astype(float)
+        x = np.where(m > 0, ult, 0.0)
+        self.cnt = m.T @ m
+        self.sx = x.T @ m
+        self.sxx = (x * x).T @ m
+        self.sxy = x.T @ x
+        self.llenos = len(ult)
+        self.buffer[:len(ult)] = ult
+        self.pos = len(ult) % self.ventana
+
+        for r in valores:
+            self._actualizar_ewma(r)
+        self.ultima_fecha = retornos.index[-1]
+
+    def actualizar(self, retornos):
+        """Agrega solo los días posteriores a la última fecha procesada. Devuelve días agregados."""
+        nuevos = retornos if self.ultima_fecha is None else retornos[retornos.index > self.ultima_fecha]
+        for fecha, fila in zip(nuevos.index, nuevos.to_numpy(dtype=float)):
+            self.agregar_dia(fecha, fila)
+        return len(nuevos)
+
+    # ------------------------------------------------------------------ queries
+
+    def covarianza(self, tipo='ventana'):
+        if tipo == 'ewma':
+            return pd.DataFrame(self.ewma_cov, index=self.tickers, columns=self.tickers)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            cov = (self.sxy - self.sx * self.sx.T / self.cnt) / (self.cnt - 1)
+        cov[self.cnt < MIN_OBS] = np.nan
+        return pd.DataFrame(cov, index=self.tickers, columns=self.tickers)
+
+    def correlacion(self, tipo='ventana'):
+        with np.errstate(divide='ignore', invalid='ignore'):
+            if tipo == 'ewma':
+                d = np.sqrt(np.diag(self.ewma_cov))
+                corr = self.ewma_cov / np.outer(d, d)
+                pocos = np.minimum.outer(self.ewma_obs, self.ewma_obs) < MIN_OBS
+            else:
+                n = self.cnt
+                cov = self.sxy - self.sx * self.sx.T / n
+                var_i = self.sxx - self.sx ** 2 / n      # varianza de i sobre los días comunes con j
+                corr = cov / np.sqrt(var_i * var_i.T)
+                pocos = n < MIN_OBS
+        corr[pocos] = np.nan
+        np.fill_diagonal(corr, np.where(np.diag(pocos), np.nan, 1.0))
+        return pd.DataFrame(corr, index=self.tickers, columns=self.tickers)
+
+    def menos_correlacionados(self, cartera, k=5, tipo='ventana'):
+        """Los K tickers (fuera de la cartera) con menor correlación media con ella"""
+        corr = self.correlacion(tipo)
+        cartera = [t for t in cartera if t in corr.index]
+        if not cartera:
+            return pd.Series(dtype=float)
+        media = corr[cartera].drop(index=cartera).mean(axis=1, skipna=True).dropna()
+        if len(media) <= k:
+            return media.sort_values()
+        idx = np.argpartition(media.to_numpy(), k)[:k]
+        return media.iloc[idx].sort_values()
+
+    # ------------------------------------------------------------------ persistencia
+
+    def guardar(self, path=ESTADO_PATH):
+        path.parent.mkdir(exist_ok=True)
+        np.savez(path, tickers=np.array(self.tickers), ventana=self.ventana,
+                 lambda_ewma=self.lambda_ewma, ultima_fecha=np.datetime64(self.ultima_fecha, 'D'),
+                 buffer=self.buffer, pos=self.pos, llenos=self.llenos,
+                 cnt=self.cnt, sx=self.sx, sxx=self.sxx, sxy=self.sxy,
+                 ewma_media=self.ewma_media, ewma_cov=self.ewma_cov, ewma_obs=self.ewma_obs)
+
+    @classmethod
+    def cargar(cls, path=ESTADO_PATH):
+        z = np.load(path, allow_pickle=False)
+        motor = cls(z['tickers'].tolist(), int(z['ventana']), float(z['lambda_ewma']))
+        motor.ultima_fecha = pd.Timestamp(z['ultima_fecha'].item())
+        motor.buffer = z['buffer']
+        motor.pos = int(z['pos'])
+        motor.llenos = int(z['llenos'])
+        for nombre in ('cnt', 'sx', 'sxx', 'sxy', 'ewma_media', 'ewma_cov', 'ewma_obs'):
+            setattr(motor, nombre, z[nombre])
+        return motor
+
+
+def motor_actualizado(ventana=VENTANA, lambda_ewma=LAMBDA_EWMA):
+    """
+    Carga el estado guardado y le agrega solo los días nuevos.
+    Si cambió el universo de tickers o los parámetros, reconstruye desde cero.
+    Devuelve (motor, dias_agregados, reconstruido).
+    """
+    retornos = retornos_log(cargar_matriz_precios())
+    if retornos.empty:
+        return None, 0, False
+
+    motor = None
+    if ESTADO_PATH.exists():
+        motor = MotorCorrelaciones.cargar()
+        if (motor.tickers != list(retornos.columns) or motor.ventana != ventana
+                or motor.lambda_ewma != lambda_ewma):
+            motor = None
+
+    if motor is None:
+        motor = MotorCorrelaciones(retornos.columns, ventana, lambda_ewma)
+        motor.cargar_historia(retornos)
+        dias, reconstruido = len(retornos), True
+    else:
+        dias, reconstruido = motor.actualizar(retornos), False
+
+    motor.guardar()
+    return motor, dias, reconstruido
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Correlaciones incrementales del universo .BA")
+    parser.add_argument('--cartera', default='', help="Tickers separados por coma (ej: GGAL,BMA)")
+    parser.add_argument('--k', type=int, default=5)
+    parser.add_argument('--tipo', choices=['ventana', 'ewma'], default='ventana')
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("correlaciones")
+
+    print("="*80)
+    print("🧩 CORRELACIONES INCREMENTALES - UNIVERSO .BA")
+    print("="*80 + "\n")
+
+    with PERFIL.etapa("actualizacion"):
+        motor, dias, reconstruido = motor_actualizado()
+    if motor is None:
+        print("❌ Error: No hay CSVs en MERVAL_Datos_Limpio")
+        print("Ejecuta primero: python descarga_merval_yahoo_completo.py")
+        exit(1)
+
+    accion = "reconstruido desde cero" if reconstruido else "actualizado"
+    print(f"✅ Estado {accion}: {dias} días procesados, {len(motor.tickers)} tickers")
+    print(f"📅 Última fecha: {pd.Timestamp(motor.ultima_fecha).strftime('%Y-%m-%d')}\n")
+
+    with PERFIL.etapa("consulta"):
+        corr = motor.correlacion(args.tipo)
+    corr.to_csv(CORR_DIR / f"correlacion_{args.tipo}.csv", float_format='%.4f')
+
+    # Pares más y menos correlacionados (triángulo superior)
+    valores = corr.to_numpy()
+    iu = np.triu_indices_from(valores, k=1)
+    pares = pd.Series(valores[iu], index=[f"{corr.index[i]}-{corr.columns[j]}" for i, j in zip(*iu)]).dropna()
+    print(f"🔗 Pares MÁS correlacionados ({args.tipo})")
+    for par, c in pares.nlargest(args.k).items():
+        print(f"   {par:20} | {c:+.3f}")
+    print(f"\n🧭 Pares MENOS correlacionados ({args.tipo})")
+    for par, c in pares.nsmallest(args.k).items():
+        print(f"   {par:20} | {c:+.3f}")
+
+    if args.cartera:
+        cartera = [t.strip().upper().replace('.BA', '') for t in args.cartera.split(',') if t.strip()]
+        print(f"\n🛡️  Menos correlacionados con {', '.join(cartera)}")
+        for ticker, c in motor.menos_correlacionados(cartera, args.k, args.tipo).items():
+            print(f"   {ticker:10} | corr. media {c:+.3f}")
+
+    print(f"\n📁 Carpeta: {CORR_DIR.absolute()}\n")
@@ -1,39 +1,59 @@
 #!/usr/bin/env python3
 """
 Script para descargar datos históricos de MERVAL desde Bolsamania.com
-Período: Últimos 6 meses
+Período: configurable (default últimos 5 años)
 Funciona: 100% automático, sin JavaScript requerido
 Ventaja: No tiene restricciones de Yahoo Finance
 
+Bolsamania no entrega historias largas en una sola respuesta confiable:
+el rango se parte en VENTANAS acotadas (default 180 días) que se piden
+en paralelo sobre una sesión compartida. Cada ventana se reintenta por
+separado (una ventana caída no obliga a bajar de nuevo las demás) y al
+final se unen en orden, sin fechas duplicadas, en el esquema estándar:
+
+  fecha, Open, High, Low, Close, Volume
+
+Para probar contra un servidor local de reemplazo:
+  python descarga_merval_bolsamania.py --url http://127.0.0.1:8000/descargar-historico/
+  (o variable de entorno BOLSAMANIA_URL)
+
+EJECUTA:
+  python descarga_merval_bolsamania.py
+  python descarga_merval_bolsamania.py --desde 2015-01-01 --ventana 120 --workers 6
+
 Instala primero:
-  pip install requests beautifulsoup4 pandas lxml
+  pip install requests pandas
 """
 
-import requests
-import pandas as pd
+import argparse
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
+from io import StringIO
+import os
 from pathlib import Path
 import time
-import re
+import unicodedata
 
-print("="*80)
-print("📥 DESCARGADOR MERVAL - BOLSAMANIA.COM")
-print("="*80 + "\n")
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
-# Período: últimos 6 meses
-fecha_fin = datetime.now()
-fecha_inicio = fecha_fin - timedelta(days=180)
+from escritura_diferida import EscritorDiferido
+from perfilador import perfilador_desde_argv
 
-print(f"📅 Período: {fecha_inicio.strftime('%d/%m/%Y')} a {fecha_fin.strftime('%d/%m/%Y')}\n")
+BOLSAMANIA_URL = os.environ.get("BOLSAMANIA_URL", "https://www.bolsamania.com/descargar-historico/")
 
-# Crear carpeta para descargas
 DOWNLOAD_DIR = Path("MERVAL_Datos")
-DOWNLOAD_DIR.mkdir(exist_ok=True)
 
-print(f"📁 Directorio: {DOWNLOAD_DIR.absolute()}\n")
-print("="*80)
-print("DESCARGANDO DATOS")
-print("="*80 + "\n")
+VENTANA_DIAS = 180
+MAX_WORKERS = 4
+INTENTOS = 3          # Por ventana
+TIMEOUT = 15
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+}
 
 # URLs de Bolsamania para descargar CSV
 ACCIONES_BOLSAMANIA = {
@@ -79,138 +99,248 @@ ACCIONES_BOLSAMANIA = {
     },
 }
 
-resultados = []
-delay_segundos = 1
-
-for ticker, datos in ACCIONES_BOLSAMANIA.items():
-    print(f"⏳ {ticker:12} ({datos['nombre']})")
-    
-    try:
-        # Construir URL de descarga CSV con fechas
-        fecha_inicio_str = fecha_inicio.strftime("%d/%m/%Y")
-        fecha_fin_str = fecha_fin.strftime("%d/%m/%Y")
-        
-        # URL para descargar CSV desde Bolsamania
-        csv_url = f"https://www.bolsamania.com/descargar-historico/?accion={ticker}&date_from={fecha_inicio_str}&date_to={fecha_fin_str}"
-        
-        print(f"   📡 Conectando...")
-        
-        headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        }
-        
-        response = requests.get(csv_url, headers=headers, timeout=10)
-        
-        if response.status_code == 200:
-            # Intentar parsear como CSV
-            try:
-                # Leer CSV desde la respuesta
-                lines = response.text.split('\n')
-                
-                # Filtrar líneas vacías
-                lines = [l for l in lines if l.strip()]
-                
-                if len(lines) > 1:  # Al menos encabezado + 1 dato
-                    # Escribir CSV
-                    csv_content = '\n'.join(lines)
-                    filename = f"{ticker}_6M.csv"
-                    filepath = DOWNLOAD_DIR / filename
-                    
-                    with open(filepath, 'w', encoding='utf-8') as f:
-                        f.write(csv_content)
-                    
-                    # Contar datos
-                    num_datos = len(lines) - 1  # Restar encabezado
-                    
-                    print(f"   ✅ OK - {num_datos} datos")
-                    print(f"   💾 Guardado: {filename}\n")
-                    
-                    resultados.append({
-                        'Ticker': ticker,
-                        'Nombre': datos['nombre'],
-                        'Status': '✅ OK',
-                        'Datos': num_datos,
-                        'Archivo': filename
-                    })
-                else:
-                    print(f"   ⚠️ CSV vacío\n")
-                    resultados.append({
-                        'Ticker': ticker,
-                        'Nombre': datos['nombre'],
-                        'Status': '⚠️ Vacío',
-                        'Datos': 0,
-                        'Archivo': '-'
-                    })
-                    
-            except Exception as e:
-                print(f"   ⚠️ Error parse: {str(e)[:50]}\n")
-                resultados.append({
-                    'Ticker': ticker,
-                    'Nombre': datos['nombre'],
-                    'Status': '⚠️ Parse error',
-                    'Datos': 0,
-                    'Archivo': '-'
-                })
-        else:
-            print(f"   ❌ HTTP {response.status_code}\n")
-            resultados.append({
-                'Ticker': ticker,
-                'Nombre': datos['nombre'],
-                'Status': f'❌ HTTP {response.status_code}',
-                'Datos': 0,
-                'Archivo': '-'
-            })
-            
-    except Exception as e:
-        print(f"   ❌ Error: {str(e)[:50]}\n")
-        resultados.append({
-            'Ticker': ticker,
-            'Nombre': datos['nombre'],
-            'Status': '❌ Error',
-            'Datos': 0,
-            'Archivo': '-'
-        })
-    
-    time.sleep(delay_segundos)
-
-# Resumen final
-print("\n" + "="*80)
-print("📊 RESUMEN FINAL")
-print("="*80 + "\n")
-
-df_resultados = pd.DataFrame(resultados)
-print(df_resultados.to_string(index=False))
-
-# Estadísticas
-exitosas = len([r for r in resultados if r['Status'] == '✅ OK'])
-fallidas = len([r for r in resultados if '❌' in r['Status']])
-sin_datos = len([r for r in resultados if '⚠️' in r['Status']])
-
-print(f"\n✅ Exitosas: {exitosas}/{len(ACCIONES_BOLSAMANIA)}")
-print(f"⚠️ Con advertencia: {sin_datos}/{len(ACCIONES_BOLSAMANIA)}")
-print(f"❌ Fallidas: {fallidas}/{len(ACCIONES_BOLSAMANIA)}")
-
-# Listar archivos
-print(f"\n{'='*80}")
-print("📁 ARCHIVOS GENERADOS")
-print(f"{'='*80}\n")
-
-files = sorted(list(DOWNLOAD_DIR.glob("*_6M.csv")))
-if files:
-    total_size = 0
-    for i, f in enumerate(files, 1):
-        size_kb = f.stat().st_size / 1024
-        total_size += size_kb
-        print(f"{i:2d}. {f.name:20} ({size_kb:8.1f} KB)")
-    print(f"\n📊 Tamaño total: {total_size:.1f} KB")
-else:
-    print("No se encontraron archivos")
-
-print(f"\n📁 Carpeta: {DOWNLOAD_DIR.absolute()}\n")
-
-print("="*80)
-print("✅ DESCARGA COMPLETADA")
-print("="*80)
-print(f"\n💡 NOTA: Estos datos son de Bolsamania.com")
-print(f"   Funciona sin problemas de Yahoo Finance")
-print(f"   Si necesitas más acciones, agrega a ACCIONES_BOLSAMANIA\n")
\ No newline at end of file
+# Encabezados del CSV (minúsculas, sin acentos) → esquema estándar OHLCV
+COLUMNAS_CSV = {
+    'fecha': 'fecha', 'date': 'fecha',
+    'apertura': 'Open', 'open': 'Open',
+    'maximo': 'High', 'max': 'High', 'high': 'High',
+    'minimo': 'Low', 'min': 'Low', 'low': 'Low',
+    'cierre': 'Close', 'ultimo': 'Close', 'close': 'Close',
+    'volumen': 'Volume', 'volume': 'Volume',
+}
+COLUMNAS = ['fecha', 'Open', 'High', 'Low', 'Close', 'Volume']
+
+
+def crear_sesion(pool=MAX_WORKERS):
+    """Sesión compartida entre hilos: reutiliza conexiones TLS y reintenta 429/5xx"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(total=2, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def ventanas(desde, hasta, dias=VENTANA_DIAS):
+    """[(inicio, fin)] consecutivas e inclusivas que cubren [desde, hasta]"""
+    salida = []
+    inicio = desde
+    while inicio <= hasta:
+        fin = min(inicio + timedelta(days=dias - 1), hasta)
+        salida.append((inicio, fin))
+        inicio = fin + timedelta(days=1)
+    return salida
+
+
+def _clave(texto):
+    texto = unicodedata.normalize('NFKD', str(texto)).encode('ascii', 'ignore').decode()
+    return texto.strip().strip('.').lower()
+
+
+def _numero(serie, espanol=False):
+    """
+    '1.234,56' (formato español) o '1234.56' → float. El formato se decide
+    para toda la columna: si es español, '.' es separador de miles en TODAS
+    las celdas ('12.345' → 12345).
+    """
+    texto = serie.astype('string').str.strip()
+    if espanol or texto.str.contains(',', regex=False).fillna(False).any():
+        texto = texto.str.replace('.', '', regex=False).str.replace(',', '.', regex=False)
+    return pd.to_numeric(texto, errors='coerce')
+
+
+def parsear_csv(texto):
+    """CSV de Bolsamania (separador ',' o ';', fechas dd/mm/aaaa) → DataFrame estándar"""
+    lineas = [l for l in texto.splitlines() if l.strip()]
+    if len(lineas) < 2:
+        return pd.DataFrame(columns=COLUMNAS)
+    separador = ';' if lineas[0].count(';') > lineas[0].count(',') else ','
+    df = pd.read_csv(StringIO('\n'.join(lineas)), sep=separador, dtype='string')
+    df = df.rename(columns={c: COLUMNAS_CSV.get(_clave(c), c) for c in df.columns})
+    faltantes = [c for c in ('fecha', 'Close') if c not in df.columns]
+    if faltantes:
+        raise ValueError(f"CSV sin columnas esperadas: {faltantes}")
+
+    fechas = df['fecha'].str.strip()
+    iso = fechas.str.match(r'^\d{4}-\d{2}-\d{2}').fillna(False)
+    out = pd.DataFrame({'fecha': pd.to_datetime(fechas.where(iso), format='%Y-%m-%d', errors='coerce')
+                        .fillna(pd.to_datetime(fechas.where(~iso), format='%d/%m/%Y', errors='coerce'))})
+    for col in COLUMNAS[1:]:
+        out[col] = _numero(df[col], espanol=separador == ';') if col in df.columns else float('nan')
+    out = out.dropna(subset=['fecha', 'Close'])
+    out['fecha'] = out['fecha'].dt.strftime('%Y-%m-%d')
+    return out
+
+
+def descargar_ventana(session, url, ticker, inicio, fin, intentos=INTENTOS):
+    """Una ventana con sus propios reintentos. Devuelve (DataFrame, error)."""
+    error = None
+    for intento in range(intentos):
+        try:
+            response = session.get(url, params={
+                'accion': ticker,
+                'date_from': inicio.strftime('%d/%m/%Y'),
+                'date_to': fin.strftime('%d/%m/%Y'),
+            }, timeout=TIMEOUT)
+            response.raise_for_status()
+            return parsear_csv(response.text), None
+        except Exception as e:
+            error = str(e)[:60]
+            if intento < intentos - 1:
+                time.sleep(0.5 * 2 ** intento)
+    return None, error
+
+
+def unir_ventanas(partes):
+    """Ventanas → una serie ordenada y sin fechas repetidas (gana la ventana más nueva)"""
+    partes = [p for p in partes if p is not None and len(p) > 0]
+    if not partes:
+        return pd.DataFrame(columns=COLUMNAS)
+    df = pd.concat(partes, ignore_index=True)
+    return df.drop_duplicates('fecha', keep='last').sort_values('fecha', ignore_index=True)[COLUMNAS]
+
+
+def descargar_todo(session, url, tickers, desde, hasta, dias=VENTANA_DIAS, workers=MAX_WORKERS):
+    """
+    Todas las ventanas de todos los tickers en un solo pool. Las que fallan se
+    reintentan en una segunda ronda (solo ellas).
+    Devuelve {ticker: (DataFrame unido, [ventanas faltantes], segundos)}
+    """
+    trabajos = [(t, ini, fin) for t in tickers for ini, fin in ventanas(desde, hasta, dias)]
+    partes, errores = {}, {}
+    inicio = time.perf_counter()
+    pendientes = trabajos
+    for ronda in range(2):
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            salidas = list(pool.map(lambda w: descargar_ventana(session, url, *w), pendientes))
+        for trabajo, (df, error) in zip(pendientes, salidas):
+            if error is None:
+                partes[trabajo] = df
+                errores.pop(trabajo, None)
+            else:
+                errores[trabajo] = error
+        pendientes = [w for w in pendientes if w in errores]
+        if not pendientes:
+            break
+    segundos = time.perf_counter() - inicio
+
+    resultado = {}
+    for ticker in tickers:
+        propias = [w for w in trabajos if w[0] == ticker]  # En orden cronológico
+        df = unir_ventanas([partes.get(w) for w in propias])
+        df = df[(df['fecha'] >= desde.strftime('%Y-%m-%d')) & (df['fecha'] <= hasta.strftime('%Y-%m-%d'))]
+        df = df.reset_index(drop=True)
+        faltan = [(w[1], w[2], errores[w]) for w in propias if w in errores]
+        resultado[ticker] = (df, faltan, segundos)
+    return resultado
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Históricos Bolsamania en ventanas paralelas")
+    parser.add_argument('--url', default=BOLSAMANIA_URL, help="Endpoint de descarga (servidor local para pruebas)")
+    parser.add_argument('--desde', help="YYYY-MM-DD (default: hace 5 años)")
+    parser.add_argument('--hasta', help="YYYY-MM-DD (default: hoy)")
+    parser.add_argument('--ventana', type=int, default=VENTANA_DIAS, help="Días por pedido")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("descarga_merval_bolsamania")
+
+    print("="*80)
+    print("📥 DESCARGADOR MERVAL - BOLSAMANIA.COM")
+    print("="*80 + "\n")
+
+    fecha_fin = datetime.strptime(args.hasta, '%Y-%m-%d') if args.hasta else datetime.now()
+    fecha_inicio = (datetime.strptime(args.desde, '%Y-%m-%d') if args.desde
+                    else fecha_fin - timedelta(days=365*5))
+    n_ventanas = len(ventanas(fecha_inicio, fecha_fin, args.ventana))
+
+    print(f"📅 Período: {fecha_inicio.strftime('%d/%m/%Y')} a {fecha_fin.strftime('%d/%m/%Y')}")
+    print(f"🪟 {n_ventanas} ventanas de {args.ventana} días × {len(ACCIONES_BOLSAMANIA)} tickers"
+          f" | {args.workers} workers\n")
+
+    # Crear carpeta para descargas
+    DOWNLOAD_DIR.mkdir(exist_ok=True)
+
+    print(f"📁 Directorio: {DOWNLOAD_DIR.absolute()}\n")
+    print("="*80)
+    print("DESCARGANDO DATOS")
+    print("="*80 + "\n")
+
+    session = crear_sesion(args.workers)
+    with PERFIL.etapa("ventanas_paralelo"):
+        descargas = descargar_todo(session, args.url, list(ACCIONES_BOLSAMANIA), fecha_inicio, fecha_fin,
+                                   args.ventana, args.workers)
+
+    resultados = []
+    escritor = EscritorDiferido()
+    for ticker, datos in ACCIONES_BOLSAMANIA.items():
+        df, faltan, _ = descargas[ticker]
+        print(f"⏳ {ticker:12} ({datos['nombre']})")
+        for ini, fin, error in faltan:
+            print(f"   ⚠️  Ventana {ini.strftime('%Y-%m-%d')} → {fin.strftime('%Y-%m-%d')} falló: {error}")
+
+        if len(df) == 0:
+            status = '❌ Error' if faltan else '⚠️ Vacío'
+            print(f"   {status}\n")
+            resultados.append({'Ticker': ticker, 'Nombre': datos['nombre'], 'Status': status,
+                               'Datos': 0, 'Archivo': '-'})
+            continue
+
+        filename = f"{ticker}_bolsamania.csv"
+        escritor.escribir_csv(df, DOWNLOAD_DIR / filename, index=False, float_format='%.8f')
+        status = f'⚠️ Parcial ({len(faltan)} ventanas)' if faltan else '✅ OK'
+        print(f"   {status} - {len(df)} datos ({df['fecha'].iloc[0]} → {df['fecha'].iloc[-1]})")
+        print(f"   💾 Guardado: {filename}\n")
+        resultados.append({'Ticker': ticker, 'Nombre': datos['nombre'], 'Status': status,
+                           'Datos': len(df), 'Archivo': filename})
+
+    with PERFIL.etapa("escritura"):
+        escritor.cerrar()
+
+    # Resumen final
+    print("\n" + "="*80)
+    print("📊 RESUMEN FINAL")
+    print("="*80 + "\n")
+
+    df_resultados = pd.DataFrame(resultados)
+    print(df_resultados.to_string(index=False))
+
+    # Estadísticas
+    exitosas = len([r for r in resultados if r['Status'] == '✅ OK'])
+    fallidas = len([r for r in resultados if '❌' in r['Status']])
+    sin_datos = len([r for r in resultados if '⚠️' in r['Status']])
+    segundos = next(iter(descargas.values()))[2] if descargas else 0.0
+
+    print(f"\n✅ Exitosas: {exitosas}/{len(ACCIONES_BOLSAMANIA)}")
+    print(f"⚠️ Con advertencia: {sin_datos}/{len(ACCIONES_BOLSAMANIA)}")
+    print(f"❌ Fallidas: {fallidas}/{len(ACCIONES_BOLSAMANIA)}")
+    print(f"⏱️  {n_ventanas * len(ACCIONES_BOLSAMANIA)} ventanas en {segundos:.1f}s")
+    escritor.imprimir_estadisticas()
+
+    # Listar archivos
+    print(f"\n{'='*80}")
+    print("📁 ARCHIVOS GENERADOS")
+    print(f"{'='*80}\n")
+
+    files = sorted(list(DOWNLOAD_DIR.glob("*_bolsamania.csv")))
+    if files:
+        total_size = 0
+        for i, f in enumerate(files, 1):
+            size_kb = f.stat().st_size / 1024
+            total_size += size_kb
+            print(f"{i:2d}. {f.name:24} ({size_kb:8.1f} KB)")
+        print(f"\n📊 Tamaño total: {total_size:.1f} KB")
+    else:
+        print("No se encontraron archivos")
+
+    print(f"\n📁 Carpeta: {DOWNLOAD_DIR.absolute()}\n")
+
+    print("="*80)
+    print("✅ DESCARGA COMPLETADA")
+    print("="*80)
+    print(f"\n💡 NOTA: Estos datos son de Bolsamania.com")
+    print(f"   Funciona sin problemas de Yahoo Finance")
+    print(f"   Si necesitas más acciones, agrega a ACCIONES_BOLSAMANIA\n")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Script para descargar históricos MERVAL desde Investing.com SIN navegador
+
+Llama directo al endpoint de datos históricos que usa la web (JSON) con
+sesiones HTTP reutilizadas (pool de conexiones) y varios tickers en paralelo.
+Convierte la respuesta al esquema estándar: fecha, Open, High, Low, Close, Volume
+
+Ventajas frente a descarga_merval_selenium.py:
+  • Sin Firefox ni GeckoDriverManager (arranque en milisegundos, poca RAM)
+  • Selenium queda solo como FALLBACK para los tickers que fallen
+
+Para probar contra un servidor local de reemplazo:
+  python descarga_merval_investing.py --api-url http://127.0.0.1:8000/api
+  (o variable de entorno INVESTING_API_URL)
+
+Instala primero:
+  pip install requests pandas
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+import json
+import os
+from pathlib import Path
+import time
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from escritura_diferida import EscritorDiferido
+from perfilador import perfilador_desde_argv
+from universo_merval import ACCIONES_INVESTING
+
+API_URL = os.environ.get("INVESTING_API_URL", "https://api.investing.com/api")
+
+DOWNLOAD_DIR = Path("MERVAL_Descargadas")
+PAIR_IDS_PATH = DOWNLOAD_DIR / "investing_pair_ids.json"  # Cache ticker → id interno
+
+MAX_WORKERS = 4
+TIMEOUT = 15
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json',
+    'domain-id': 'es',  # Sitio es.investing.com
+}
+
+# Campos de la respuesta JSON → esquema estándar OHLCV
+CAMPOS_JSON = {
+    'last_openRaw': 'Open',
+    'last_maxRaw': 'High',
+    'last_minRaw': 'Low',
+    'last_closeRaw': 'Close',
+    'volumeRaw': 'Volume',
+}
+
+
+def crear_sesion(pool=MAX_WORKERS):
+    """Sesión compartida entre hilos: reutiliza conexiones TLS y reintenta 429/5xx"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+    retry = Retry(total=3, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504),
+                  allowed_methods=('GET',))
+    adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool, max_retries=retry)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def cargar_pair_ids():
+    if PAIR_IDS_PATH.exists():
+        return json.loads(PAIR_IDS_PATH.read_text(encoding='utf-8'))
+    return {}
+
+
+def guardar_pair_ids(pair_ids):
+    DOWNLOAD_DIR.mkdir(exist_ok=True)
+    PAIR_IDS_PATH.write_text(json.dumps(pair_ids, indent=2, sort_keys=True), encoding='utf-8')
+
+
+def resolver_pair_id(session, api_url, ticker, url_pagina):
+    """Busca el id interno del instrumento cuyo URL coincide con el de la página"""
+    slug = '/' + url_pagina.split('investing.com/', 1)[-1].strip('/')
+    response = session.get(f"{api_url}/search/v2/search", params={'q': ticker}, timeout=TIMEOUT)
+    response.raise_for_status()
+    for quote in response.json().get('quotes', []):
+        if quote.get('url', '').rstrip('/') == slug:
+            return int(quote['id'])
+    raise ValueError(f"Instrumento no encontrado para {slug}")
+
+
+def parsear_historico(payload):
+    """JSON del endpoint histórico → DataFrame estándar ordenado por fecha"""
+    filas = payload.get('data') or []
+    if not filas:
+        return pd.DataFrame(columns=['fecha'] + list(CAMPOS_JSON.values()))
+    df = pd.DataFrame(filas)
+    faltantes = [c for c in CAMPOS_JSON if c not in df.columns]
+    if faltantes or 'rowDateTimestamp' not in df.columns:
+        raise ValueError(f"Respuesta sin campos esperados: {faltantes or ['rowDateTimestamp']}")
+    out = pd.DataFrame({'fecha': pd.to_datetime(df['rowDateTimestamp'], utc=True).dt.strftime('%Y-%m-%d')})
+    for campo, columna in CAMPOS_JSON.items():
+        out[columna] = pd.to_numeric(df[campo], errors='coerce')
+    out = out.dropna(subset=['Open', 'High', 'Low', 'Close'])
+    return out.drop_duplicates('fecha', keep='last').sort_values('fecha', ignore_index=True)
+
+
+def descargar_historico(session, api_url, pair_id, desde, hasta):
+    response = session.get(
+        f"{api_url}/financialdata/historical/{pair_id}",
+        params={
+            'start-date': desde.strftime('%Y-%m-%d'),
+            'end-date': hasta.strftime('%Y-%m-%d'),
+            'time-frame': 'Daily',
+            'add-missing-rows': 'false',
+        },
+        timeout=TIMEOUT,
+    )
+    response.raise_for_status()
+    return parsear_historico(response.json())
+
+
+def descargar_ticker(session, api_url, ticker, url_pagina, pair_ids, desde, hasta, escritor=None):
+    """Devuelve dict de resultado; nunca lanza (los errores van al resultado)"""
+    inicio = time.perf_counter()
+    try:
+        if ticker not in pair_ids:
+            pair_ids[ticker] = resolver_pair_id(session, api_url, ticker, url_pagina)
+        df = descargar_historico(session, api_url, pair_ids[ticker], desde, hasta)
+        if len(df) == 0:
+            return {'Ticker': ticker, 'Status': '⚠️ Sin datos', 'Datos': 0, 'Archivo': '-',
+                    'Segundos': round(time.perf_counter() - inicio, 2)}
+        filename = f"{ticker}_investing.csv"
+        if escritor is not None:  # El hilo sigue con la red; el disco lo maneja el escritor
+            escritor.escribir_csv(df, DOWNLOAD_DIR / filename, index=False, float_format='%.8f')
+        else:
+            df.to_csv(DOWNLOAD_DIR / filename, index=False, float_format='%.8f')
+        return {'Ticker': ticker, 'Status': '✅ OK', 'Datos': len(df), 'Archivo': filename,
+                'Segundos': round(time.perf_counter() - inicio, 2)}
+    except Exception as e:
+        return {'Ticker': ticker, 'Status': '❌ Error', 'Datos': 0, 'Archivo': '-',
+                'Segundos': round(time.perf_counter() - inicio, 2), 'Error': str(e)[:60]}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Históricos Investing.com sin navegador")
+    parser.add_argument('--api-url', default=API_URL, help="Base del API (servidor local para pruebas)")
+    parser.add_argument('--anios', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--sin-fallback', action='store_true', help="No usar Selenium si algo falla")
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("descarga_merval_investing")
+
+    print("="*80)
+    print("📥 DESCARGADOR MERVAL - INVESTING.COM (HTTP, SIN NAVEGADOR)")
+    print("="*80 + "\n")
+
+    fecha_fin = datetime.now()
+    fecha_inicio = fecha_fin - timedelta(days=365*args.anios)
+    print(f"📅 Período: {fecha_inicio.strftime('%Y-%m-%d')} a {fecha_fin.strftime('%Y-%m-%d')}")
+    print(f"🌐 API: {args.api_url}")
+
+    DOWNLOAD_DIR.mkdir(exist_ok=True)
+    print(f"📁 Directorio: {DOWNLOAD_DIR.absolute()}\n")
+
+    session = crear_sesion(args.workers)
+    pair_ids = cargar_pair_ids()
+    escritor = EscritorDiferido()
+
+    t0 = time.perf_counter()
+    # Las etapas se miden desde el hilo principal (cProfile es por hilo)
+    with PERFIL.etapa("http_paralelo"):
+        with ThreadPoolExecutor(max_workers=args.workers) as pool:
+            futuros = [
+                pool.submit(descargar_ticker, session, args.api_url, ticker, url, pair_ids, fecha_inicio, fecha_fin,
+                            escritor)
+                for ticker, url in ACCIONES_INVESTING.items()
+            ]
+            resultados = [f.result() for f in futuros]
+    with PERFIL.etapa("vaciar_escritura"):
+        escritor.cerrar()
+    guardar_pair_ids(pair_ids)
+
+    for r in resultados:
+        detalle = f"{r['Datos']} datos → {r['Archivo']}" if r['Status'] == '✅ OK' else r.get('Error', '')
+        print(f"   {r['Status']} {r['Ticker']:8} ({r['Segundos']:.2f}s) {detalle}")
+
+    fallidos = {r['Ticker']: ACCIONES_INVESTING[r['Ticker']] for r in resultados if r['Status'] != '✅ OK'}
+    print(f"\n✅ Exitosas: {len(resultados) - len(fallidos)}/{len(resultados)} en {time.perf_counter() - t0:.1f}s")
+    escritor.imprimir_estadisticas()
+
+    # FALLBACK: Selenium solo para lo que falló por HTTP
+    if fallidos and not args.sin_fallback:
+        print(f"\n🦊 Fallback Selenium para: {', '.join(fallidos)}\n")
+        try:
+            from descarga_merval_selenium import descargar_con_selenium
+            with PERFIL.etapa("fallback_selenium"):
+                descargar_con_selenium(fallidos, DOWNLOAD_DIR, perfil=PERFIL)
+        except ImportError:
+            print("   ⚠️  Selenium no instalado: pip install selenium webdriver-manager")
+        except Exception as e:
+            print(f"   ❌ Fallback falló: {str(e)[:60]}")
+
+    print("\n" + "="*80)
+    print("✅ DESCARGA COMPLETADA")
+    print("="*80)
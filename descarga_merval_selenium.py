@@ -2,6 +2,11 @@
 """
 Script para descargar automáticamente acciones MERVAL desde Investing.com
 Usa: Selenium + Firefox (más estable que Chrome)
+
+NOTA: La vía principal ahora es descarga_merval_investing.py (solo HTTP,
+sin navegador). Este script queda como FALLBACK y esa vía lo usa
+automáticamente para los tickers que fallen.
+
 Instala primero:
   pip install selenium
   pip install webdriver-manager
@@ -17,62 +22,57 @@ import time
 import os
 from pathlib import Path
 
-print("="*80)
-print("📥 DESCARGADOR MERVAL - SELENIUM + INVESTING.COM")
-print("="*80 + "\n")
-
-# Acciones MERVAL a descargar
-ACCIONES = {
-    "GGAL": "https://es.investing.com/equities/grupo-financiero-galicia-sa-adr",
-    "YPFD": "https://es.investing.com/equities/ypf-sociedad",
-    "BMA": "https://es.investing.com/equities/banco-macro-sa",
-    "LOMA": "https://es.investing.com/equities/loma-negra-compania-industrial",
-    "CEPU": "https://es.investing.com/equities/central-puerto-sa",
-    "EDN": "https://es.investing.com/equities/edenor-sa",
-    "SUPV": "https://es.investing.com/equities/grupo-supervielle-sa",
-    "PAMP": "https://es.investing.com/equities/pampa-energia-sa",
-    "ALUA": "https://es.investing.com/equities/aluar-aluminio-argentino-saic",
-    "BBAR": "https://es.investing.com/equities/bbva-argentina-sa",
-}
-
-# Crear carpeta para descargas
+from perfilador import Perfilador, perfilador_desde_argv
+from universo_merval import ACCIONES_INVESTING
+
+# Acciones MERVAL a descargar (ticker → URL de Investing.com)
+ACCIONES = ACCIONES_INVESTING
+
+# Carpeta para descargas
 DOWNLOAD_DIR = Path("MERVAL_Descargadas")
-DOWNLOAD_DIR.mkdir(exist_ok=True)
-
-print(f"📁 Directorio: {DOWNLOAD_DIR.absolute()}\n")
-
-# Configurar Firefox
-options = webdriver.FirefoxOptions()
-options.add_argument("--headless")  # Ejecutar sin interfaz
-options.add_argument("--no-sandbox")
-
-# Configurar descarga automática
-prefs = {
-    "browser.download.folderList": 2,
-    "browser.download.manager.showWhenStarting": False,
-    "browser.download.dir": str(DOWNLOAD_DIR.absolute()),
-    "browser.helperApps.neverAsk.saveToDisk": "text/csv,application/csv"
-}
-options.set_preference("browser.download.folderList", 2)
-options.set_preference("browser.download.manager.showWhenStarting", False)
-options.set_preference("browser.download.dir", str(DOWNLOAD_DIR.absolute()))
-
-print("Iniciando Firefox...\n")
-
-try:
-    driver = webdriver.Firefox(
-        service=FirefoxService(GeckoDriverManager().install()),
-        options=options
-    )
+
+
+def descargar_con_selenium(acciones, download_dir=DOWNLOAD_DIR, perfil=None):
+    """
+    Abre Firefox headless y hace click en la descarga de cada ticker.
+    Devuelve la lista de resultados; lanza excepción si Firefox no inicia.
+    """
+    perfil = perfil or Perfilador("descarga_merval_selenium")  # Inactivo por default
+    download_dir.mkdir(exist_ok=True)
+
+    # Configurar Firefox
+    options = webdriver.FirefoxOptions()
+    options.add_argument("--headless")  # Ejecutar sin interfaz
+    options.add_argument("--no-sandbox")
+
+    # Configurar descarga automática
+    prefs = {
+        "browser.download.folderList": 2,
+        "browser.download.manager.showWhenStarting": False,
+        "browser.download.dir": str(download_dir.absolute()),
+        "browser.helperApps.neverAsk.saveToDisk": "text/csv,application/csv"
+    }
+    options.set_preference("browser.download.folderList", 2)
+    options.set_preference("browser.download.manager.showWhenStarting", False)
+    options.set_preference("browser.download.dir", str(download_dir.absolute()))
+
+    print("Iniciando Firefox...\n")
+
+    with perfil.etapa("firefox_inicio"):
+        driver = webdriver.Firefox(
+            service=FirefoxService(GeckoDriverManager().install()),
+            options=options
+        )
     print("✅ Firefox iniciado\n")
     
     resultados = []
     
-    for ticker, url in ACCIONES.items():
+    for ticker, url in acciones.items():
         print(f"⏳ Descargando {ticker}...")
         
         try:
-            driver.get(url)
+            with perfil.etapa("driver.get"):
+                driver.get(url)
             time.sleep(2)
             
             # Busca y hace click en "Datos Históricos"
@@ -148,30 +148,44 @@ try:
             })
     
     driver.quit()
-    print("\n✅ Descargas completadas")
-    print(f"📁 Revisa la carpeta: {DOWNLOAD_DIR.absolute()}\n")
+    return resultados
     
-    # Listar archivos descargados
+
+if __name__ == "__main__":
+    PERFIL = perfilador_desde_argv("descarga_merval_selenium")  # --profile
+
     print("="*80)
-    print("ARCHIVOS DESCARGADOS:")
+    print("📥 DESCARGADOR MERVAL - SELENIUM + INVESTING.COM")
+    print("="*80 + "\n")
+
+    print(f"📁 Directorio: {DOWNLOAD_DIR.absolute()}\n")
+
+    try:
+        resultados = descargar_con_selenium(ACCIONES, perfil=PERFIL)
+        print("\n✅ Descargas completadas")
+        print(f"📁 Revisa la carpeta: {DOWNLOAD_DIR.absolute()}\n")
+
+        # Listar archivos descargados
+        print("="*80)
+        print("ARCHIVOS DESCARGADOS:")
+        print("="*80)
+
+        files = list(DOWNLOAD_DIR.glob("*.csv"))
+        if files:
+            for f in sorted(files):
+                size_kb = f.stat().st_size / 1024
+                print(f"  ✅ {f.name} ({size_kb:.1f} KB)")
+        else:
+            print("  ⚠️ No se encontraron archivos CSV")
+            print("     (Puede ser que Firefox no descargó automáticamente)")
+            print("     → Descarga manual: Click derecho → Guardar como\n")
+
+    except Exception as e:
+        print(f"❌ Error fatal: {str(e)}\n")
+        print("SOLUCIÓN:")
+        print("1. Instala Firefox: https://www.mozilla.org/firefox/")
+        print("2. Ejecuta este script de nuevo\n")
+
+    print("\n" + "="*80)
+    print("✅ SCRIPT FINALIZADO")
     print("="*80)
-    
-    files = list(DOWNLOAD_DIR.glob("*.csv"))
-    if files:
-        for f in sorted(files):
-            size_kb = f.stat().st_size / 1024
-            print(f"  ✅ {f.name} ({size_kb:.1f} KB)")
-    else:
-        print("  ⚠️ No se encontraron archivos CSV")
-        print("     (Puede ser que Firefox no descargó automáticamente)")
-        print("     → Descarga manual: Click derecho → Guardar como\n")
-    
-except Exception as e:
-    print(f"❌ Error fatal: {str(e)}\n")
-    print("SOLUCIÓN:")
-    print("1. Instala Firefox: https://www.mozilla.org/firefox/")
-    print("2. Ejecuta este script de nuevo\n")
-
-print("\n" + "="*80)
-print("✅ SCRIPT FINALIZADO")
-print("="*80)
\ No newline at end of file
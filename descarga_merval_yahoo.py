@@ -17,9 +17,17 @@ import sys
 from pathlib import Path
 import warnings
 
+from registro_universo import cargar_registro, guardar_registro_corrida, debe_omitir, registrar_exito, registrar_fallo
+from escritura_diferida import EscritorDiferido
+from perfilador import perfilador_desde_argv
+from sesion_yahoo import configurar_cache_yfinance
+
 # Silenciar FutureWarnings
 warnings.filterwarnings('ignore', category=FutureWarning)
 
+PERFIL = perfilador_desde_argv("descarga_merval_yahoo")  # --profile
+configurar_cache_yfinance()  # Cookie de yfinance persistida entre corridas
+
 print("="*80)
 print("📥 DESCARGADOR MERVAL - YAHOO FINANCE (CORREGIDO 2025)")
 print("="*80 + "\n")
@@ -61,10 +69,30 @@ print("="*80 + "\n")
 resultados = []
 delay_segundos = 1  # Delay entre descargas
 max_retries = 2     # Intentos máximos
+registro = cargar_registro()
+omitidos = []       # Tickers en cache negativo: no gastan requests, reintentos ni sleeps
+REPROBAR_TODO = '--reprobar' in sys.argv  # Ignorar el cache negativo en esta corrida
+escritor = EscritorDiferido()  # Los CSV se escriben en segundo plano (el loop no espera al disco)
 
 for ticker, nombre in ACCIONES_MERVAL.items():
     print(f"⏳ {ticker:15} ({nombre})")
     
+    if not REPROBAR_TODO and debe_omitir(registro, ticker):
+        print(f"   ⏭️ Omitido: cache negativo hasta {registro[ticker]['omitir_hasta'][:10]}\n")
+        omitidos.append(ticker)
+        resultados.append({
+            'Ticker': ticker,
+            'Nombre': nombre,
+            'Status': '⏭️ Omitido',
+            'Datos': 0,
+            'Inicio': '-',
+            'Fin': '-',
+            'Precio': '-',
+            'Var5A': '-',
+            'Archivo': '-'
+        })
+        continue
+    
     exito = False
     retry_count = 0
     
@@ -72,14 +100,15 @@ for ticker, nombre in ACCIONES_MERVAL.items():
         try:
             # SOLUCIÓN (2025): auto_adjust=False es crucial para versiones nuevas de yfinance
             # Redirect stderr to capture yfinance warnings
-            df = yf.download(
-                ticker,
-                start=fecha_inicio.strftime('%Y-%m-%d'),
-                end=fecha_fin.strftime('%Y-%m-%d'),
-                progress=False,
-                threads=False,
-                auto_adjust=False  # ← CLAVE: esto arregla el error de timezone
-            )
+            with PERFIL.etapa("yf.download"):
+                df = yf.download(
+                    ticker,
+                    start=fecha_inicio.strftime('%Y-%m-%d'),
+                    end=fecha_fin.strftime('%Y-%m-%d'),
+                    progress=False,
+                    threads=False,
+                    auto_adjust=False  # ← CLAVE: esto arregla el error de timezone
+                )
             
             if len(df) > 0:
                 # Información descargada
@@ -97,9 +126,11 @@ for ticker, nombre in ACCIONES_MERVAL.items():
                 # Guardar CSV
                 filename = f"{ticker.replace('.BA', '')}_5A.csv"
                 filepath = DOWNLOAD_DIR / filename
-                df.to_csv(filepath)
+                with PERFIL.etapa("encolar_csv"):
+                    escritor.escribir_csv(df, filepath)
                 
                 print(f"   💾 Guardado: {filename}\n")
+                registrar_exito(registro, ticker)
                 
                 resultados.append({
                     'Ticker': ticker,
@@ -122,6 +153,7 @@ for ticker, nombre in ACCIONES_MERVAL.items():
                     time.sleep(delay_segundos)
                     continue
                 else:
+                    registrar_fallo(registro, ticker, 'Sin datos')
                     resultados.append({
                         'Ticker': ticker,
                         'Nombre': nombre,
@@ -143,6 +175,7 @@ for ticker, nombre in ACCIONES_MERVAL.items():
                 time.sleep(delay_segundos)
             else:
                 print(f"   ❌ Error: {error_msg}\n")
+                registrar_fallo(registro, ticker, error_msg)
                 resultados.append({
                     'Ticker': ticker,
                     'Nombre': nombre,
@@ -161,6 +194,12 @@ for ticker, nombre in ACCIONES_MERVAL.items():
         elif exito:
             time.sleep(delay_segundos)
 
+with PERFIL.etapa("vaciar_escritura"):
+    escritor.cerrar()  # Todo en disco antes del listado de archivos
+escritor.imprimir_estadisticas()
+if not guardar_registro_corrida(registro, resultados):
+    print("⚠️  Fallaron todos los tickers (¿rate limit o red caída?): el registro no se actualiza")
+
 # Resumen final
 print("\n" + "="*80)
 print("📊 RESUMEN FINAL")
@@ -177,6 +216,10 @@ sin_datos = len([r for r in resultados if '⚠️' in r['Status']])
 print(f"\n✅ Exitosas: {exitosas}/{len(ACCIONES_MERVAL)}")
 print(f"⚠️ Sin datos: {sin_datos}/{len(ACCIONES_MERVAL)}")
 print(f"❌ Fallidas: {fallidas}/{len(ACCIONES_MERVAL)}")
+print(f"⏭️ Omitidas (cache negativo): {len(omitidos)}/{len(ACCIONES_MERVAL)}")
+if omitidos:
+    print(f"   {', '.join(omitidos)}")
+    print(f"   (Forzar re-intento: python descarga_merval_yahoo.py --reprobar)")
 
 # Listar archivos
 print(f"\n{'='*80}")
@@ -23,8 +23,22 @@ import sys
 from pathlib import Path
 import warnings
 
+from validar_datos import validar_y_reportar, imprimir_resumen
+from registro_universo import cargar_registro, guardar_registro_corrida, debe_omitir, registrar_exito, registrar_fallo
+from ajustes_corporativos import extraer_eventos, guardar_eventos, actualizar_ajustado, cargar_estado, guardar_estado
+from perfilador import perfilador_desde_argv
+from screening import guardar_snapshot
+from fundamentales_yahoo import descargar_fundamentales, campos_desde_info, fila_fundamentales, resumen_errores
+from sesion_yahoo import configurar_cache_yfinance
+from universo_merval import ACCIONES_BA  # LISTA COMPLETA: 64 ACCIONES .BA
+from escritura_diferida import EscritorDiferido
+from ejecucion_distribuida import shard_desde_argv, filtrar_shard, escribir_manifiesto
+
 warnings.filterwarnings('ignore')
 
+PERFIL = perfilador_desde_argv("descarga_merval_yahoo_completo")  # --profile
+configurar_cache_yfinance()  # Cookie de yfinance persistida entre corridas
+
 print("="*80)
 print("📥 DESCARGADOR COMPLETO - TODAS LAS ACCIONES .BA")
 print("="*80 + "\n")
@@ -34,81 +48,17 @@ fecha_inicio = fecha_fin - timedelta(days=365*5)
 
 print(f"📅 Período: {fecha_inicio.strftime('%Y-%m-%d')} a {fecha_fin.strftime('%Y-%m-%d')}\n")
 
-# LISTA COMPLETA: 64 ACCIONES .BA
-ACCIONES_BA = {
-    # MERVAL PRINCIPAL (19)
-    "GGAL.BA": "Grupo Financiero Galicia",
-    "BMA.BA": "Banco Macro",
-    "BBAR.BA": "Banco BBVA Argentina",
-    "VALO.BA": "Banco de Valores",
-    "YPFD.BA": "YPF",
-    "PAMP.BA": "Pampa Energía",
-    "EDN.BA": "Edenor",
-    "TGNO4.BA": "Transportadora Gas del Norte",
-    "TGSU2.BA": "Transportadora Gas del Sur",
-    "CEPU.BA": "Central Puerto",
-    "TRAN.BA": "Transener",
-    "METR.BA": "Metrogas",
-    "TECO2.BA": "Telecom Argentina",
-    "ALUA.BA": "Aluar",
-    "TXAR.BA": "Ternium Argentina",
-    "LOMA.BA": "Loma Negra",
-    "CELU.BA": "Celulosa Argentina",
-    "BYMA.BA": "Bolsas y Mercados Argentinos",
-    "COME.BA": "Sociedad Comercial del Plata",
-    
-    # ADICIONALES IOL/BCBA (45)
-    "A3.BA": "Matba Rofex S.A.",
-    "AGRO.BA": "Agrometal",
-    "AUSO.BA": "Autopistas del Sol",
-    "BHIP.BA": "Banco Hipotecario",
-    "BOLT.BA": "Boldt",
-    "BPAT.BA": "Banco Patagonia",
-    "CADO.BA": "Carlos Casado",
-    "CAPX.BA": "Capex",
-    "CARC.BA": "Carboclor S.A.",
-    "CECO2.BA": "Endesa Costanera",
-    "CGPA2.BA": "Camuzzi Gas Pampeana",
-    "CTIO.BA": "Consultatio",
-    "CVH.BA": "Cablevisión Holding",
-    "DGCU2.BA": "Distribuidora de Gas Cuyana",
-    "DOME.BA": "Suscripción Preferente",
-    "FERR.BA": "Ferrum",
-    "FIPL.BA": "Fiplasto",
-    "GAMI.BA": "B-Gaming S.A.",
-    "GARO.BA": "Garovaglio y Zorraquin",
-    "GBAN.BA": "Gas Natural BAN",
-    "GCDI.BA": "Gcdi S.A.",
-    "GCLA.BA": "Grupo Clarín",
-    "GRIM.BA": "Grimoldi",
-    "HARG.BA": "Holcim Argentina",
-    "HAVA.BA": "Havanna Holding",
-    "IEB.BA": "Dycasa",
-    "INTR.BA": "Compania Introductora",
-    "INVJ.BA": "Inversora Juramento",
-    "IRSA.BA": "Irsa",
-    "LEDE.BA": "Ledesma",
-    "LONG.BA": "Longvie",
-    "MERA.BA": "MERANOL S.A.C.I.",
-    "MIRG.BA": "Mirgor",
-    "MOLA.BA": "Molinos Agro S.A.",
-    "MOLI.BA": "Molinos Río De La Plata",
-    "MORI.BA": "Morixe Hermanos",
-    "OEST.BA": "Grupo Concesionario Oeste",
-    "PATA.BA": "Imp. y Exportadora de la Patagonia",
-    "PGR.BA": "Phoenix Global Resources",
-    "POLL.BA": "Polledo",
-    "RICH.BA": "Laboratorios Richmond",
-    "RIGO.BA": "Rigolleau",
-    "ROSE.BA": "Instituto Rosenbusch",
-    "SAMI.BA": "San Miguel",
-    "SEMI.BA": "Molinos Juan Semino",
-}
-
 print(f"✅ Total acciones: {len(ACCIONES_BA)}")
 print(f"   • 19 MERVAL principal")
 print(f"   • 45 adicionales IOL/BCBA\n")
 
+# Modo shard (ejecucion_distribuida.py): solo la parte del universo que toca por hash
+SHARD = shard_desde_argv()
+T_INICIO = time.time()
+if SHARD:
+    ACCIONES_BA = filtrar_shard(ACCIONES_BA, SHARD)
+    print(f"🧩 Shard {SHARD[0]}/{SHARD[1]}: {len(ACCIONES_BA)} acciones\n")
+
 DATA_DIR = Path("MERVAL_Datos_Limpio")
 FUND_DIR = Path("MERVAL_Fundamentales")
 DATA_DIR.mkdir(exist_ok=True)
@@ -122,95 +72,145 @@ print("="*80 + "\n")
 
 resultados = []
 fundamentales_list = []
+precios_descargados = {}  # Para validar calidad al final, sin re-leer los CSV
+estado_ajustes = cargar_estado()
+registro = cargar_registro()
+omitidos = []  # Tickers en cache negativo (sin datos/errores repetidos)
+REPROBAR_TODO = '--reprobar' in sys.argv  # Ignorar el cache negativo en esta corrida
+ESCRITOR = EscritorDiferido()  # Los CSV se escriben en segundo plano (el loop no espera al disco)
 
 for ticker, nombre in ACCIONES_BA.items():
     print(f"⏳ {ticker:15} ({nombre[:40]})")
     
+    if not REPROBAR_TODO and debe_omitir(registro, ticker):
+        print(f"   ⏭️  Omitido: cache negativo hasta {registro[ticker]['omitir_hasta'][:10]}\n")
+        omitidos.append(ticker)
+        resultados.append({'Ticker': ticker, 'Nombre': nombre, 'Status': '⏭️ Omitido', 'Datos': 0, 'Archivo': '-'})
+        continue
+    
     try:
-        df_precios = yf.download(
-            ticker,
-            start=fecha_inicio.strftime('%Y-%m-%d'),
-            end=fecha_fin.strftime('%Y-%m-%d'),
-            progress=False,
-            threads=False,
-            auto_adjust=False
-        )
+        with PERFIL.etapa("yf.download"):
+            df_precios = yf.download(
+                ticker,
+                start=fecha_inicio.strftime('%Y-%m-%d'),
+                end=fecha_fin.strftime('%Y-%m-%d'),
+                progress=False,
+                threads=False,
+                auto_adjust=False,
+                actions=True  # Dividendos y splits en la misma descarga (para ajustes locales)
+            )
         
         if df_precios is None or len(df_precios) == 0:
             print(f"   ⚠️  Sin datos\n")
+            registrar_fallo(registro, ticker, 'Sin datos')
             resultados.append({'Ticker': ticker, 'Nombre': nombre, 'Status': '❌ Sin datos', 'Datos': 0, 'Archivo': '-'})
             continue
         
-        # LIMPIAR CSV
-        df_precios = df_precios.reset_index()
-        if 'Date' in df_precios.columns:
-            df_precios.rename(columns={'Date': 'fecha'}, inplace=True)
+        with PERFIL.etapa("limpieza"):
+            # yfinance 0.2.48+ devuelve columnas MultiIndex (Price, Ticker): aplanar
+            if isinstance(df_precios.columns, pd.MultiIndex):
+                df_precios.columns = df_precios.columns.get_level_values(0)
+        
+            eventos = extraer_eventos(df_precios)
         
-        df_precios = df_precios[['fecha', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']]
+            # LIMPIAR CSV
+            df_precios = df_precios.reset_index()
+            if 'Date' in df_precios.columns:
+                df_precios.rename(columns={'Date': 'fecha'}, inplace=True)
         
-        # Convertir a numérico
-        for col in ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']:
-            df_precios[col] = df_precios[col].apply(lambda x: pd.to_numeric(x, errors='coerce'))
+            df_precios = df_precios[['fecha', 'Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']]
         
-        df_precios = df_precios.dropna()
-        df_precios['fecha'] = pd.to_datetime(df_precios['fecha'])
-        df_precios['fecha'] = df_precios['fecha'].dt.strftime('%Y-%m-%d')
+            # Convertir a numérico
+            for col in ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']:
+                df_precios[col] = df_precios[col].apply(lambda x: pd.to_numeric(x, errors='coerce'))
+        
+            df_precios = df_precios.dropna()
+            df_precios['fecha'] = pd.to_datetime(df_precios['fecha'])
+            df_precios['fecha'] = df_precios['fecha'].dt.strftime('%Y-%m-%d')
         
         if len(df_precios) == 0:
             print(f"   ⚠️  Sin datos después de limpiar\n")
+            registrar_fallo(registro, ticker, 'Sin datos después de limpiar')
             continue
         
         # Guardar CSV
         filename_precios = f"{ticker.replace('.BA', '')}_precios_5A.csv"
         filepath_precios = DATA_DIR / filename_precios
-        df_precios.to_csv(filepath_precios, index=False, float_format='%.8f')
+        with PERFIL.etapa("encolar_csv"):  # Bloquea solo si la cola está llena (backpressure)
+            ESCRITOR.escribir_csv(df_precios, filepath_precios, index=False, float_format='%.8f')
+        precios_descargados[ticker.replace('.BA', '')] = df_precios
+        if registrar_exito(registro, ticker):
+            print(f"   ♻️  Volvió a tener datos: sale del cache negativo")
+        
+        # Eventos corporativos + serie ajustada local (solo reescala si hay eventos nuevos)
+        with PERFIL.etapa("ajustes_corporativos"):
+            guardar_eventos(ticker.replace('.BA', ''), eventos)
+            nuevos_eventos = actualizar_ajustado(ticker.replace('.BA', ''), df_precios, estado_ajustes,
+                                                 escritor=ESCRITOR)
+        if nuevos_eventos:
+            print(f"   🧮 Ajustes: {nuevos_eventos} eventos nuevos aplicados")
         
         print(f"   ✅ Datos: {len(df_precios)} registros")
         print(f"   💾 Guardado: {filename_precios}")
         
-        # FUNDAMENTALES
-        try:
-            ticker_obj = yf.Ticker(ticker)
-            info = ticker_obj.info
-            
-            fundamentales = {
-                'Ticker': ticker,
-                'Nombre': nombre,
-                'Precio': info.get('currentPrice', 'N/A'),
-                'P/E Ratio (Trailing)': round(info.get('trailingPE', 0), 2) if info.get('trailingPE') else 'N/A',
-                'P/E Ratio (Forward)': round(info.get('forwardPE', 0), 2) if info.get('forwardPE') else 'N/A',
-                'ROE': f"{round(info.get('returnOnEquity', 0) * 100, 2)}%" if info.get('returnOnEquity') else 'N/A',
-                'ROA': f"{round(info.get('returnOnAssets', 0) * 100, 2)}%" if info.get('returnOnAssets') else 'N/A',
-                'P/B Ratio': round(info.get('priceToBook', 0), 2) if info.get('priceToBook') else 'N/A',
-                'Dividend Yield': f"{round(info.get('dividendYield', 0) * 100, 2)}%" if info.get('dividendYield') else 'N/A',
-                'Market Cap': info.get('marketCap', 'N/A'),
-                'Beta': round(info.get('beta', 0), 2) if info.get('beta') else 'N/A',
-                'EPS (Trailing)': round(info.get('trailingEps', 0), 2) if info.get('trailingEps') else 'N/A',
-                'Debt to Equity': round(info.get('debtToEquity', 0), 2) if info.get('debtToEquity') else 'N/A',
-                'Current Ratio': round(info.get('currentRatio', 0), 2) if info.get('currentRatio') else 'N/A',
-                'Quick Ratio': round(info.get('quickRatio', 0), 2) if info.get('quickRatio') else 'N/A',
-            }
-            
-            fundamentales_list.append(fundamentales)
-            print(f"   📊 P/E: {fundamentales['P/E Ratio (Trailing)']}\n")
-            
-        except Exception as e:
-            print(f"   ⚠️  Fundamentales: error\n")
+        print()
         
         resultados.append({'Ticker': ticker, 'Nombre': nombre, 'Status': '✅ OK', 'Datos': len(df_precios), 'Archivo': filename_precios})
         time.sleep(0.3)
         
     except Exception as e:
         print(f"   ❌ Error: {str(e)[:50]}\n")
+        registrar_fallo(registro, ticker, e)
         resultados.append({'Ticker': ticker, 'Nombre': nombre, 'Status': '❌ Error', 'Datos': 0, 'Archivo': '-'})
 
+# FUNDAMENTALES: quoteSummary en paralelo solo para los tickers con datos
+tickers_ok = [r['Ticker'] for r in resultados if r['Status'] == '✅ OK']
+if tickers_ok:
+    print(f"📊 Fundamentales de {len(tickers_ok)} tickers (quoteSummary en paralelo)...")
+    with PERFIL.etapa("fundamentales_bulk"):
+        fund_resultados = descargar_fundamentales(tickers_ok)
+    for ticker in tickers_ok:
+        r = fund_resultados[ticker]
+        campos = r['campos']
+        if r['error']:
+            # Fallback: .info de yfinance solo para los que fallaron completos
+            try:
+                with PERFIL.etapa("Ticker.info"):
+                    campos, r['errores'] = campos_desde_info(yf.Ticker(ticker).info)
+            except Exception as e:
+                print(f"   ⚠️  {ticker:10} Fundamentales: error ({r['error'][:40]})")
+                continue
+        fundamentales_list.append(fila_fundamentales(ticker, ACCIONES_BA[ticker], campos))
+    faltantes = resumen_errores(fund_resultados)
+    print(f"   ✅ {len(fundamentales_list)}/{len(tickers_ok)} con fundamentales")
+    if faltantes:
+        print("   ⚠️  Campos faltantes: " + ", ".join(f"{c} ({n})" for c, n in faltantes.items()))
+
 # GUARDAR FUNDAMENTALES
 if fundamentales_list:
     df_fund = pd.DataFrame(fundamentales_list)
     filename_fund = "MERVAL_Fundamentales_Completo.csv"
     filepath_fund = FUND_DIR / filename_fund
     df_fund.to_csv(filepath_fund, index=False)
-    print(f"\n📊 Fundamentales guardados: {filename_fund}\n")
+    snapshot = guardar_snapshot(df_fund)  # Copia fechada para screening histórico
+    print(f"\n📊 Fundamentales guardados: {filename_fund} (+ historico/{snapshot.name})\n")
+
+with PERFIL.etapa("vaciar_escritura"):
+    ESCRITOR.cerrar()  # Todo en disco antes del manifiesto, la validación y el listado
+ESCRITOR.imprimir_estadisticas()
+
+guardar_estado(estado_ajustes)
+if not guardar_registro_corrida(registro, resultados):
+    print("⚠️  Fallaron todos los tickers (¿rate limit o red caída?): el registro no se actualiza")
+if SHARD:
+    escribir_manifiesto(SHARD, resultados, len(fundamentales_list), T_INICIO)
+
+# VALIDAR CALIDAD (una sola pasada vectorizada sobre todo el universo)
+if precios_descargados:
+    with PERFIL.etapa("validacion"):
+        reporte_calidad, _ = validar_y_reportar(precios_descargados)
+    print()
+    imprimir_resumen(reporte_calidad)
 
 # RESUMEN
 print("\n" + "="*80)
@@ -224,6 +224,10 @@ if resultados:
     
     print(f"✅ Exitosas: {exitosas}/{len(ACCIONES_BA)}")
     print(f"❌ Fallidas: {fallidas}/{len(ACCIONES_BA)}")
+    print(f"⏭️  Omitidas (cache negativo): {len(omitidos)}/{len(ACCIONES_BA)}")
+    if omitidos:
+        print(f"   {', '.join(omitidos)}")
+        print(f"   (Forzar re-intento: python descarga_merval_yahoo_completo.py --reprobar)")
 
 # LISTAR ARCHIVOS
 print(f"\n{'='*80}")
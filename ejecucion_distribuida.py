@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""
+EJECUCIÓN DISTRIBUIDA (shards) del descargador completo + MERGE
+
+Un solo host choca con el límite de requests por IP mucho antes que con
+CPU o ancho de banda. Este modo reparte el universo en N shards por hash
+(determinístico: un ticker cae SIEMPRE en el mismo shard) y cada worker
+(proceso u host distinto) descarga solo su parte en un store propio:
+
+  MERVAL_Shards/shard_K_de_N/MERVAL_Datos_Limpio/...
+  MERVAL_Shards/shard_K_de_N/MERVAL_Fundamentales/...
+  MERVAL_Shards/shard_K_de_N/MERVAL_Shard/manifiesto.json
+
+El MERGE combina los manifiestos y las salidas en el layout canónico
+(MERVAL_Datos_Limpio, MERVAL_Fundamentales, eventos, ajustados, registro)
+y reporta el throughput de cada shard.
+
+EJECUTA:
+  # Todo local, 4 procesos en paralelo + merge
+  python ejecucion_distribuida.py local --shards 4
+
+  # Varios hosts: cada uno corre su shard, se copian las carpetas y se mergea
+  python ejecucion_distribuida.py worker --shard 0/3        # host A
+  python ejecucion_distribuida.py worker --shard 1/3        # host B
+  python ejecucion_distribuida.py worker --shard 2/3        # host C
+  rsync -a hostB:merval/MERVAL_Shards/ MERVAL_Shards/       # (idem host C)
+  python ejecucion_distribuida.py merge
+
+Cada corrida lleva un ID (MERVAL_CORRIDA) que queda en el manifiesto:
+el merge local acepta solo los shards de SU corrida, y antes de lanzar
+un worker se borran el manifiesto y las salidas viejas de ese shard (un
+worker que falla no puede colar datos de una corrida anterior). Con
+varios hosts, pasar el mismo --corrida a los workers y al merge.
+"""
+
+import argparse
+import contextlib
+from datetime import datetime
+import hashlib
+import json
+import os
+from pathlib import Path
+import shutil
+import socket
+import subprocess
+import sys
+import time
+
+import pandas as pd
+
+from esquema_fundamentales import cargar_fundamentales
+from registro_universo import cargar_registro, guardar_registro
+from sesion_yahoo import SESION_PATH
+
+SHARDS_DIR = Path("MERVAL_Shards")
+MANIFIESTO_PATH = Path("MERVAL_Shard/manifiesto.json")  # Relativo al store del shard
+SCRIPT_COMPLETO = Path(__file__).resolve().parent / "descarga_merval_yahoo_completo.py"
+
+DATA_DIR = Path("MERVAL_Datos_Limpio")
+FUND_PATH = Path("MERVAL_Fundamentales/MERVAL_Fundamentales_Completo.csv")
+EVENTOS_DIR = Path("MERVAL_Eventos")
+AJUSTADOS_DIR = Path("MERVAL_Datos_Ajustados")
+ESTADO_AJUSTES = AJUSTADOS_DIR / "estado_ajustes.json"
+REGISTRO_PATH = Path("MERVAL_Registro/registro_universo.json")
+
+
+def shard_de(ticker, n):
+    """Shard 0..n-1 por SHA-1 (estable entre procesos y hosts, a diferencia de hash())"""
+    return int(hashlib.sha1(ticker.upper().encode('utf-8')).hexdigest(), 16) % n
+
+
+def parsear_shard(texto):
+    """'K/N' → (K, N)"""
+    try:
+        k, n = (int(x) for x in texto.split('/'))
+    except ValueError:
+        raise ValueError(f"Shard inválido '{texto}': usar K/N (ej: 0/4)")
+    if n < 1 or not 0 <= k < n:
+        raise ValueError(f"Shard inválido '{texto}': K debe estar entre 0 y N-1")
+    return k, n
+
+
+def shard_desde_argv(argv=None):
+    """(K, N) si el script se ejecutó con --shard K/N; None si no"""
+    argv = sys.argv if argv is None else argv
+    if '--shard' not in argv:
+        return None
+    i = argv.index('--shard')
+    if i + 1 >= len(argv):
+        raise ValueError("Falta K/N después de --shard")
+    return parsear_shard(argv[i + 1])
+
+
+def filtrar_shard(acciones, shard):
+    """Subconjunto del universo {ticker: nombre} que le toca al shard (K, N)"""
+    if shard is None:
+        return acciones
+    k, n = shard
+    return {t: nombre for t, nombre in acciones.items() if shard_de(t, n) == k}
+
+
+def dir_shard(k, n, raiz=SHARDS_DIR):
+    return raiz / f"shard_{k}_de_{n}"
+
+
+def nueva_corrida():
+    return datetime.now().strftime('%Y%m%d-%H%M%S') + f"-{os.getpid()}"
+
+
+def limpiar_shard(k, n, raiz=SHARDS_DIR):
+    """Borra manifiesto y salidas de una corrida anterior del shard (antes de relanzarlo)"""
+    destino = dir_shard(k, n, raiz)
+    (destino / MANIFIESTO_PATH).unlink(missing_ok=True)
+    for carpeta in (DATA_DIR, FUND_PATH.parent, EVENTOS_DIR, AJUSTADOS_DIR):
+        shutil.rmtree(destino / carpeta, ignore_errors=True)
+    destino.mkdir(parents=True, exist_ok=True)
+    return destino
+
+
+def escribir_manifiesto(shard, resultados, n_fundamentales, t_inicio):
+    """Lo llama el worker al terminar (cwd = store del shard)"""
+    k, n = shard
+    fin = time.time()
+    manifiesto = {
+        'shard': k,
+        'shards': n,
+        'host': socket.gethostname(),
+        'pid': os.getpid(),
+        'corrida': os.environ.get('MERVAL_CORRIDA'),
+        'inicio': datetime.fromtimestamp(t_inicio).isoformat(timespec='seconds'),
+        'fin': datetime.fromtimestamp(fin).isoformat(timespec='seconds'),
+        'segundos': round(fin - t_inicio, 2),
+        'tickers': [r['Ticker'] for r in resultados],
+        'resultados': [{k_: r[k_] for k_ in ('Ticker', 'Status', 'Datos', 'Archivo')} for r in resultados],
+        'fundamentales': n_fundamentales,
+    }
+    MANIFIESTO_PATH.parent.mkdir(exist_ok=True)
+    MANIFIESTO_PATH.write_text(json.dumps(manifiesto, indent=2, ensure_ascii=False), encoding='utf-8')
+    return manifiesto
+
+
+def comando_worker(k, n, extra=()):
+    return [sys.executable, str(SCRIPT_COMPLETO), '--shard', f"{k}/{n}", *extra]
+
+
+def lanzar_worker(k, n, raiz=SHARDS_DIR, extra=(), log=None, corrida=None):
+    """
+    Proceso del descargador completo con cwd = store del shard. `log` es un
+    archivo abierto (lo cierra quien llama, después de wait) o None (consola).
+    """
+    destino = dir_shard(k, n, raiz)
+    destino.mkdir(parents=True, exist_ok=True)
+    # Todos los workers locales comparten la sesión Yahoo persistida (un solo handshake)
+    entorno = {**os.environ, 'MERVAL_SESION_YAHOO': str(SESION_PATH.absolute())}
+    if corrida:
+        entorno['MERVAL_CORRIDA'] = corrida
+    return subprocess.Popen(comando_worker(k, n, extra), cwd=destino, stdout=log, env=entorno,
+                            stderr=subprocess.STDOUT if log else None)
+
+
+def cargar_manifiestos(raiz=SHARDS_DIR, corrida=None, excluir=()):
+    """
+    [(store, manifiesto)] de la última N usada; valida que estén todos los shards.
+    Con `corrida` solo se aceptan manifiestos de esa corrida; los shards en
+    `excluir` (workers que fallaron) cuentan como faltantes.
+    """
+    encontrados = []
+    for path in sorted(raiz.glob(f"shard_*_de_*/{MANIFIESTO_PATH}")):
+        encontrados.append((path.parent.parent, json.loads(path.read_text(encoding='utf-8'))))
+    if corrida:
+        encontrados = [e for e in encontrados if e[1].get('corrida') == corrida]
+    if not encontrados:
+        raise FileNotFoundError(f"No hay manifiestos en {raiz}/shard_*_de_*/"
+                                + (f" de la corrida {corrida}" if corrida else ""))
+
+    # Si conviven corridas con distinto N, se usa la más reciente
+    n = max(encontrados, key=lambda e: e[1]['fin'])[1]['shards']
+    manifiestos = sorted((e for e in encontrados if e[1]['shards'] == n and e[1]['shard'] not in excluir),
+                         key=lambda e: e[1]['shard'])
+    faltantes = sorted(set(range(n)) - {m['shard'] for _, m in manifiestos})
+    return manifiestos, n, faltantes
+
+
+def _copiar(origen, destino):
+    if origen.exists():
+        destino.parent.mkdir(parents=True, exist_ok=True)
+        shutil.copy2(origen, destino)
+        return True
+    return False
+
+
+def _leer_json(path):
+    return json.loads(path.read_text(encoding='utf-8')) if path.exists() else {}
+
+
+def merge(raiz=SHARDS_DIR, orden_universo=None, corrida=None, excluir=()):
+    """
+    Combina los stores de los shards en el layout canónico (cwd).
+    Devuelve (throughput por shard, fundamentales combinados o None, shards faltantes,
+    {ticker: CSV de precios copiado}).
+    """
+    manifiestos, n, faltantes = cargar_manifiestos(raiz, corrida, excluir)
+    filas_fund = []
+    precios = {}
+    estado_ajustes = _leer_json(ESTADO_AJUSTES)
+    registro = cargar_registro()
+    throughput = []
+
+    for store, m in manifiestos:
+        ok = [r for r in m['resultados'] if r['Status'] == '✅ OK']
+        for r in ok:
+            base = r['Ticker'].replace('.BA', '')
+            _copiar(store / DATA_DIR / r['Archivo'], DATA_DIR / r['Archivo'])
+            _copiar(store / EVENTOS_DIR / f"{base}_eventos.csv", EVENTOS_DIR / f"{base}_eventos.csv")
+            _copiar(store / AJUSTADOS_DIR / f"{base}_ajustado_5A.csv", AJUSTADOS_DIR / f"{base}_ajustado_5A.csv")
+            precios[base] = DATA_DIR / r['Archivo']
+
+        # Estado de ajustes y registro: cada ticker vive en un solo shard → update sin conflictos
+        tickers_shard = set(m['tickers'])
+        estado_shard = _leer_json(store / ESTADO_AJUSTES)
+        estado_ajustes.update({t: v for t, v in estado_shard.items()
+                               if f"{t}.BA" in tickers_shard or t in tickers_shard})
+        registro_shard = _leer_json(store / REGISTRO_PATH)
+        registro.update({t: v for t, v in registro_shard.items() if t in tickers_shard})
+
+        fund_shard = store / FUND_PATH
+        if fund_shard.exists() and m['fundamentales']:
+            filas_fund.append(cargar_fundamentales(fund_shard))
+
+        filas = sum(r['Datos'] for r in ok)
+        seg = max(m['segundos'], 1e-9)
+        throughput.append({
+            'Shard': f"{m['shard']}/{n}",
+            'Host': m['host'],
+            'Tickers': len(m['tickers']),
+            'OK': len(ok),
+            'Fallidos': len(m['tickers']) - len(ok),
+            'Fundamentales': m['fundamentales'],
+            'Segundos': m['segundos'],
+            'Tickers/min': round(60 * len(m['tickers']) / seg, 1),
+            'Filas/s': round(filas / seg, 1),
+        })
+
+    if estado_ajustes:
+        ESTADO_AJUSTES.parent.mkdir(exist_ok=True)
+        ESTADO_AJUSTES.write_text(json.dumps(estado_ajustes, indent=2, sort_keys=True), encoding='utf-8')
+    guardar_registro(registro)
+
+    df_fund = None
+    if filas_fund:
+        df_fund = pd.concat(filas_fund, ignore_index=True)
+        if FUND_PATH.exists():
+            # Conservar los tickers de shards que no corrieron (o sin fundamentales nuevos)
+            previo = cargar_fundamentales(FUND_PATH)
+            df_fund = pd.concat([previo[~previo['Ticker'].isin(df_fund['Ticker'])], df_fund],
+                                ignore_index=True)
+        if orden_universo:
+            posicion = {t: i for i, t in enumerate(orden_universo)}
+            df_fund = df_fund.sort_values('Ticker', key=lambda s: s.map(posicion), ignore_index=True)
+        FUND_PATH.parent.mkdir(exist_ok=True)
+        df_fund.to_csv(FUND_PATH, index=False)
+
+    df_throughput = pd.DataFrame(throughput)
+    df_throughput.to_csv(raiz / "merge_throughput.csv", index=False)
+    return df_throughput, df_fund, faltantes, precios
+
+
+def imprimir_throughput(df_throughput, t_total=None):
+    print(df_throughput.to_string(index=False))
+    total_tickers = df_throughput['Tickers'].sum()
+    print(f"\n📊 {total_tickers} tickers en {len(df_throughput)} shards | "
+          f"OK: {df_throughput['OK'].sum()} | Fallidos: {df_throughput['Fallidos'].sum()}")
+    if t_total:
+        print(f"⏱️  Pared: {t_total:.1f}s → {60 * total_tickers / t_total:.1f} tickers/min agregados")
+    print(f"🐢 Shard más lento: {df_throughput.loc[df_throughput['Segundos'].idxmax(), 'Shard']} "
+          f"({df_throughput['Segundos'].max():.1f}s)")
+
+
+def ejecutar_merge(raiz, t_total=None, corrida=None, excluir=()):
+    from screening import guardar_snapshot
+    from universo_merval import ACCIONES_BA
+    from validar_datos import validar_y_reportar, imprimir_resumen
+
+    print("🔗 MERGE de shards → layout canónico\n")
+    df_throughput, df_fund, faltantes, precios = merge(raiz, orden_universo=list(ACCIONES_BA),
+                                                   corrida=corrida, excluir=excluir)
+    if faltantes:
+        print(f"⚠️  Faltan shards: {', '.join(map(str, faltantes))} (sus tickers no se actualizaron)\n")
+    print(f"   ✅ {len(precios)} CSVs de precios → {DATA_DIR}")
+    if df_fund is not None:
+        snapshot = guardar_snapshot(df_fund)
+        print(f"   ✅ {len(df_fund)} fundamentales → {FUND_PATH} (+ historico/{snapshot.name})")
+
+    if precios:
+        frames = {t: pd.read_csv(p) for t, p in precios.items()}
+        reporte, _ = validar_y_reportar(frames)
+        print()
+        imprimir_resumen(reporte)
+
+    print("\n" + "="*80)
+    print("⏱️  THROUGHPUT POR SHARD")
+    print("="*80 + "\n")
+    imprimir_throughput(df_throughput, t_total)
+    print(f"\n📄 {raiz / 'merge_throughput.csv'}\n")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Descarga completa repartida en shards + merge")
+    sub = parser.add_subparsers(dest='modo', required=True)
+
+    p_worker = sub.add_parser('worker', help="Correr UN shard en este host")
+    p_worker.add_argument('--shard', required=True, help="K/N (ej: 0/4)")
+
+    p_local = sub.add_parser('local', help="N procesos locales + merge")
+    p_local.add_argument('--shards', type=int, required=True)
+
+    p_merge = sub.add_parser('merge', help="Combinar los shards en el layout canónico")
+
+    for p in (p_worker, p_local, p_merge):
+        p.add_argument('--raiz', type=Path, default=SHARDS_DIR, help="Carpeta de los stores de shards")
+    for p in (p_worker, p_merge):
+        p.add_argument('--corrida', help="ID de corrida (el mismo en todos los hosts y en el merge)")
+    for p in (p_worker, p_local):
+        p.add_argument('--reprobar', action='store_true', help="Ignorar el cache negativo")
+        p.add_argument('--profile', action='store_true', help="Perfil por etapa en cada worker")
+    args = parser.parse_args()
+
+    print("="*80)
+    print("🧩 EJECUCIÓN DISTRIBUIDA - SHARDS + MERGE")
+    print("="*80 + "\n")
+
+    extra = [f for f, activo in (('--reprobar', getattr(args, 'reprobar', False)),
+                                 ('--profile', getattr(args, 'profile', False))) if activo]
+
+    if args.modo == 'worker':
+        k, n = parsear_shard(args.shard)
+        destino = limpiar_shard(k, n, args.raiz)
+        print(f"🔧 Shard {k}/{n} → {destino}" + (f" (corrida {args.corrida})" if args.corrida else "") + "\n")
+        proceso = lanzar_worker(k, n, args.raiz, extra, corrida=args.corrida)
+        sys.exit(proceso.wait())
+
+    if args.modo == 'local':
+        n = args.shards
+        print(f"🚀 {n} workers locales (logs en {args.raiz}/shard_K_de_{n}/worker.log)\n")
+        corrida = nueva_corrida()
+        t0 = time.perf_counter()
+        fallidos = []
+        with contextlib.ExitStack() as logs:
+            procesos = {}
+            for k in range(n):
+                log = logs.enter_context(open(limpiar_shard(k, n, args.raiz) / "worker.log", 'w', encoding='utf-8'))
+                procesos[k] = lanzar_worker(k, n, args.raiz, extra, log=log, corrida=corrida)
+            for k, proceso in procesos.items():
+                codigo = proceso.wait()
+                estado = '✅' if codigo == 0 else f'❌ (código {codigo})'
+                print(f"   {estado} shard {k}/{n} ({time.perf_counter() - t0:.1f}s)")
+                if codigo != 0:
+                    fallidos.append(k)
+        print()
+        try:
+            # Solo esta corrida y sin los shards que fallaron (quedan como faltantes)
+            ejecutar_merge(args.raiz, t_total=time.perf_counter() - t0, corrida=corrida, excluir=fallidos)
+        except FileNotFoundError as e:
+            print(f"❌ Error: {e}")
+            print(f"Ejecuta primero: python ejecucion_distribuida.py worker --shard 0/N")
+            exit(1)
+        if fallidos:
+            print(f"❌ Workers con error: {', '.join(f'{k}/{n}' for k in fallidos)} (merge parcial)")
+            exit(1)
+        sys.exit(0)
+
+    try:
+        ejecutar_merge(args.raiz, corrida=args.corrida)
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+        print(f"Ejecuta primero: python ejecucion_distribuida.py worker --shard 0/N")
+        exit(1)
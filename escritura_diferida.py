@@ -0,0 +1,177 @@
+"""
+ESCRITURA DIFERIDA (write-behind) para los descargadores
+
+El loop de descarga ya no espera al disco: los DataFrames se encolan y un
+hilo escritor dedicado se encarga de serializar, escribir a un archivo
+temporal y publicarlo con os.replace (nunca queda un CSV a medio escribir).
+
+  • Cola ACOTADA (backpressure): si el disco es más lento que la red, el
+    productor se bloquea en lugar de acumular DataFrames en memoria.
+  • fsync por LOTES: se escriben varios temporales y se hace fsync de
+    todos juntos (y de cada directorio una vez) antes de renombrarlos.
+    El lote se cierra al llegar a FSYNC_LOTE archivos o cuando la cola
+    queda vacía.
+  • Reporta profundidad máxima de la cola, lag del escritor (encolado →
+    archivo publicado) y tiempo que el productor estuvo frenado.
+
+Uso:
+    escritor = EscritorDiferido()
+    escritor.escribir_csv(df, path, index=False)     # No bloquea (salvo cola llena)
+    ...
+    escritor.cerrar()                                 # Espera a que todo esté en disco
+    escritor.imprimir_estadisticas()
+
+El DataFrame encolado no debe modificarse después (se serializa más tarde).
+"""
+
+import os
+from pathlib import Path
+import queue
+import threading
+import time
+
+CAPACIDAD = 8          # DataFrames en vuelo como máximo
+FSYNC_LOTE = 16        # Archivos por fsync en lote
+
+
+class EscritorDiferido:
+    def __init__(self, capacidad=CAPACIDAD, fsync_lote=FSYNC_LOTE, fsync=True):
+        self.cola = queue.Queue(maxsize=capacidad)
+        self.fsync_lote = fsync_lote
+        self.fsync = fsync
+        self.lote = []  # [(tmp, destino, t_encolado)] escritos pero no publicados
+        self.secuencia = 0
+
+        self.escritos = 0
+        self.bytes = 0
+        self.lotes = 0
+        self.errores = []
+        self.profundidad_max = 0
+        self.lag_total = 0.0
+        self.lag_max = 0.0
+        self.espera_productor = 0.0  # Segundos frenado por cola llena (backpressure)
+        self.lock = threading.Lock()
+
+        self.hilo = threading.Thread(target=self._loop, name="escritor-diferido", daemon=True)
+        self.hilo.start()
+        self.cerrado = False
+
+    # ------------------------------------------------------------------ productor
+
+    def _encolar(self, item):
+        if self.cerrado:
+            raise RuntimeError("EscritorDiferido ya cerrado")
+        inicio = time.perf_counter()
+        self.cola.put(item)  # Bloquea si la cola está llena
+        espera = time.perf_counter() - inicio
+        with self.lock:
+            self.espera_productor += espera
+            self.profundidad_max = max(self.profundidad_max, self.cola.qsize())
+
+    def escribir_csv(self, df, path, **kwargs):
+        """Encola df.to_csv(path, **kwargs)"""
+        self._encolar(('csv', df, Path(path), kwargs, time.perf_counter()))
+
+    def escribir_texto(self, texto, path):
+        self._encolar(('texto', texto, Path(path), None, time.perf_counter()))
+
+    def vaciar(self):
+        """Bloquea hasta que todo lo encolado esté publicado en disco"""
+        listo = threading.Event()
+        self._encolar(('vaciar', listo, None, None, None))
+        listo.wait()
+
+    def cerrar(self):
+        if self.cerrado:
+            return
+        self.vaciar()
+        self.cerrado = True
+        self.cola.put(None)
+        self.hilo.join()
+
+    # ------------------------------------------------------------------ escritor
+
+    def _loop(self):
+        while True:
+            item = self.cola.get()
+            if item is None:
+                self._publicar_lote()
+                return
+            tipo, dato, destino, kwargs, t_encolado = item
+            if tipo == 'vaciar':
+                self._publicar_lote()
+                dato.set()
+                continue
+            # Temporal único por item: el mismo destino puede repetirse dentro de un lote
+            self.secuencia += 1
+            tmp = destino.with_name(f".{destino.name}.{self.secuencia}.tmp")
+            try:
+                destino.parent.mkdir(parents=True, exist_ok=True)
+                if tipo == 'csv':
+                    dato.to_csv(tmp, **kwargs)
+                else:
+                    tmp.write_text(dato, encoding='utf-8')
+                self.lote.append((tmp, destino, t_encolado))
+            except Exception as e:
+                self.errores.append((str(destino), str(e)[:80]))
+                tmp.unlink(missing_ok=True)  # No dejar temporales a medio escribir
+            # Con cola vacía no hay nada más que agrupar: se publica ya (lag mínimo)
+            if len(self.lote) >= self.fsync_lote or self.cola.empty():
+                self._publicar_lote()
+
+    def _publicar_lote(self):
+        if not self.lote:
+            return
+        directorios = set()
+        for tmp, destino, t_encolado in self.lote:
+            try:
+                if self.fsync:
+                    with open(tmp, 'rb') as f:
+                        os.fsync(f.fileno())
+                self.bytes += tmp.stat().st_size
+                os.replace(tmp, destino)
+                directorios.add(destino.parent)
+                lag = time.perf_counter() - t_encolado
+                self.escritos += 1
+                self.lag_total += lag
+                self.lag_max = max(self.lag_max, lag)
+            except OSError as e:
+                self.errores.append((str(destino), str(e)[:80]))
+                tmp.unlink(missing_ok=True)
+        if self.fsync and hasattr(os, 'O_DIRECTORY'):  # El rename también tiene que ser durable
+            for directorio in directorios:
+                try:
+                    fd = os.open(directorio, os.O_RDONLY | os.O_DIRECTORY)
+                    try:
+                        os.fsync(fd)
+                    finally:
+                        os.close(fd)
+                except OSError:
+                    pass
+        self.lotes += 1
+        self.lote = []
+
+    # ------------------------------------------------------------------ reporte
+
+    def estadisticas(self):
+        return {
+            'escritos': self.escritos,
+            'mb': round(self.bytes / 1e6, 2),
+            'lotes_fsync': self.lotes,
+            'profundidad_actual': self.cola.qsize(),
+            'profundidad_max': self.profundidad_max,
+            'capacidad': self.cola.maxsize,
+            'lag_medio_ms': round(1000 * self.lag_total / self.escritos, 1) if self.escritos else 0.0,
+            'lag_max_ms': round(1000 * self.lag_max, 1),
+            'espera_productor_s': round(self.espera_productor, 3),
+            'errores': len(self.errores),
+        }
+
+    def imprimir_estadisticas(self):
+        e = self.estadisticas()
+        print(f"💾 Escritura diferida: {e['escritos']} archivos ({e['mb']} MB) en {e['lotes_fsync']} lotes fsync"
+              f" | cola máx {e['profundidad_max']}/{e['capacidad']}"
+              f" | lag medio {e['lag_medio_ms']} ms (máx {e['lag_max_ms']} ms)"
+              f" | productor frenado {e['espera_productor_s']}s")
+        for destino, error in self.errores:
+            print(f"   ❌ {destino}: {error}")
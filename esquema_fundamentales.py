@@ -0,0 +1,96 @@
+"""
+ESQUEMA TIPADO de MERVAL_Fundamentales_Completo.csv
+
+Todas las columnas numéricas son float64 con NaN reales (celda vacía en
+el CSV). Los ratios se guardan como FRACCIÓN:
+
+  ROE 0.125 = 12.5%   |   Dividend Yield 0.045 = 4.5%   |   Debt to Equity 0.45
+
+(Yahoo entrega debtToEquity en %: 45.0 → se guarda 0.45)
+
+El formato ("12.5%", "N/A") se aplica solo al mostrar: formatear_fundamentales().
+
+Los CSV viejos (strings "12.5%", 'N/A', D/E en %) se convierten al cargar.
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+FUND_PATH = Path("MERVAL_Fundamentales/MERVAL_Fundamentales_Completo.csv")
+
+ESQUEMA = {
+    'Ticker': 'string',
+    'Nombre': 'string',
+    'Precio': 'float64',
+    'P/E Ratio (Trailing)': 'float64',
+    'P/E Ratio (Forward)': 'float64',
+    'ROE': 'float64',
+    'ROA': 'float64',
+    'P/B Ratio': 'float64',
+    'Dividend Yield': 'float64',
+    'Market Cap': 'float64',
+    'Beta': 'float64',
+    'EPS (Trailing)': 'float64',
+    'Debt to Equity': 'float64',
+    'Current Ratio': 'float64',
+    'Quick Ratio': 'float64',
+}
+
+COLUMNAS_NUMERICAS = [c for c, t in ESQUEMA.items() if t == 'float64']
+COLUMNAS_PORCENTAJE = ['ROE', 'ROA', 'Dividend Yield']
+
+
+def _convertir_legado(df):
+    """CSV con strings de presentación → esquema tipado (solo para archivos viejos)"""
+    for col in COLUMNAS_NUMERICAS:
+        if col not in df.columns:
+            continue
+        texto = df[col].astype('string')
+        es_pct = texto.str.contains('%', regex=False).fillna(False)
+        valores = pd.to_numeric(texto.str.replace('%', '', regex=False), errors='coerce')
+        if col == 'Debt to Equity':
+            valores = valores / 100  # Yahoo lo entrega en %, sin el signo
+        else:
+            valores = valores.where(~es_pct, valores / 100)
+        df[col] = valores.astype('float64')
+    return df
+
+
+def cargar_fundamentales(path=FUND_PATH):
+    """DataFrame con dtypes fijos; sin parseo celda por celda"""
+    columnas = pd.read_csv(path, nrows=0).columns
+    dtypes = {c: t for c, t in ESQUEMA.items() if c in columnas}
+    try:
+        df = pd.read_csv(path, dtype=dtypes, keep_default_na=False, na_values=[''])
+    except ValueError:
+        df = _convertir_legado(pd.read_csv(path, dtype='string', keep_default_na=False))
+        df = df.astype({c: t for c, t in dtypes.items() if t == 'string'})
+    return df
+
+
+def fila_vacia(ticker, nombre):
+    fila = {c: np.nan for c in COLUMNAS_NUMERICAS}
+    fila.update({'Ticker': ticker, 'Nombre': nombre})
+    return fila
+
+
+def formato_valor(columna, valor):
+    """Un valor tipado → texto para pantalla"""
+    if valor is None or pd.isna(valor):
+        return 'N/A'
+    if columna in COLUMNAS_PORCENTAJE:
+        return f"{valor * 100:.2f}%"
+    if columna == 'Market Cap':
+        return f"{valor:,.0f}"
+    return f"{valor:.2f}"
+
+
+def formatear_fundamentales(df):
+    """Copia para mostrar (to_string / Excel); el DataFrame original queda numérico"""
+    salida = df.copy()
+    for col in COLUMNAS_NUMERICAS:
+        if col in salida.columns:
+            salida[col] = [formato_valor(col, v) for v in salida[col].to_numpy()]
+    return salida
@@ -0,0 +1,101 @@
+"""
+ESTADO del último análisis (modo --incremental de analizar_y_recomendar.py)
+
+Por ticker se guarda la huella (hash) de su fila de fundamentales, el
+score y los detalles. En la corrida siguiente solo se vuelven a puntuar
+los tickers cuya huella cambió (o que son nuevos); el resto reutiliza el
+score guardado.
+
+Si cambian las reglas de calculo_score.py, el estado guardado deja de
+valer (VERSION_SCORE) y se puntúa todo de nuevo.
+
+  MERVAL_Analisis_Estado.json
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+import pandas as pd
+
+import calculo_score
+from calculo_score import calcular_score, rating
+from esquema_fundamentales import ESQUEMA
+
+ESTADO_PATH = Path("MERVAL_Analisis_Estado.json")
+CAMBIOS_PATH = Path("MERVAL_Analisis_Cambios.csv")
+
+VERSION_SCORE = hashlib.sha1(Path(calculo_score.__file__).read_bytes()).hexdigest()[:12]
+
+
+def huellas(df):
+    """{ticker: hash de la fila} (vectorizado, todas las columnas del esquema)"""
+    columnas = [c for c in ESQUEMA if c in df.columns]
+    valores = pd.util.hash_pandas_object(df[columnas], index=False).to_numpy()
+    return {t: format(int(h), '016x') for t, h in zip(df['Ticker'], valores)}
+
+
+def cargar_estado(path=ESTADO_PATH):
+    """(estado por ticker, motivo si hay que puntuar todo)"""
+    if not path.exists():
+        return {}, "sin estado previo"
+    try:
+        estado = json.loads(path.read_text(encoding='utf-8'))
+    except (OSError, json.JSONDecodeError):
+        return {}, "estado ilegible"
+    if estado.get('version') != VERSION_SCORE:
+        return {}, "cambiaron las reglas de score"
+    return estado.get('tickers', {}), None
+
+
+def guardar_estado(tickers, path=ESTADO_PATH):
+    tmp = path.with_suffix('.json.tmp')
+    tmp.write_text(json.dumps({'version': VERSION_SCORE, 'tickers': tickers}, ensure_ascii=False),
+                   encoding='utf-8')
+    os.replace(tmp, path)
+
+
+def puntuar(df, previos=None):
+    """
+    Scores de df reutilizando los de `previos` cuando la huella coincide.
+    Devuelve (estado nuevo, tickers re-puntuados, tickers eliminados)
+    """
+    previos = previos or {}
+    huella = huellas(df)
+    cambiados = [t for t, h in huella.items() if previos.get(t, {}).get('hash') != h]
+    eliminados = [t for t in previos if t not in huella]
+
+    nuevo = {t: previos[t] for t in huella if t not in set(cambiados)}
+    filas = df[df['Ticker'].isin(cambiados)].to_dict('records')
+    for row in filas:
+        score, detalles = calcular_score(row)
+        nuevo[row['Ticker']] = {'hash': huella[row['Ticker']], 'score': score, 'detalles': detalles}
+    return nuevo, cambiados, eliminados
+
+
+def diff_ratings(previos, nuevo, cambiados, eliminados):
+    """DataFrame con los tickers que cambiaron de score o de rating"""
+    filas = []
+    for t in cambiados:
+        antes = previos.get(t)
+        score = nuevo[t]['score']
+        if antes is not None and antes['score'] == score:
+            continue
+        filas.append({
+            'Ticker': t,
+            'Score Anterior': antes['score'] if antes else None,
+            'Score Nuevo': score,
+            'Rating Anterior': rating(antes['score']) if antes else 'NUEVO',
+            'Rating Nuevo': rating(score),
+        })
+    for t in eliminados:
+        filas.append({
+            'Ticker': t,
+            'Score Anterior': previos[t]['score'],
+            'Score Nuevo': None,
+            'Rating Anterior': rating(previos[t]['score']),
+            'Rating Nuevo': 'ELIMINADO',
+        })
+    columnas = ['Ticker', 'Score Anterior', 'Score Nuevo', 'Rating Anterior', 'Rating Nuevo']
+    return pd.DataFrame(filas, columns=columnas)
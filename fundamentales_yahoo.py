@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+FUNDAMENTALES YAHOO en bloque (quoteSummary, en paralelo)
+
+En vez de un yf.Ticker(t).info por ticker (que trae el dict completo,
+cientos de campos), se piden SOLO los módulos de quoteSummary que usamos:
+
+  price, summaryDetail, defaultKeyStatistics, financialData
+
+para muchos tickers a la vez sobre una sesión HTTP compartida (cookie +
+crumb persistidos entre corridas, ver sesion_yahoo.py). Cada campo se extrae tipado (float) y
+los errores se reportan POR CAMPO: un dato faltante ya no descarta al
+ticker entero. Las filas siguen el esquema tipado de esquema_fundamentales.py.
+
+EJECUTA:
+  python fundamentales_yahoo.py                       # Todo el universo .BA
+  python fundamentales_yahoo.py --tickers GGAL.BA,BMA.BA --workers 8
+"""
+
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+import math
+import time
+
+import pandas as pd
+
+from esquema_fundamentales import fila_vacia
+from perfilador import perfilador_desde_argv
+from sesion_yahoo import MAX_WORKERS, ErrorYahoo, SesionYahoo
+
+QUOTE_SUMMARY_URL = "https://query2.finance.yahoo.com/v10/finance/quoteSummary/{ticker}"
+
+MODULOS = ['price', 'summaryDetail', 'defaultKeyStatistics', 'financialData']
+
+# Campo (mismo nombre que en .info) → módulos donde buscarlo, en orden de preferencia
+CAMPOS = {
+    'currentPrice': ['financialData', 'price:regularMarketPrice'],
+    'trailingPE': ['summaryDetail'],
+    'forwardPE': ['summaryDetail', 'defaultKeyStatistics'],
+    'returnOnEquity': ['financialData'],
+    'returnOnAssets': ['financialData'],
+    'priceToBook': ['defaultKeyStatistics'],
+    'dividendYield': ['summaryDetail'],
+    'marketCap': ['price', 'summaryDetail'],
+    'beta': ['summaryDetail', 'defaultKeyStatistics'],
+    'trailingEps': ['defaultKeyStatistics'],
+    'debtToEquity': ['financialData'],
+    'currentRatio': ['financialData'],
+    'quickRatio': ['financialData'],
+}
+
+
+def extraer_campos(resultado):
+    """
+    Módulos de quoteSummary → ({campo: float o None}, {campo: motivo del faltante})
+    Los valores vienen como {'raw': 1.23, 'fmt': '1.23'} o {} si Yahoo no lo tiene.
+    """
+    valores, errores = {}, {}
+    for campo, fuentes in CAMPOS.items():
+        valor, motivo = None, 'módulo ausente'
+        for fuente in fuentes:
+            modulo, _, clave = fuente.partition(':')
+            datos = resultado.get(modulo)
+            if not isinstance(datos, dict):
+                continue
+            crudo = datos.get(clave or campo)
+            if isinstance(crudo, dict):
+                crudo = crudo.get('raw')
+            if crudo is None:
+                motivo = 'sin dato'
+                continue
+            try:
+                valor = float(crudo)
+            except (TypeError, ValueError):
+                motivo = f"tipo inválido: {str(crudo)[:20]}"
+                continue
+            if not math.isfinite(valor):
+                valor, motivo = None, 'no finito'
+                continue
+            break
+        valores[campo] = valor
+        if valor is None:
+            errores[campo] = motivo
+    return valores, errores
+
+
+def campos_desde_info(info):
+    """Mismos campos tipados a partir de un dict .info (fallback vía yfinance)"""
+    valores, errores = {}, {}
+    for campo in CAMPOS:
+        crudo = info.get(campo)
+        try:
+            valor = float(crudo) if crudo is not None else None
+        except (TypeError, ValueError):
+            valor = None
+        if valor is not None and not math.isfinite(valor):
+            valor = None
+        if campo == 'dividendYield' and valor is not None:
+            valor /= 100  # .info lo entrega en porcentaje (yfinance 0.2.54+, requirements.txt); quoteSummary en fracción
+        valores[campo] = valor
+        if valor is None:
+            errores[campo] = 'sin dato' if crudo is None else f"tipo inválido: {str(crudo)[:20]}"
+    return valores, errores
+
+
+def descargar_uno(sesion, ticker):
+    """Devuelve dict de resultado; nunca lanza (el error va en 'error')"""
+    inicio = time.perf_counter()
+    resultado = {'ticker': ticker, 'campos': {}, 'errores': {}, 'error': None}
+    try:
+        response = sesion.get(QUOTE_SUMMARY_URL.format(ticker=ticker), {'modules': ','.join(MODULOS)})
+        payload = response.json().get('quoteSummary', {})
+        if payload.get('error'):
+            raise ErrorYahoo(payload['error'].get('description') or payload['error'].get('code'))
+        response.raise_for_status()
+        modulos = (payload.get('result') or [None])[0]
+        if not modulos:
+            raise ErrorYahoo("Respuesta vacía")
+        resultado['campos'], resultado['errores'] = extraer_campos(modulos)
+    except Exception as e:
+        resultado['error'] = str(e)[:80]
+    resultado['segundos'] = round(time.perf_counter() - inicio, 2)
+    return resultado
+
+
+def descargar_fundamentales(tickers, workers=MAX_WORKERS, sesion=None):
+    """{ticker: resultado} para todos los tickers, en paralelo sobre una sesión"""
+    sesion = sesion or SesionYahoo(pool=workers)
+    try:
+        sesion.renovar_crumb()
+    except Exception as e:
+        return {t: {'ticker': t, 'campos': {}, 'errores': {}, 'error': f"Handshake: {str(e)[:60]}",
+                    'segundos': 0.0} for t in tickers}
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return dict(zip(tickers, pool.map(lambda t: descargar_uno(sesion, t), tickers)))
+
+
+# Campo de Yahoo → columna del CSV (esquema tipado en esquema_fundamentales.py)
+COLUMNAS = {
+    'currentPrice': 'Precio',
+    'trailingPE': 'P/E Ratio (Trailing)',
+    'forwardPE': 'P/E Ratio (Forward)',
+    'returnOnEquity': 'ROE',
+    'returnOnAssets': 'ROA',
+    'priceToBook': 'P/B Ratio',
+    'dividendYield': 'Dividend Yield',
+    'marketCap': 'Market Cap',
+    'beta': 'Beta',
+    'trailingEps': 'EPS (Trailing)',
+    'debtToEquity': 'Debt to Equity',
+    'currentRatio': 'Current Ratio',
+    'quickRatio': 'Quick Ratio',
+}
+
+
+def fila_fundamentales(ticker, nombre, campos):
+    """Fila tipada de MERVAL_Fundamentales_Completo.csv (floats, NaN si falta)"""
+    fila = fila_vacia(ticker, nombre)
+    for campo, columna in COLUMNAS.items():
+        valor = campos.get(campo)
+        if valor is not None:
+            fila[columna] = valor
+    if campos.get('debtToEquity') is not None:
+        fila['Debt to Equity'] = campos['debtToEquity'] / 100  # Yahoo lo da en %, se guarda como fracción
+    return fila
+
+
+def resumen_errores(resultados):
+    """Conteo de faltantes por campo (solo tickers que respondieron)"""
+    conteo = {}
+    for r in resultados.values():
+        for campo in r['errores']:
+            conteo[campo] = conteo.get(campo, 0) + 1
+    return dict(sorted(conteo.items(), key=lambda kv: -kv[1]))
+
+
+if __name__ == "__main__":
+    from screening import FUND_DIR, FUND_PATH, guardar_snapshot
+    from universo_merval import ACCIONES_BA
+
+    parser = argparse.ArgumentParser(description="Fundamentales Yahoo en bloque (quoteSummary)")
+    parser.add_argument('--tickers', help="Lista separada por comas (default: universo .BA completo)")
+    parser.add_argument('--workers', type=int, default=MAX_WORKERS)
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("fundamentales_yahoo")
+
+    print("="*80)
+    print("📊 FUNDAMENTALES YAHOO - QUOTESUMMARY EN PARALELO")
+    print("="*80 + "\n")
+
+    tickers = [t.strip().upper() for t in args.tickers.split(',')] if args.tickers else list(ACCIONES_BA)
+    print(f"📋 {len(tickers)} tickers | {args.workers} workers | módulos: {', '.join(MODULOS)}\n")
+
+    t0 = time.perf_counter()
+    sesion = SesionYahoo(pool=args.workers)
+    print(f"🔑 Sesión Yahoo: {'reutilizada del cache' if sesion.desde_cache else 'handshake nuevo'}\n")
+    with PERFIL.etapa("quoteSummary_paralelo"):
+        resultados = descargar_fundamentales(tickers, args.workers, sesion)
+
+    filas = []
+    for ticker in tickers:
+        r = resultados[ticker]
+        if r['error']:
+            print(f"   ❌ {ticker:10} {r['error']}")
+            continue
+        filas.append(fila_fundamentales(ticker, ACCIONES_BA.get(ticker, ticker), r['campos']))
+        faltan = f" | faltan: {', '.join(r['errores'])}" if r['errores'] else ''
+        print(f"   ✅ {ticker:10} ({r['segundos']:.2f}s) {len(CAMPOS) - len(r['errores'])}/{len(CAMPOS)} campos{faltan}")
+
+    print(f"\n✅ Con fundamentales: {len(filas)}/{len(tickers)} en {time.perf_counter() - t0:.1f}s")
+    errores = resumen_errores(resultados)
+    if errores:
+        print("⚠️  Campos faltantes: " + ", ".join(f"{c} ({n})" for c, n in errores.items()))
+
+    if filas:
+        FUND_DIR.mkdir(exist_ok=True)
+        df_fund = pd.DataFrame(filas)
+        with PERFIL.etapa("to_csv"):
+            df_fund.to_csv(FUND_PATH, index=False)
+            snapshot = guardar_snapshot(df_fund)
+        print(f"\n📄 Guardado: {FUND_PATH} (+ historico/{snapshot.name})\n")
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""
+ÍNDICE MERVAL SINTÉTICO reconstruido desde sus constituyentes
+
+Con la matriz de precios alineada (matriz_precios.py) arma un índice de
+precios con canasta de UNIDADES (estilo divisor):
+
+  nivel_t = Σ unidades_i × precio_i,t
+
+En cada fecha de rebalanceo las unidades se recalculan para que los pesos
+sean los objetivo SIN saltos en el nivel:
+
+  unidades_i = peso_i × nivel_r / precio_i,r
+
+Entre rebalanceos todo es vectorizado sobre el bloque de días. La
+contribución diaria de cada constituyente (en puntos del índice) es
+unidades_i × Δprecio_i; suman exactamente la variación del índice.
+
+Pesos (MERVAL_Indice/config_indice.json, opcional):
+  metodo:      mcap | free_float | igual | manual
+  rebalanceo:  mensual | trimestral | semestral | anual | ["2024-01-02", ...]
+  tope:        peso máximo por acción (ej. 0.15), el excedente se reparte
+  acciones / free_float / pesos: overrides por ticker
+
+Las acciones en circulación salen de Market Cap / Precio de
+MERVAL_Fundamentales_Completo.csv (se asumen constantes en la historia).
+
+El estado (unidades, nivel, última fecha) se guarda en
+MERVAL_Indice/estado.npz: cada corrida procesa solo los días nuevos.
+
+Genera:
+  MERVAL_Indice/indice_diario.csv        → fecha, nivel, variación, rebalanceo
+  MERVAL_Indice/contribuciones.csv       → fechas × tickers (puntos del índice)
+  MERVAL_Indice/pesos_rebalanceo.csv     → pesos y unidades en cada rebalanceo
+
+EJECUTA:
+  python indice_merval.py
+  python indice_merval.py --reconstruir --metodo free_float
+  python indice_merval.py --oficial MERV_precios_5A.csv      # Compara con el índice oficial
+"""
+
+import argparse
+import hashlib
+import json
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from esquema_fundamentales import FUND_PATH, cargar_fundamentales
+from matriz_precios import cargar_matriz_precios
+from perfilador import perfilador_desde_argv
+from universo_merval import MERVAL_PRINCIPAL
+
+warnings.filterwarnings('ignore')
+
+INDICE_DIR = Path("MERVAL_Indice")
+CONFIG_PATH = INDICE_DIR / "config_indice.json"
+ESTADO_PATH = INDICE_DIR / "estado.npz"
+DIARIO_PATH = INDICE_DIR / "indice_diario.csv"
+CONTRIBUCIONES_PATH = INDICE_DIR / "contribuciones.csv"
+PESOS_PATH = INDICE_DIR / "pesos_rebalanceo.csv"
+
+CONFIG_DEFAULT = {
+    'constituyentes': MERVAL_PRINCIPAL,
+    'metodo': 'mcap',
+    'rebalanceo': 'trimestral',
+    'tope': None,
+    'base': 1000.0,
+    'acciones': {},
+    'free_float': {},
+    'pesos': {},
+}
+
+METODOS = ['mcap', 'free_float', 'igual', 'manual']
+FRECUENCIAS = {'mensual': 1, 'trimestral': 3, 'semestral': 6, 'anual': 12}  # Meses
+
+
+def cargar_config(path=CONFIG_PATH, **overrides):
+    config = dict(CONFIG_DEFAULT)
+    if path.exists():
+        config.update(json.loads(path.read_text(encoding='utf-8')))
+    config.update({k: v for k, v in overrides.items() if v is not None})
+    if config['metodo'] not in METODOS:
+        raise ValueError(f"Método desconocido: {config['metodo']} (usa {', '.join(METODOS)})")
+    reb = config['rebalanceo']
+    if not isinstance(reb, list) and reb not in FRECUENCIAS:
+        raise ValueError(f"Rebalanceo desconocido: {reb} (usa {', '.join(FRECUENCIAS)} o lista de fechas)")
+    return config
+
+
+def huella_config(config):
+    """Hash de todo lo que cambia la historia del índice (si cambia → reconstruir)"""
+    texto = json.dumps(config, sort_keys=True, default=str)
+    return hashlib.sha1(texto.encode('utf-8')).hexdigest()[:12]
+
+
+def acciones_en_circulacion(tickers, config):
+    """Market Cap / Precio de los fundamentales (o el override de la config)"""
+    acciones = np.full(len(tickers), np.nan)
+    if FUND_PATH.exists():
+        df = cargar_fundamentales().set_index('Ticker')
+        for i, t in enumerate(tickers):
+            clave = f"{t}.BA"
+            if clave in df.index:
+                acciones[i] = df.at[clave, 'Market Cap'] / df.at[clave, 'Precio']
+    for i, t in enumerate(tickers):
+        valor = config['acciones'].get(t, config['acciones'].get(f"{t}.BA"))
+        if valor is not None:
+            acciones[i] = valor
+    return acciones
+
+
+def _por_ticker(tickers, mapa, default):
+    return np.array([float(mapa.get(t, mapa.get(f"{t}.BA", default))) for t in tickers])
+
+
+def aplicar_tope(pesos, tope):
+    """Recorta pesos > tope y reparte el excedente proporcionalmente entre el resto"""
+    pesos = pesos.copy()
+    for _ in range(len(pesos)):
+        exceso = pesos > tope + 1e-12
+        if not exceso.any():
+            break
+        sobrante = (pesos[exceso] - tope).sum()
+        pesos[exceso] = tope
+        libres = (pesos > 0) & (pesos < tope - 1e-12)
+        if not libres.any():
+            break
+        pesos[libres] += sobrante * pesos[libres] / pesos[libres].sum()
+    return pesos
+
+
+class MotorIndice:
+    def __init__(self, tickers, config):
+        n = len(tickers)
+        self.tickers = list(tickers)
+        self.config = config
+        self.huella = huella_config(config)
+        self.ultima_fecha = None
+        self.nivel = float(config['base'])
+        self.unidades = np.zeros(n)
+        self.ultimo_precio = np.full(n, np.nan)  # Para arrastrar (ffill) entre corridas
+        self.acciones = np.full(n, np.nan)
+
+    # ------------------------------------------------------------------ pesos
+
+    def pesos_objetivo(self, precios):
+        metodo = self.config['metodo']
+        if metodo == 'igual':
+            base = np.ones(len(self.tickers))
+        elif metodo == 'manual':
+            base = _por_ticker(self.tickers, self.config['pesos'], 0.0)
+        else:
+            base = self.acciones * precios
+            if metodo == 'free_float':
+                base = base * _por_ticker(self.tickers, self.config['free_float'], 1.0)
+        base = np.where(np.isfinite(base) & np.isfinite(precios) & (precios > 0), base, 0.0)
+        if base.sum() <= 0:
+            return base
+        pesos = base / base.sum()
+        if self.config['tope']:
+            pesos = aplicar_tope(pesos, float(self.config['tope']))
+        return pesos
+
+    def es_rebalanceo(self, fechas):
+        """Máscara de días de rebalanceo entre las fechas nuevas (el primer día siempre)"""
+        previas = np.concatenate([[np.datetime64(self.ultima_fecha or '1900-01-01', 'ns')],
+                                  fechas.values[:-1]])
+        reb = self.config['rebalanceo']
+        if isinstance(reb, list):
+            marcas = np.sort(pd.to_datetime(reb).values)
+            mascara = (np.searchsorted(marcas, fechas.values, side='right')
+                       > np.searchsorted(marcas, previas, side='right'))
+        else:
+            meses = FRECUENCIAS[reb]
+            previas = pd.DatetimeIndex(previas)
+            periodo = (fechas.year * 12 + fechas.month - 1) // meses
+            mascara = np.asarray(periodo != (previas.year * 12 + previas.month - 1) // meses)
+        if self.ultima_fecha is None:
+            mascara[0] = True
+        return mascara
+
+    # ------------------------------------------------------------------ proceso
+
+    def procesar(self, matriz):
+        """
+        Incorpora los días de `matriz` (columnas = self.tickers) posteriores a la
+        última fecha. Devuelve (diario, contribuciones, pesos) de esos días.
+        """
+        if self.ultima_fecha is not None:
+            matriz = matriz[matriz.index > self.ultima_fecha]
+        if matriz.empty:
+            return pd.DataFrame(), pd.DataFrame(), pd.DataFrame()
+
+        # Último precio conocido (ffill) también a través de corridas anteriores
+        arrastre = pd.DataFrame([self.ultimo_precio], columns=self.tickers)
+        valores = pd.concat([arrastre, matriz.reset_index(drop=True)]).ffill().to_numpy(dtype=float)
+        previos, valores = valores[:-1], valores[1:]
+        with np.errstate(invalid='ignore'):
+            deltas = valores - previos
+
+        fechas = matriz.index
+        rebalanceos = self.es_rebalanceo(fechas)
+        n_dias = len(fechas)
+        contribuciones = np.zeros((n_dias, len(self.tickers)))
+        niveles = np.empty(n_dias)
+        vigentes = np.empty(n_dias, dtype=int)  # Constituyentes en la canasta al cierre
+        filas_pesos = []
+
+        # Bloques de días con las mismas unidades: termina en cada rebalanceo (inclusive)
+        cortes = np.flatnonzero(rebalanceos) + 1
+        limites = np.unique(np.concatenate([[0], cortes[cortes < n_dias], [n_dias]]))
+        for ini, fin in zip(limites[:-1], limites[1:]):
+            c = np.nan_to_num(deltas[ini:fin] * self.unidades)  # Tickers fuera de la canasta → 0
+            contribuciones[ini:fin] = c
+            niveles[ini:fin] = self.nivel + np.cumsum(c.sum(axis=1))
+            self.nivel = float(niveles[fin - 1])
+            vigentes[ini:fin] = (self.unidades > 0).sum()
+
+            if rebalanceos[fin - 1]:
+                precios = valores[fin - 1]
+                pesos = self.pesos_objetivo(precios)
+                self.unidades = np.where(pesos > 0, pesos * self.nivel / np.where(pesos > 0, precios, 1.0), 0.0)
+                vigentes[fin - 1] = (self.unidades > 0).sum()
+                for i in np.flatnonzero(pesos):
+                    filas_pesos.append({'fecha': fechas[fin - 1].strftime('%Y-%m-%d'),
+                                        'ticker': self.tickers[i], 'peso': round(float(pesos[i]), 6),
+                                        'unidades': float(self.unidades[i]), 'precio': float(precios[i])})
+
+        self.ultimo_precio = valores[-1]
+        self.ultima_fecha = fechas[-1]
+
+        anteriores = np.concatenate([[niveles[0] - contribuciones[0].sum()], niveles[:-1]])
+        diario = pd.DataFrame({
+            'fecha': fechas.strftime('%Y-%m-%d'),
+            'nivel': np.round(niveles, 4),
+            'variacion': np.round(niveles / anteriores - 1.0, 6),
+            'constituyentes': vigentes,
+            'rebalanceo': rebalanceos,
+        })
+
+        contrib = pd.DataFrame(np.round(contribuciones, 6), columns=self.tickers)
+        contrib.insert(0, 'fecha', diario['fecha'])
+        return diario, contrib, pd.DataFrame(filas_pesos)
+
+    # ------------------------------------------------------------------ persistencia
+
+    def guardar(self, path=ESTADO_PATH):
+        path.parent.mkdir(exist_ok=True)
+        np.savez(path, tickers=np.array(self.tickers), huella=self.huella,
+                 config=json.dumps(self.config, default=str),
+                 ultima_fecha=np.datetime64(self.ultima_fecha, 'D'), nivel=self.nivel,
+                 unidades=self.unidades, ultimo_precio=self.ultimo_precio)
+
+    @classmethod
+    def cargar(cls, path=ESTADO_PATH):
+        z = np.load(path, allow_pickle=False)
+        motor = cls(z['tickers'].tolist(), json.loads(str(z['config'])))
+        motor.huella = str(z['huella'])
+        motor.ultima_fecha = pd.Timestamp(z['ultima_fecha'].item())
+        motor.nivel = float(z['nivel'])
+        motor.unidades = z['unidades']
+        motor.ultimo_precio = z['ultimo_precio']
+        return motor
+
+
+def indice_actualizado(config, reconstruir=False, columna='Close'):
+    """
+    Carga el estado y procesa solo los días nuevos; reconstruye si cambió la
+    config o la lista de constituyentes con datos. Escribe/agrega los CSV.
+    Devuelve (motor, diario_nuevo, contribuciones_nuevas, reconstruido).
+    """
+    buscados = [t.replace('.BA', '') for t in config['constituyentes']]
+    matriz = cargar_matriz_precios(columna=columna, tickers=set(buscados))
+    if matriz.empty:
+        return None, pd.DataFrame(), pd.DataFrame(), False
+    tickers = [t for t in buscados if t in matriz.columns]
+    matriz = matriz[tickers].dropna(how='all')
+
+    motor = None
+    if not reconstruir and ESTADO_PATH.exists():
+        motor = MotorIndice.cargar()
+        if motor.tickers != tickers or motor.huella != huella_config(config):
+            motor = None
+    reconstruido = motor is None
+    if reconstruido:
+        motor = MotorIndice(tickers, config)
+    motor.acciones = acciones_en_circulacion(tickers, config)
+
+    diario, contrib, pesos = motor.procesar(matriz)
+
+    INDICE_DIR.mkdir(exist_ok=True)
+    for df, path in ((diario, DIARIO_PATH), (contrib, CONTRIBUCIONES_PATH), (pesos, PESOS_PATH)):
+        if reconstruido:
+            df.to_csv(path, index=False)
+        elif len(df) > 0:
+            df.to_csv(path, mode='a', header=not path.exists(), index=False)
+    motor.guardar()
+    return motor, diario, contrib, reconstruido
+
+
+def comparar_oficial(path_oficial, diario):
+    """Correlación y tracking error de retornos diarios vs. un CSV (fecha, Close) del índice oficial"""
+    oficial = pd.read_csv(path_oficial, usecols=['fecha', 'Close'])
+    oficial = pd.Series(oficial['Close'].to_numpy(dtype=float), index=pd.to_datetime(oficial['fecha']))
+    sintetico = pd.Series(diario['nivel'].to_numpy(dtype=float), index=pd.to_datetime(diario['fecha']))
+    juntos = pd.concat({'sintetico': sintetico, 'oficial': oficial}, axis=1).dropna()
+    if len(juntos) < 3:
+        return None
+    r = np.log(juntos).diff().dropna()
+    dif = r['sintetico'] - r['oficial']
+    escala = juntos['oficial'].iloc[0] / juntos['sintetico'].iloc[0]
+    return {
+        'dias': len(r),
+        'correlacion': r['sintetico'].corr(r['oficial']),
+        'tracking_error': dif.std() * np.sqrt(252),
+        'desvio_final': juntos['sintetico'].iloc[-1] * escala / juntos['oficial'].iloc[-1] - 1.0,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Índice MERVAL sintético desde constituyentes")
+    parser.add_argument('--metodo', choices=METODOS, help="Override del método de pesos de la config")
+    parser.add_argument('--rebalanceo', choices=list(FRECUENCIAS), help="Override de la frecuencia")
+    parser.add_argument('--tope', type=float, help="Peso máximo por acción (ej. 0.15)")
+    parser.add_argument('--reconstruir', action='store_true', help="Ignora el estado y recalcula 5 años")
+    parser.add_argument('--oficial', help="CSV (fecha, Close) del índice oficial para comparar")
+    parser.add_argument('--top', type=int, default=5)
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("indice_merval")
+
+    print("="*80)
+    print("📈 ÍNDICE MERVAL SINTÉTICO - DESDE CONSTITUYENTES")
+    print("="*80 + "\n")
+
+    try:
+        config = cargar_config(metodo=args.metodo, rebalanceo=args.rebalanceo, tope=args.tope)
+    except (ValueError, json.JSONDecodeError) as e:
+        print(f"❌ Error en {CONFIG_PATH}: {e}")
+        exit(1)
+
+    with PERFIL.etapa("actualizacion"):
+        motor, diario, contrib, reconstruido = indice_actualizado(config, args.reconstruir)
+    if motor is None:
+        print("❌ Error: No hay CSVs de constituyentes en MERVAL_Datos_Limpio")
+        print("Ejecuta primero: python descarga_merval_yahoo_completo.py")
+        exit(1)
+
+    faltan = [t for t in config['constituyentes'] if t.replace('.BA', '') not in motor.tickers]
+    accion = "reconstruido desde cero" if reconstruido else "actualizado"
+    print(f"✅ Índice {accion}: {len(diario)} días nuevos | {len(motor.tickers)} constituyentes con datos")
+    print(f"⚙️  Método: {config['metodo']} | rebalanceo: {config['rebalanceo'] if not isinstance(config['rebalanceo'], list) else 'fechas fijas'}"
+          f" | tope: {config['tope'] or '-'}")
+    if faltan:
+        print(f"⚠️  Sin datos: {', '.join(faltan)}")
+    if config['metodo'] in ('mcap', 'free_float') and np.isnan(motor.acciones).any():
+        sin_acciones = [t for t, a in zip(motor.tickers, motor.acciones) if np.isnan(a)]
+        print(f"⚠️  Sin acciones en circulación (fuera del índice): {', '.join(sin_acciones)}")
+    print(f"📅 Última fecha: {motor.ultima_fecha.strftime('%Y-%m-%d')} | nivel: {motor.nivel:,.2f}\n")
+
+    if len(contrib) > 0:
+        ultimo = contrib.iloc[-1].drop('fecha').astype(float)
+        print(f"🔎 Contribución del último día ({contrib['fecha'].iloc[-1]}, {ultimo.sum():+.2f} pts)")
+        for t, pts in ultimo.reindex(ultimo.abs().sort_values(ascending=False).index).head(args.top).items():
+            print(f"   {t:8} {pts:+10.2f} pts")
+
+    with PERFIL.etapa("lectura_historia"):
+        historia = pd.read_csv(DIARIO_PATH)
+        total = pd.read_csv(CONTRIBUCIONES_PATH).drop(columns='fecha').sum()
+    inicial = historia['nivel'].iloc[-1] - total.sum()  # Las contribuciones suman la variación total
+    print(f"\n📊 Historia completa: {historia['fecha'].iloc[0]} → {historia['fecha'].iloc[-1]}"
+          f" | {inicial:,.2f} → {historia['nivel'].iloc[-1]:,.2f}")
+    print(f"   Más aportaron:")
+    for t, pts in total.nlargest(args.top).items():
+        print(f"   {t:8} {pts:+12.2f} pts ({pts / inicial:+.1%} del nivel inicial)")
+    print(f"   Más restaron:")
+    for t, pts in total.nsmallest(args.top).items():
+        print(f"   {t:8} {pts:+12.2f} pts ({pts / inicial:+.1%} del nivel inicial)")
+
+    if args.oficial:
+        comp = comparar_oficial(args.oficial, historia)
+        if comp is None:
+            print(f"\n⚠️  Sin fechas en común con {args.oficial}")
+        else:
+            print(f"\n🆚 Vs. índice oficial ({comp['dias']} días)")
+            print(f"   Correlación de retornos: {comp['correlacion']:.4f}")
+            print(f"   Tracking error anual:    {comp['tracking_error']:.2%}")
+            print(f"   Desvío acumulado:        {comp['desvio_final']:+.2%}")
+
+    print(f"\n📁 Carpeta: {INDICE_DIR.absolute()}\n")
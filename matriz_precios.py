@@ -0,0 +1,39 @@
+"""
+Carga de la MATRIZ DE PRECIOS alineada (fechas × tickers) desde MERVAL_Datos_Limpio
+
+Base común para correlaciones, riesgo, índice y pares: cada CSV se lee
+una vez y todas las series quedan sobre el mismo índice de fechas
+(NaN donde un ticker no operó).
+"""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+DATA_DIR = Path("MERVAL_Datos_Limpio")
+
+
+def cargar_matriz_precios(data_dir=DATA_DIR, columna='Close', tickers=None):
+    """DataFrame fechas × tickers (ticker sin '.BA') con la columna pedida"""
+    series = {}
+    for path in sorted(data_dir.glob("*_precios_5A.csv")):
+        ticker = path.name.replace('_precios_5A.csv', '')
+        if tickers is not None and ticker not in tickers:
+            continue
+        df = pd.read_csv(path, usecols=['fecha', columna])
+        serie = pd.Series(df[columna].to_numpy(dtype=float),
+                          index=pd.to_datetime(df['fecha'], format='%Y-%m-%d'))
+        series[ticker] = serie[~serie.index.duplicated(keep='last')]
+    if not series:
+        return pd.DataFrame()
+    return pd.DataFrame(series).sort_index()
+
+
+def retornos_log(matriz):
+    """Retornos logarítmicos diarios; NaN donde falta el precio de hoy o de ayer"""
+    valores = matriz.to_numpy(dtype=float)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.log(valores[1:] / valores[:-1])
+    r[~np.isfinite(r)] = np.nan
+    return pd.DataFrame(r, index=matriz.index[1:], columns=matriz.columns)
@@ -0,0 +1,220 @@
+#!/usr/bin/env python3
+"""
+ESCÁNER DE PARES (cointegración) sobre todo el universo .BA
+
+Para cada par ordenado (y, x) de la matriz de precios alineada:
+
+  log y_t = a + β · log x_t + e_t          (hedge ratio β por MCO)
+  Δe_t = c + γ · e_{t-1} + u_t             (Dickey-Fuller sobre el spread)
+
+  • t de γ → estadístico de Engle-Granger (más negativo = más cointegrado)
+  • half-life = -ln 2 / ln(1 + γ)  (días para cerrar medio desvío)
+  • z-score = spread de hoy / desvío del spread
+
+Todo es álgebra por lotes: los β de TODOS los pares salen de la matriz
+de covarianzas de cada ventana (β_yx = C[y,x] / C[x,x]); los residuos y
+la regresión DF se calculan como operaciones sobre columnas (un par =
+una columna). Los bloques de pares se reparten en un pool de procesos.
+
+Se evalúan varias ventanas móviles (default 4 de 252 días, cada 63) para
+medir estabilidad: cuántas ventanas rechazan la no-cointegración al 5%.
+
+Genera:
+  MERVAL_Pares/pares_ranking.csv
+
+EJECUTA:
+  python pares_cointegracion.py
+  python pares_cointegracion.py --ventana 252 --ventanas 6 --paso 42 --procesos 4 --top 20
+"""
+
+import argparse
+from concurrent.futures import ProcessPoolExecutor
+import os
+from pathlib import Path
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from matriz_precios import cargar_matriz_precios
+from perfilador import perfilador_desde_argv
+
+warnings.filterwarnings('ignore')
+
+PARES_DIR = Path("MERVAL_Pares")
+
+VENTANA = 252          # Días hábiles (~1 año)
+VENTANAS = 4           # Ventanas móviles evaluadas (la última es la principal)
+PASO = 63              # Días entre ventanas (~1 trimestre)
+MAX_HUECO = 5          # Días seguidos sin precio que se rellenan (ffill)
+BLOQUE = 256           # Pares por tarea del pool
+HALF_LIFE_MAX = 126    # Días: spreads más lentos no sirven para operar
+
+# Valores críticos de Engle-Granger (2 variables, con constante; MacKinnon 2010)
+CRITICOS = {'1%': -3.90, '5%': -3.34, '10%': -3.04}
+
+_VENTANAS = None  # (W, T, N) log-precios centrados, fijados en cada proceso del pool
+_COV = None       # (W, N, N)
+
+
+def ventanas_log_precios(matriz, ventana=VENTANA, n_ventanas=VENTANAS, paso=PASO):
+    """
+    Tensor (W, T, N) de log-precios por ventana móvil (la última termina hoy).
+    Solo quedan tickers con datos completos en todas las ventanas (tensor
+    vacío si la historia no alcanza para una ventana).
+    """
+    largo = ventana + (n_ventanas - 1) * paso
+    recorte = matriz.ffill(limit=MAX_HUECO).iloc[-largo:]
+    completos = recorte.columns[recorte.notna().all() & (recorte > 0).all()]
+    valores = np.log(recorte[completos].to_numpy(dtype=float))
+    inicios = [len(valores) - ventana - k * paso for k in reversed(range(n_ventanas))]
+    inicios = [i for i in inicios if i >= 0]
+    if not inicios:  # Historia más corta que una ventana
+        return np.empty((0, ventana, 0)), [], []
+    tensor = np.stack([valores[i:i + ventana] for i in inicios])
+    fechas_fin = [recorte.index[i + ventana - 1] for i in inicios]
+    return tensor, list(completos), fechas_fin
+
+
+def _iniciar(ventanas, cov):
+    global _VENTANAS, _COV
+    _VENTANAS, _COV = ventanas, cov
+
+
+def estadisticos_bloque(ys, xs):
+    """
+    β, t de Dickey-Fuller, half-life, z-score y correlación para los pares
+    (ys[k], xs[k]) en todas las ventanas. Cada salida es (W, P).
+    """
+    X = _VENTANAS
+    beta = _COV[:, ys, xs] / _COV[:, xs, xs]
+    spread = X[:, :, ys] - beta[:, None, :] * X[:, :, xs]          # (W, T, P), media 0
+
+    rezago = spread[:, :-1, :]
+    delta = np.diff(spread, axis=1)
+    rezago_c = rezago - rezago.mean(axis=1, keepdims=True)
+    delta_c = delta - delta.mean(axis=1, keepdims=True)
+    sxx = (rezago_c ** 2).sum(axis=1)
+    gamma = (rezago_c * delta_c).sum(axis=1) / sxx
+    residuo = delta_c - gamma[:, None, :] * rezago_c
+    n = delta.shape[1]
+    error_std = np.sqrt((residuo ** 2).sum(axis=1) / (n - 2) / sxx)
+    t_df = gamma / error_std
+
+    phi = 1.0 + gamma
+    with np.errstate(divide='ignore', invalid='ignore'):
+        half_life = np.where((phi > 0) & (phi < 1), -np.log(2) / np.log(phi), np.inf)
+    desvio = spread.std(axis=1)
+    zscore = spread[:, -1, :] / desvio
+    corr = _COV[:, ys, xs] / np.sqrt(_COV[:, ys, ys] * _COV[:, xs, xs])
+    return beta, t_df, half_life, zscore, corr
+
+
+def _tarea(args):
+    return estadisticos_bloque(*args)
+
+
+def escanear(tensor, procesos=None, bloque=BLOQUE):
+    """Todos los pares ordenados (y ≠ x). Devuelve (ys, xs, dict de arrays (W, P))."""
+    centrado = tensor - tensor.mean(axis=1, keepdims=True)
+    cov = np.einsum('wti,wtj->wij', centrado, centrado) / tensor.shape[1]
+    n = tensor.shape[2]
+    ys, xs = np.nonzero(~np.eye(n, dtype=bool))
+    tareas = [(ys[k:k + bloque], xs[k:k + bloque]) for k in range(0, len(ys), bloque)]
+
+    procesos = procesos or os.cpu_count() or 1
+    if procesos > 1 and len(tareas) > 1:
+        with ProcessPoolExecutor(max_workers=procesos, initializer=_iniciar,
+                                 initargs=(centrado, cov)) as pool:
+            partes = list(pool.map(_tarea, tareas))
+    else:
+        _iniciar(centrado, cov)
+        partes = [_tarea(t) for t in tareas]
+
+    nombres = ['beta', 't_df', 'half_life', 'zscore', 'corr']
+    salida = {nombre: np.concatenate([p[k] for p in partes], axis=1) for k, nombre in enumerate(nombres)}
+    return ys, xs, salida
+
+
+def ranking(tickers, ys, xs, est, critico=CRITICOS['5%'], half_life_max=HALF_LIFE_MAX):
+    """
+    Una fila por par NO ordenado (la dirección con t más negativo), ordenada:
+    candidatos (t < crítico y half-life operable) primero, por t.
+    """
+    ultima = {k: v[-1] for k, v in est.items()}
+    estables = (est['t_df'] < critico).sum(axis=0)
+    df = pd.DataFrame({
+        'Y': np.array(tickers)[ys],
+        'X': np.array(tickers)[xs],
+        'Beta': ultima['beta'],
+        'ADF t': ultima['t_df'],
+        'Half-life': ultima['half_life'],
+        'Z-score': ultima['zscore'],
+        'Correlacion': ultima['corr'],
+        'Ventanas OK': estables,
+    })
+    df['Par'] = [f"{min(y, x)}/{max(y, x)}" for y, x in zip(df['Y'], df['X'])]
+    df = df.sort_values('ADF t').drop_duplicates('Par', keep='first')
+    df['Candidato'] = (df['ADF t'] < critico) & (df['Half-life'] <= half_life_max) & (df['Half-life'] >= 1)
+    df = df.sort_values(['Candidato', 'Ventanas OK', 'ADF t'], ascending=[False, False, True])
+    return df[['Par', 'Y', 'X', 'Beta', 'ADF t', 'Half-life', 'Z-score', 'Correlacion', 'Ventanas OK', 'Candidato']]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Escáner de pares cointegrados del universo .BA")
+    parser.add_argument('--ventana', type=int, default=VENTANA, help="Días por ventana")
+    parser.add_argument('--ventanas', type=int, default=VENTANAS, help="Ventanas móviles evaluadas")
+    parser.add_argument('--paso', type=int, default=PASO, help="Días entre ventanas")
+    parser.add_argument('--procesos', type=int, default=None, help="Procesos del pool (default: CPUs)")
+    parser.add_argument('--top', type=int, default=15)
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("pares_cointegracion")
+
+    print("="*80)
+    print("🔗 ESCÁNER DE PARES - COINTEGRACIÓN (UNIVERSO .BA)")
+    print("="*80 + "\n")
+
+    with PERFIL.etapa("matriz_precios"):
+        matriz = cargar_matriz_precios()
+    if matriz.empty:
+        print("❌ Error: No hay CSVs en MERVAL_Datos_Limpio")
+        print("Ejecuta primero: python descarga_merval_yahoo_completo.py")
+        exit(1)
+
+    tensor, tickers, fechas_fin = ventanas_log_precios(matriz, args.ventana, args.ventanas, args.paso)
+    excluidos = [t for t in matriz.columns if t not in tickers]
+    if len(tickers) < 2:
+        print(f"❌ Error: menos de 2 tickers con {args.ventana} días completos ({len(matriz)} días de historia)")
+        print("Ejecuta primero: python descarga_merval_yahoo_completo.py (o usa --ventana más corta)")
+        exit(1)
+    n_pares = len(tickers) * (len(tickers) - 1)
+    print(f"📋 {len(tickers)} tickers → {n_pares} pares ordenados × {len(fechas_fin)} ventanas de {args.ventana} días")
+    print(f"📅 Ventanas terminan: {', '.join(f.strftime('%Y-%m-%d') for f in fechas_fin)}")
+    if excluidos:
+        print(f"⚠️  Sin historia completa (excluidos): {', '.join(excluidos)}")
+
+    t0 = time.perf_counter()
+    with PERFIL.etapa("escaneo"):
+        ys, xs, est = escanear(tensor, args.procesos)
+    segundos = time.perf_counter() - t0
+    print(f"⏱️  Escaneo: {segundos:.2f}s ({n_pares * len(fechas_fin) / max(segundos, 1e-9):,.0f} regresiones/s)\n")
+
+    with PERFIL.etapa("ranking"):
+        df = ranking(tickers, ys, xs, est)
+    PARES_DIR.mkdir(exist_ok=True)
+    df.to_csv(PARES_DIR / "pares_ranking.csv", index=False, float_format='%.4f')
+
+    candidatos = df[df['Candidato']]
+    print(f"🎯 Candidatos (ADF t < {CRITICOS['5%']} y half-life ≤ {HALF_LIFE_MAX} días): {len(candidatos)}/{len(df)} pares\n")
+    print(f"   {'Par':16} {'β':>7} {'ADF t':>7} {'HL':>6} {'Z':>6} {'Vent.':>6}")
+    for row in df.head(args.top).to_dict('records'):
+        senal = ""
+        if row['Candidato'] and abs(row['Z-score']) >= 2:
+            senal = f"  ← vender {row['Y']}/comprar {row['X']}" if row['Z-score'] > 0 else f"  ← comprar {row['Y']}/vender {row['X']}"
+        marca = "✅" if row['Candidato'] else "  "
+        print(f"{marca} {row['Y'] + '~' + row['X']:16} {row['Beta']:7.3f} {row['ADF t']:7.2f} "
+              f"{row['Half-life']:6.1f} {row['Z-score']:+6.2f} {row['Ventanas OK']:>3}/{len(fechas_fin)}{senal}")
+
+    print(f"\n📄 Ranking completo: {PARES_DIR / 'pares_ranking.csv'}\n")
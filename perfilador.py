@@ -0,0 +1,140 @@
+"""
+PERFILADOR por etapas (--profile) para todos los scripts
+
+Uso dentro de un script:
+
+    from perfilador import perfilador_desde_argv
+    PERFIL = perfilador_desde_argv("descarga_completo")
+
+    with PERFIL.etapa("yf.download"):
+        df = yf.download(...)
+
+Sin --profile, etapa() devuelve un contexto vacío compartido (costo ~nulo).
+Con --profile cada etapa se mide con cProfile (determinístico) y con el
+pico de memoria de tracemalloc. Al terminar el script se escribe:
+
+  MERVAL_Perfil/[script].prof          → perfil combinado (snakeviz, pstats)
+  MERVAL_Perfil/[script]_resumen.txt   → tabla por etapa + top-N funciones
+"""
+
+import atexit
+import contextlib
+import cProfile
+import io
+import pstats
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+PERFIL_DIR = Path("MERVAL_Perfil")
+TOP_N = 25
+
+_NULO = contextlib.nullcontext()
+
+
+class _Etapa:
+    def __init__(self, perfilador, nombre):
+        self.perfilador = perfilador
+        self.nombre = nombre
+
+    def __enter__(self):
+        p = self.perfilador
+        if self.nombre not in p.etapas:  # El Profile se crea una vez por etapa, no en cada entrada
+            p.etapas[self.nombre] = {
+                'llamadas': 0, 'segundos': 0.0, 'pico_bytes': 0, 'perfil': cProfile.Profile(),
+            }
+        datos = p.etapas[self.nombre]
+        # Solo un cProfile puede estar activo: se pausa el de la etapa contenedora
+        if p.pila:
+            externa = p.pila[-1]
+            externa['datos']['perfil'].disable()
+            actual, pico = tracemalloc.get_traced_memory()
+            externa['pico_hijos'] = max(externa['pico_hijos'], pico - externa['base'])
+        tracemalloc.reset_peak()
+        marco = {'datos': datos, 'base': tracemalloc.get_traced_memory()[0], 'pico_hijos': 0}
+        p.pila.append(marco)
+        marco['t0'] = time.perf_counter()
+        datos['perfil'].enable()
+        return self
+
+    def __exit__(self, *exc):
+        p = self.perfilador
+        marco = p.pila.pop()
+        datos = marco['datos']
+        datos['perfil'].disable()
+        datos['segundos'] += time.perf_counter() - marco['t0']
+        datos['llamadas'] += 1
+        pico = max(tracemalloc.get_traced_memory()[1] - marco['base'], marco['pico_hijos'])
+        datos['pico_bytes'] = max(datos['pico_bytes'], pico)
+
+        if p.pila:
+            externa = p.pila[-1]
+            externa['pico_hijos'] = max(externa['pico_hijos'], pico + marco['base'] - externa['base'])
+            tracemalloc.reset_peak()
+            externa['datos']['perfil'].enable()
+        return False
+
+
+class Perfilador:
+    def __init__(self, nombre, activo=False, top_n=TOP_N):
+        self.nombre = nombre
+        self.activo = activo
+        self.top_n = top_n
+        self.etapas = {}
+        self.pila = []
+        self.t_inicio = time.perf_counter()
+        self._finalizado = False
+        if activo:
+            tracemalloc.start()
+            atexit.register(self.finalizar)
+
+    def etapa(self, nombre):
+        if not self.activo:
+            return _NULO
+        return _Etapa(self, nombre)
+
+    def finalizar(self):
+        """Escribe el perfil combinado y el resumen (una sola vez)"""
+        if not self.activo or self._finalizado or not self.etapas:
+            return
+        self._finalizado = True
+        while self.pila:  # Etapas abiertas si el script terminó con exit()
+            _Etapa(self, None).__exit__(None, None, None)
+
+        PERFIL_DIR.mkdir(exist_ok=True)
+        path_prof = PERFIL_DIR / f"{self.nombre}.prof"
+        path_resumen = PERFIL_DIR / f"{self.nombre}_resumen.txt"
+
+        perfiles = [d['perfil'] for d in self.etapas.values()]
+        combinado = pstats.Stats(perfiles[0])
+        for perfil in perfiles[1:]:
+            combinado.add(perfil)
+        combinado.dump_stats(path_prof)
+
+        total = time.perf_counter() - self.t_inicio
+        lineas = [f"PERFIL: {self.nombre} (total {total:.2f}s)", "",
+                  f"{'Etapa':30} {'Llamadas':>9} {'Segundos':>10} {'% total':>8} {'Pico MB':>9}"]
+        for nombre, d in sorted(self.etapas.items(), key=lambda kv: -kv[1]['segundos']):
+            lineas.append(f"{nombre:30} {d['llamadas']:9d} {d['segundos']:10.3f} "
+                          f"{100 * d['segundos'] / total:7.1f}% {d['pico_bytes'] / 1024**2:9.1f}")
+
+        buffer = io.StringIO()
+        combinado.stream = buffer
+        combinado.sort_stats('cumulative').print_stats(self.top_n)
+        lineas += ["", f"TOP {self.top_n} FUNCIONES (tiempo acumulado)", buffer.getvalue()]
+        path_resumen.write_text("\n".join(lineas), encoding='utf-8')
+        tracemalloc.stop()
+
+        print("\n" + "="*80)
+        print("⏱️  PERFIL POR ETAPA")
+        print("="*80)
+        print("\n".join(lineas[2:3 + len(self.etapas)]))
+        print(f"\n📄 Perfil: {path_prof}")
+        print(f"📄 Resumen: {path_resumen}\n")
+
+
+def perfilador_desde_argv(nombre, argv=None):
+    """Perfilador activo solo si el script se ejecutó con --profile"""
+    argv = sys.argv if argv is None else argv
+    return Perfilador(nombre, activo='--profile' in argv)
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+REGISTRO DEL UNIVERSO de tickers + CACHE NEGATIVO para símbolos muertos
+
+Yahoo devuelve "symbol may be delisted" / "No timezone found" siempre para
+algunos tickers de ACCIONES_BA. Este registro guarda el resultado de cada
+descarga y, tras varios fallos seguidos, OMITE el símbolo por un tiempo que
+se duplica en cada re-intento fallido (1, 2, 4 ... hasta 64 días).
+Si un símbolo vuelve a tener datos, sale del cache negativo automáticamente.
+
+Solo cuentan los fallos que indican un símbolo muerto (sin datos, "No timezone
+found", "delisted"). Un 429, un crumb vencido o la red caída no penalizan al
+ticker, y una corrida en la que fallaron TODOS no toca el registro.
+
+  MERVAL_Registro/registro_universo.json
+
+EJECUTA:
+  python registro_universo.py                 # Ver estado del registro
+  python registro_universo.py --reset CELU.BA # Volver a intentar un símbolo ya
+  python registro_universo.py --reset-todo
+  python registro_universo.py --profile
+"""
+
+import argparse
+import json
+import os
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from perfilador import perfilador_desde_argv
+
+REGISTRO_PATH = Path("MERVAL_Registro/registro_universo.json")
+
+FALLOS_PARA_OMITIR = 2     # Fallos consecutivos antes de entrar al cache negativo
+INTERVALO_BASE_DIAS = 1    # Primer intervalo de re-intento
+INTERVALO_MAX_DIAS = 64    # Tope del backoff exponencial
+
+# Motivos que indican un símbolo sin datos (en minúsculas); cualquier otro error es transitorio
+MOTIVOS_SIMBOLO_MUERTO = ('sin datos', 'no timezone found', 'delisted', 'no data found')
+
+
+def cargar_registro(path=REGISTRO_PATH):
+    if path.exists():
+        return json.loads(path.read_text(encoding='utf-8'))
+    return {}
+
+
+def guardar_registro(registro, path=REGISTRO_PATH):
+    path.parent.mkdir(exist_ok=True)
+    tmp = path.with_suffix(f'.{os.getpid()}.tmp')
+    try:
+        tmp.write_text(json.dumps(registro, indent=2, sort_keys=True, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, path)  # Un corte a mitad de escritura no deja el registro truncado
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def guardar_registro_corrida(registro, resultados, path=REGISTRO_PATH):
+    """Guarda el registro salvo que hayan fallado todos los tickers intentados
+
+    Si no bajó ninguno el problema es Yahoo o la red, no los símbolos.
+    Devuelve True si se guardó.
+    """
+    intentados = [r for r in resultados if r['Status'] != '⏭️ Omitido']
+    if intentados and not any(r['Status'] == '✅ OK' for r in intentados):
+        return False
+    guardar_registro(registro, path)
+    return True
+
+
+def _entrada(registro, ticker):
+    return registro.setdefault(ticker, {
+        'exitos': 0,
+        'fallos_consecutivos': 0,
+        'ultimo_intento': None,
+        'ultimo_exito': None,
+        'ultimo_motivo': None,
+        'omitir_hasta': None,
+        'intervalo_dias': 0,
+    })
+
+
+def debe_omitir(registro, ticker, ahora=None):
+    """True si el ticker está en el cache negativo y todavía no toca re-intentarlo"""
+    entrada = registro.get(ticker)
+    if not entrada or not entrada.get('omitir_hasta'):
+        return False
+    ahora = ahora or datetime.now()
+    return ahora < datetime.fromisoformat(entrada['omitir_hasta'])
+
+
+def registrar_exito(registro, ticker, ahora=None):
+    """Devuelve True si el símbolo estaba en el cache negativo (volvió a tener datos)"""
+    ahora = ahora or datetime.now()
+    entrada = _entrada(registro, ticker)
+    volvio = entrada['omitir_hasta'] is not None
+    entrada.update({
+        'exitos': entrada['exitos'] + 1,
+        'fallos_consecutivos': 0,
+        'ultimo_intento': ahora.isoformat(timespec='seconds'),
+        'ultimo_exito': ahora.isoformat(timespec='seconds'),
+        'ultimo_motivo': 'OK',
+        'omitir_hasta': None,
+        'intervalo_dias': 0,
+    })
+    return volvio
+
+
+def es_simbolo_muerto(motivo):
+    """True si el motivo indica que Yahoo no tiene datos del símbolo (no un error transitorio)"""
+    motivo = str(motivo).lower()
+    return any(m in motivo for m in MOTIVOS_SIMBOLO_MUERTO)
+
+
+def registrar_fallo(registro, ticker, motivo, ahora=None):
+    """Suma un fallo; desde FALLOS_PARA_OMITIR el símbolo se omite con backoff exponencial
+
+    Los errores transitorios (429, crumb, red) solo quedan anotados: no suman fallos.
+    """
+    ahora = ahora or datetime.now()
+    entrada = _entrada(registro, ticker)
+    entrada['ultimo_intento'] = ahora.isoformat(timespec='seconds')
+    entrada['ultimo_motivo'] = str(motivo)[:120]
+    if not es_simbolo_muerto(motivo):
+        return
+    entrada['fallos_consecutivos'] += 1
+
+    exceso = entrada['fallos_consecutivos'] - FALLOS_PARA_OMITIR
+    if exceso >= 0:
+        intervalo = min(INTERVALO_BASE_DIAS * 2 ** exceso, INTERVALO_MAX_DIAS)
+        entrada['intervalo_dias'] = intervalo
+        entrada['omitir_hasta'] = (ahora + timedelta(days=intervalo)).isoformat(timespec='seconds')
+
+
+def omitidos(registro, ahora=None):
+    """Tickers actualmente en el cache negativo"""
+    return sorted(t for t in registro if debe_omitir(registro, t, ahora))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Registro del universo y cache negativo")
+    parser.add_argument('--reset', metavar='TICKER', action='append', default=[],
+                        help="Sacar un ticker del cache negativo")
+    parser.add_argument('--reset-todo', action='store_true',
+                        help="Vaciar el cache negativo completo")
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("registro_universo")
+
+    with PERFIL.etapa("cargar_registro"):
+        registro = cargar_registro()
+
+    with PERFIL.etapa("reset"):
+        for ticker in (list(registro) if args.reset_todo else args.reset):
+            if ticker in registro:
+                registro[ticker].update({'fallos_consecutivos': 0, 'omitir_hasta': None, 'intervalo_dias': 0})
+                print(f"♻️  {ticker} se re-intentará en la próxima descarga")
+        if args.reset or args.reset_todo:
+            guardar_registro(registro)
+
+    print("="*80)
+    print("🗂️  REGISTRO DEL UNIVERSO")
+    print("="*80 + "\n")
+
+    if not registro:
+        print("Registro vacío (se llena al ejecutar descarga_merval_yahoo_completo.py)")
+        exit(0)
+
+    with PERFIL.etapa("omitidos"):
+        lista_omitidos = omitidos(registro)
+    print(f"✅ Registrados: {len(registro)}")
+    print(f"⏭️  En cache negativo: {len(lista_omitidos)}\n")
+    for ticker in lista_omitidos:
+        e = registro[ticker]
+        print(f"   {ticker:10} | {e['fallos_consecutivos']:2d} fallos | "
+              f"re-intento: {e['omitir_hasta'][:10]} | {e['ultimo_motivo']}")
+    print()
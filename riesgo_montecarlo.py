@@ -0,0 +1,244 @@
+#!/usr/bin/env python3
+"""
+RIESGO MONTE CARLO (VaR / CVaR / Drawdown) de las carteras recomendadas
+
+Toma MERVAL_Analisis_Recomendaciones.csv (salida de analizar_y_recomendar.py)
+y los históricos de MERVAL_Datos_Limpio, y simula decenas de miles de
+trayectorias con BLOCK BOOTSTRAP de días históricos completos (se remuestrea
+la fila entera → se conserva la correlación entre tickers).
+
+Todo es vectorizado por lotes de trayectorias (sin loops por trayectoria)
+y con semilla fija: el mismo input da siempre los mismos números.
+
+Carteras (pesos iguales, rebalanceo diario):
+  • COMPRA_FUERTE       → Score >= 60
+  • COMPRA_RECOMENDADA  → Score >= 40
+
+Genera:
+  MERVAL_Riesgo/riesgo_carteras.csv
+  MERVAL_Riesgo/riesgo_por_ticker.csv
+
+EJECUTA:
+  python riesgo_montecarlo.py
+  python riesgo_montecarlo.py --trayectorias 50000 --horizonte 63 --pesos score
+"""
+
+import argparse
+from pathlib import Path
+import time
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from matriz_precios import cargar_matriz_precios, retornos_log
+from perfilador import perfilador_desde_argv
+
+warnings.filterwarnings('ignore')
+
+RECOMENDACIONES_PATH = Path("MERVAL_Analisis_Recomendaciones.csv")
+RIESGO_DIR = Path("MERVAL_Riesgo")
+
+TRAYECTORIAS = 20000
+HORIZONTE = 21         # Días hábiles (~1 mes)
+BLOQUE = 5             # Largo de bloque del bootstrap (conserva autocorrelación semanal)
+LOTE = 2000            # Trayectorias por lote (acota la memoria)
+MIN_HISTORIA = 252     # Días con cotización para incluir un ticker (~1 año)
+SEMILLA = 42
+
+CARTERAS = {
+    'COMPRA_FUERTE': 60,
+    'COMPRA_RECOMENDADA': 40,
+}
+
+
+def indices_bootstrap(u, primeras, n_dias, horizonte, bloque):
+    """
+    Filas históricas remuestreadas por bloques: (trayectorias × horizonte × series).
+    Cada bloque sortea su inicio sobre el calendario COMÚN con los uniformes u
+    (trayectorias × bloques): todas las series que ya cotizaban en esa fecha toman
+    la misma fila y se conserva la correlación entre ellas. Solo la serie cuya
+    historia [primeras[j], n_dias) todavía no empezaba re-sortea dentro de la suya
+    (u reescalado, así el sorteo sigue siendo uniforme sobre su historia).
+    """
+    primeras = np.asarray(primeras)
+    total = n_dias - bloque + 1
+    pos = u[:, :, None] * total                                                   # (T, bloques, 1)
+    propio = primeras + np.floor(pos / np.maximum(primeras, 1) * (total - primeras)).astype(np.int64)
+    inicios = np.where(pos >= primeras, np.floor(pos).astype(np.int64), propio)  # (T, bloques, series)
+    idx = inicios[:, :, None, :] + np.arange(bloque)[None, None, :, None]
+    return idx.reshape(len(u), -1, len(primeras))[:, :horizonte, :]
+
+
+def primeras_filas(retornos):
+    """Índice de la primera fila con dato de cada ticker (antes no cotizaba)"""
+    return retornos.notna().to_numpy().argmax(axis=0)
+
+
+def max_drawdown(riqueza):
+    """Máximo drawdown por trayectoria sobre el eje de tiempo (axis=1)"""
+    forma = list(riqueza.shape)
+    forma[1] = 1
+    con_inicio = np.concatenate([np.ones(forma), riqueza], axis=1)
+    picos = np.maximum.accumulate(con_inicio, axis=1)
+    return 1.0 - (con_inicio / picos).min(axis=1)
+
+
+def metricas(retornos_finales, drawdowns):
+    """VaR/CVaR como pérdida positiva; drawdown como fracción"""
+    q05, q01 = np.quantile(retornos_finales, [0.05, 0.01])
+    return {
+        'Retorno Esperado': float(retornos_finales.mean()),
+        'Retorno Mediano': float(np.median(retornos_finales)),
+        'VaR 95%': float(-q05),
+        'CVaR 95%': float(-retornos_finales[retornos_finales <= q05].mean()),
+        'VaR 99%': float(-q01),
+        'CVaR 99%': float(-retornos_finales[retornos_finales <= q01].mean()),
+        'Drawdown Mediano': float(np.median(drawdowns)),
+        'Drawdown P95': float(np.quantile(drawdowns, 0.95)),
+        'Prob. Pérdida': float((retornos_finales < 0).mean()),
+    }
+
+
+def simular(retornos, carteras_pesos, trayectorias=TRAYECTORIAS, horizonte=HORIZONTE,
+            bloque=BLOQUE, semilla=SEMILLA):
+    """
+    retornos: DataFrame (días × tickers) de retornos log.
+    carteras_pesos: {nombre: vector de pesos alineado con retornos.columns}
+    Devuelve (df_carteras, df_tickers).
+    """
+    # Antes de la primera cotización no se sortea (primeras_filas); después,
+    # sin operación ese día → retorno 0 (el precio no se movió)
+    simples = np.expm1(retornos.fillna(0.0).to_numpy(dtype=float))
+    n_dias, n_tickers = simples.shape
+    primeras = primeras_filas(retornos)
+    # Cada cartera usa la ventana en la que cotizan todos sus tickers
+    primeras_cart = {n: np.array([primeras[pesos > 0].max()]) for n, pesos in carteras_pesos.items()}
+    columnas = np.arange(n_tickers)
+    n_bloques = -(-horizonte // bloque)
+    rng = np.random.default_rng(semilla)
+
+    finales_tick = np.empty((trayectorias, n_tickers))
+    dd_tick = np.empty((trayectorias, n_tickers))
+    finales_cart = {n: np.empty(trayectorias) for n in carteras_pesos}
+    dd_cart = {n: np.empty(trayectorias) for n in carteras_pesos}
+
+    for ini in range(0, trayectorias, LOTE):
+        fin = min(ini + LOTE, trayectorias)
+        u = rng.random((fin - ini, n_bloques))
+        r = simples[indices_bootstrap(u, primeras, n_dias, horizonte, bloque), columnas]  # (lote, horizonte, tickers)
+
+        riqueza = np.cumprod(1.0 + r, axis=1)
+        finales_tick[ini:fin] = riqueza[:, -1, :] - 1.0
+        dd_tick[ini:fin] = max_drawdown(riqueza)
+
+        for nombre, pesos in carteras_pesos.items():
+            idx = indices_bootstrap(u, primeras_cart[nombre], n_dias, horizonte, bloque)[:, :, 0]
+            r_cartera = simples[idx] @ pesos               # rebalanceo diario a pesos fijos
+            riqueza_c = np.cumprod(1.0 + r_cartera, axis=1)
+            finales_cart[nombre][ini:fin] = riqueza_c[:, -1] - 1.0
+            dd_cart[nombre][ini:fin] = max_drawdown(riqueza_c)
+
+    filas_cart = []
+    for nombre, pesos in carteras_pesos.items():
+        fila = {'Cartera': nombre, 'Tickers': int((pesos > 0).sum())}
+        fila.update(metricas(finales_cart[nombre], dd_cart[nombre]))
+        filas_cart.append(fila)
+
+    filas_tick = []
+    for j, ticker in enumerate(retornos.columns):
+        fila = {'Ticker': ticker}
+        fila.update(metricas(finales_tick[:, j], dd_tick[:, j]))
+        filas_tick.append(fila)
+
+    return pd.DataFrame(filas_cart), pd.DataFrame(filas_tick)
+
+
+def pesos_carteras(recomendaciones, columnas, modo='iguales'):
+    """Vector de pesos por cartera, alineado con las columnas de la matriz de retornos"""
+    rec = recomendaciones.copy()
+    rec['Ticker'] = rec['Ticker'].str.replace('.BA', '', regex=False)
+    rec = rec[rec['Ticker'].isin(columnas)]
+
+    carteras = {}
+    for nombre, score_min in CARTERAS.items():
+        sel = rec[rec['Score'] >= score_min]
+        if len(sel) == 0:
+            continue
+        base = sel['Score'].to_numpy(dtype=float) if modo == 'score' else np.ones(len(sel))
+        pesos = pd.Series(0.0, index=columnas)
+        pesos[sel['Ticker'].to_numpy()] = base / base.sum()
+        carteras[nombre] = pesos.to_numpy()
+    return carteras
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="VaR/CVaR Monte Carlo de las carteras recomendadas")
+    parser.add_argument('--trayectorias', type=int, default=TRAYECTORIAS)
+    parser.add_argument('--horizonte', type=int, default=HORIZONTE, help="Días hábiles")
+    parser.add_argument('--bloque', type=int, default=BLOQUE)
+    parser.add_argument('--semilla', type=int, default=SEMILLA)
+    parser.add_argument('--pesos', choices=['iguales', 'score'], default='iguales')
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("riesgo_montecarlo")
+
+    print("="*90)
+    print("🎲 RIESGO MONTE CARLO - VaR / CVaR / DRAWDOWN")
+    print("="*90 + "\n")
+
+    if not RECOMENDACIONES_PATH.exists():
+        print(f"❌ Error: No encontré {RECOMENDACIONES_PATH}")
+        print(f"Ejecuta primero: python analizar_y_recomendar.py")
+        exit(1)
+
+    with PERFIL.etapa("lectura_csv"):
+        recomendaciones = pd.read_csv(RECOMENDACIONES_PATH)
+        retornos = retornos_log(cargar_matriz_precios()).dropna(how='all')
+
+    if retornos.empty:
+        print("❌ Error: No hay históricos en MERVAL_Datos_Limpio")
+        exit(1)
+
+    # Historia corta: con pocos días el bootstrap subestima el riesgo
+    minimo = max(MIN_HISTORIA, args.bloque)
+    dias_validos = len(retornos) - primeras_filas(retornos)
+    cortos = retornos.columns[dias_validos < minimo]
+    if len(cortos):
+        print(f"⚠️  Excluidos por historia < {minimo} días: {', '.join(cortos)}")
+        retornos = retornos.drop(columns=cortos)
+    if retornos.empty:
+        print(f"❌ Error: Ningún ticker tiene {minimo} días de historia")
+        print("Ejecuta primero: python descarga_merval_yahoo_completo.py")
+        exit(1)
+
+    carteras = pesos_carteras(recomendaciones, retornos.columns, args.pesos)
+    print(f"📊 Historia: {len(retornos)} días × {retornos.shape[1]} tickers")
+    print(f"🎲 {args.trayectorias} trayectorias × {args.horizonte} días (bloques de {args.bloque}, semilla {args.semilla})")
+    print(f"⚖️  Pesos: {args.pesos}\n")
+
+    t0 = time.perf_counter()
+    with PERFIL.etapa("simulacion"):
+        df_carteras, df_tickers = simular(retornos, carteras, args.trayectorias,
+                                          args.horizonte, args.bloque, args.semilla)
+    print(f"⏱️  Simulación: {time.perf_counter() - t0:.2f}s\n")
+
+    if len(df_carteras) == 0:
+        print("⚠️  No hay tickers recomendados con históricos: solo riesgo por ticker\n")
+    for _, row in df_carteras.iterrows():
+        print(f"💼 {row['Cartera']} ({row['Tickers']} tickers)")
+        print(f"   Retorno esperado: {row['Retorno Esperado']:+.2%} | Prob. pérdida: {row['Prob. Pérdida']:.1%}")
+        print(f"   VaR 95%: {row['VaR 95%']:.2%} | CVaR 95%: {row['CVaR 95%']:.2%}")
+        print(f"   VaR 99%: {row['VaR 99%']:.2%} | CVaR 99%: {row['CVaR 99%']:.2%}")
+        print(f"   Drawdown mediano: {row['Drawdown Mediano']:.2%} | P95: {row['Drawdown P95']:.2%}\n")
+
+    print(f"⚠️  TICKERS CON MAYOR CVaR 95% ({args.horizonte} días)")
+    print("-" * 70)
+    for _, row in df_tickers.nlargest(5, 'CVaR 95%').iterrows():
+        print(f"  {row['Ticker']:10} | VaR95 = {row['VaR 95%']:6.2%} | CVaR95 = {row['CVaR 95%']:6.2%} "
+              f"| DD P95 = {row['Drawdown P95']:6.2%}")
+
+    RIESGO_DIR.mkdir(exist_ok=True)
+    df_carteras.to_csv(RIESGO_DIR / "riesgo_carteras.csv", index=False, float_format='%.6f')
+    df_tickers.to_csv(RIESGO_DIR / "riesgo_por_ticker.csv", index=False, float_format='%.6f')
+    print(f"\n📄 Guardado en: {RIESGO_DIR.absolute()}\n")
@@ -0,0 +1,403 @@
+#!/usr/bin/env python3
+"""
+SCREENING indexado sobre fundamentales e indicadores
+
+Cada métrica (ya tipada, ver esquema_fundamentales.py) se indexa ordenada (argsort).
+Los filtros se resuelven con búsqueda binaria sobre esos índices y se
+combinan como conjuntos de posiciones: sin recorrer el universo entero ni
+copiar el DataFrame por consulta.
+
+Lenguaje de filtros:
+  pe < 10 and roe > 15 and dy > 2
+  (de < 0.5 or cr > 2) and not beta > 1.5
+  Operadores: <  <=  >  >=  ==  !=   |   and  or  not  ( )
+  roe, roa, dy, ret_*, vol_* van en PORCENTAJE (roe > 15 → ROE mayor a 15%)
+  de va como fracción (de < 0.5 → deuda menor al 50% del patrimonio)
+
+Métricas: precio pe pe_fwd roe roa pb dy mcap beta eps de cr qr score
+          ret_1m ret_1a vol_1a (con --indicadores, desde MERVAL_Datos_Limpio)
+
+Snapshots históricos: el descargador guarda una copia fechada en
+MERVAL_Fundamentales/historico/; --fecha usa el último snapshot <= fecha.
+
+EJECUTA:
+  python screening.py "pe < 10 and roe > 15 and dy > 2"
+  python screening.py "roe > 10" --orden dy --desc --k 10 --fecha 2025-06-01
+  python screening.py                 # Modo interactivo: "<filtro> [orden <métrica> [desc]] [top <k>]"
+"""
+
+import argparse
+from datetime import datetime
+from functools import lru_cache
+from pathlib import Path
+import re
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from esquema_fundamentales import cargar_fundamentales, COLUMNAS_PORCENTAJE
+from matriz_precios import cargar_matriz_precios, DATA_DIR
+from perfilador import perfilador_desde_argv
+
+warnings.filterwarnings('ignore')
+
+FUND_DIR = Path("MERVAL_Fundamentales")
+FUND_PATH = FUND_DIR / "MERVAL_Fundamentales_Completo.csv"
+HISTORICO_DIR = FUND_DIR / "historico"
+
+# Alias del lenguaje → columna del CSV de fundamentales
+METRICAS = {
+    'precio': 'Precio',
+    'pe': 'P/E Ratio (Trailing)',
+    'pe_fwd': 'P/E Ratio (Forward)',
+    'roe': 'ROE',
+    'roa': 'ROA',
+    'pb': 'P/B Ratio',
+    'dy': 'Dividend Yield',
+    'mcap': 'Market Cap',
+    'beta': 'Beta',
+    'eps': 'EPS (Trailing)',
+    'de': 'Debt to Equity',
+    'cr': 'Current Ratio',
+    'qr': 'Quick Ratio',
+    'score': 'Score',
+}
+
+# Indicadores de precio (en %), calculados a la fecha del snapshot
+INDICADORES = ['ret_1m', 'ret_1a', 'vol_1a']
+
+_TOKEN = re.compile(r"\s*(?:(?P<num>-?\d+(?:\.\d*)?(?:[eE][-+]?\d+)?)|(?P<op><=|>=|==|!=|<|>)"
+                    r"|(?P<par>[()])|(?P<id>[A-Za-z_][A-Za-z_0-9]*))")
+
+
+class ErrorFiltro(ValueError):
+    pass
+
+
+def valores_metrica(df, columna):
+    """Columna tipada → float ndarray; los ratios en fracción pasan a porcentaje"""
+    valores = df[columna].to_numpy(dtype=float, na_value=np.nan)
+    return valores * 100 if columna in COLUMNAS_PORCENTAJE else valores
+
+
+def indicadores_precios(matriz, hasta=None):
+    """DataFrame ticker → ret_1m, ret_1a, vol_1a (en %) con datos hasta la fecha dada"""
+    if hasta is not None:
+        matriz = matriz.loc[:pd.Timestamp(hasta)]
+    if matriz.empty:
+        return pd.DataFrame(columns=INDICADORES)
+    precios = matriz.ffill()
+    ultimo = precios.iloc[-1]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        r = np.log(precios.iloc[-253:]).diff()
+    return pd.DataFrame({
+        'ret_1m': (ultimo / precios.iloc[max(-22, -len(precios))] - 1) * 100,
+        'ret_1a': (ultimo / precios.iloc[max(-253, -len(precios))] - 1) * 100,
+        'vol_1a': r.std() * np.sqrt(252) * 100,
+    })
+
+
+class IndiceScreening:
+    """
+    Índices ordenados por métrica sobre un snapshot de fundamentales.
+
+    Las consultas devuelven POSICIONES (np.ndarray de int) en el DataFrame
+    original; tabla() arma el resultado solo para esas filas.
+    """
+
+    def __init__(self, df_fund, indicadores=None):
+        self.df = df_fund
+        self.tickers = df_fund['Ticker'].to_numpy()
+        self.n = len(df_fund)
+        self.valores = {}
+        for alias, columna in METRICAS.items():
+            if columna in df_fund.columns:
+                self.valores[alias] = valores_metrica(df_fund, columna)
+        if indicadores is not None:
+            claves = pd.Series(self.tickers).str.replace('.BA', '', regex=False)
+            alineados = indicadores.reindex(claves)
+            for alias in INDICADORES:
+                self.valores[alias] = alineados[alias].to_numpy(dtype=float)
+
+        # Solo filas con dato: NaN nunca cumple un filtro ni entra en un top
+        self.orden = {}
+        self.ordenados = {}
+        for alias, v in self.valores.items():
+            validas = np.flatnonzero(~np.isnan(v))
+            orden = validas[np.argsort(v[validas], kind='stable')]
+            self.orden[alias] = orden
+            self.ordenados[alias] = v[orden]
+        self.todas = np.arange(self.n)
+
+    def _metrica(self, alias):
+        if alias not in self.orden:
+            raise ErrorFiltro(f"Métrica desconocida: '{alias}' (disponibles: {', '.join(self.orden)})")
+        return self.orden[alias], self.ordenados[alias]
+
+    def seleccionar(self, alias, op, valor):
+        """Posiciones (ordenadas) donde `alias op valor`, por búsqueda binaria"""
+        orden, ordenados = self._metrica(alias)
+        izq = np.searchsorted(ordenados, valor, side='left')
+        der = np.searchsorted(ordenados, valor, side='right')
+        if op == '<':
+            pos = orden[:izq]
+        elif op == '<=':
+            pos = orden[:der]
+        elif op == '>':
+            pos = orden[der:]
+        elif op == '>=':
+            pos = orden[izq:]
+        elif op == '==':
+            pos = orden[izq:der]
+        else:  # '!='
+            pos = np.concatenate([orden[:izq], orden[der:]])
+        return np.sort(pos)
+
+    def _evaluar(self, nodo):
+        tipo = nodo[0]
+        if tipo == 'cmp':
+            return self.seleccionar(*nodo[1:])
+        if tipo == 'not':
+            return np.setdiff1d(self.todas, self._evaluar(nodo[1]), assume_unique=True)
+        a, b = self._evaluar(nodo[1]), self._evaluar(nodo[2])
+        if tipo == 'and':
+            return np.intersect1d(a, b, assume_unique=True)
+        return np.union1d(a, b)
+
+    def filtrar(self, expresion=None):
+        if not expresion or not expresion.strip():
+            return self.todas
+        return self._evaluar(compilar(expresion))
+
+    def top(self, alias, k=5, ascendente=True, expresion=None):
+        """Primeros k por métrica (sin NaN), opcionalmente dentro de un filtro"""
+        orden, _ = self._metrica(alias)
+        if not ascendente:
+            orden = orden[::-1]
+        if expresion:
+            dentro = np.zeros(self.n, dtype=bool)
+            dentro[self.filtrar(expresion)] = True
+            orden = orden[dentro[orden]]
+        return orden[:k]
+
+    def valor(self, alias, pos):
+        return self.valores[alias][pos]
+
+    def tabla(self, posiciones, metricas=None):
+        metricas = metricas or [m for m in ('precio', 'pe', 'roe', 'dy', 'de', 'cr') if m in self.valores]
+        salida = pd.DataFrame({'Ticker': self.tickers[posiciones]})
+        if 'Nombre' in self.df.columns:
+            salida['Nombre'] = self.df['Nombre'].to_numpy()[posiciones]
+        for m in metricas:
+            salida[m] = self.valores[m][posiciones]
+        return salida
+
+
+def tokenizar(expresion):
+    tokens = []
+    pos = 0
+    expresion = expresion.rstrip()
+    while pos < len(expresion):
+        m = _TOKEN.match(expresion, pos)
+        if not m or m.end() == pos:
+            raise ErrorFiltro(f"Carácter inesperado en posición {pos}: '{expresion[pos:pos + 10]}'")
+        tipo = m.lastgroup
+        texto = m.group(tipo)
+        if tipo == 'id' and texto.lower() in ('and', 'or', 'not'):
+            tipo, texto = 'kw', texto.lower()
+        tokens.append((tipo, texto))
+        pos = m.end()
+    return tokens
+
+
+MAX_COMPILADOS = 256  # Filtros distintos en cache (el servidor recibe expresiones arbitrarias)
+
+
+@lru_cache(maxsize=MAX_COMPILADOS)
+def compilar(expresion):
+    """Expresión → árbol ('and'|'or', a, b) / ('not', a) / ('cmp', métrica, op, valor)"""
+    tokens = tokenizar(expresion)
+    i = 0
+
+    def ver():
+        return tokens[i] if i < len(tokens) else (None, None)
+
+    def consumir(tipo=None, texto=None):
+        nonlocal i
+        t = ver()
+        if t[0] is None or (tipo and t[0] != tipo) or (texto and t[1] != texto):
+            esperado = texto or tipo or 'algo'
+            raise ErrorFiltro(f"Se esperaba {esperado} y llegó '{t[1] or 'fin'}'")
+        i += 1
+        return t
+
+    def expr():
+        nodo = termino()
+        while ver() == ('kw', 'or'):
+            consumir()
+            nodo = ('or', nodo, termino())
+        return nodo
+
+    def termino():
+        nodo = factor()
+        while ver() == ('kw', 'and'):
+            consumir()
+            nodo = ('and', nodo, factor())
+        return nodo
+
+    def factor():
+        if ver() == ('kw', 'not'):
+            consumir()
+            return ('not', factor())
+        if ver() == ('par', '('):
+            consumir()
+            nodo = expr()
+            consumir('par', ')')
+            return nodo
+        _, metrica = consumir('id')
+        _, op = consumir('op')
+        _, valor = consumir('num')
+        return ('cmp', metrica.lower(), op, float(valor))
+
+    arbol = expr()
+    if i != len(tokens):
+        raise ErrorFiltro(f"Sobra texto después de '{tokens[i - 1][1]}': '{tokens[i][1]}'")
+    return arbol
+
+
+def guardar_snapshot(df_fund, fecha=None):
+    """Copia fechada del CSV de fundamentales (una por día, la última gana)"""
+    HISTORICO_DIR.mkdir(parents=True, exist_ok=True)
+    fecha = fecha or datetime.now().strftime('%Y-%m-%d')
+    path = HISTORICO_DIR / f"fundamentales_{fecha}.csv"
+    df_fund.to_csv(path, index=False)
+    return path
+
+
+def listar_snapshots():
+    """[(fecha 'YYYY-MM-DD', path)] ordenado por fecha"""
+    return sorted((p.stem.replace('fundamentales_', ''), p)
+                  for p in HISTORICO_DIR.glob("fundamentales_*.csv"))
+
+
+def ruta_snapshot(fecha=None):
+    """Snapshot actual, o el último guardado en o antes de `fecha`"""
+    if fecha is None:
+        return FUND_PATH
+    previos = [p for f, p in listar_snapshots() if f <= fecha]
+    if not previos:
+        raise FileNotFoundError(f"No hay snapshots en {HISTORICO_DIR} anteriores a {fecha}")
+    return previos[-1]
+
+
+def cargar_indice(fecha=None, con_indicadores=False, data_dir=DATA_DIR):
+    """IndiceScreening del snapshot pedido (+ indicadores de precio a esa fecha)"""
+    path = ruta_snapshot(fecha)
+    df_fund = cargar_fundamentales(path)
+    indicadores = None
+    if con_indicadores:
+        indicadores = indicadores_precios(cargar_matriz_precios(data_dir), hasta=fecha)
+    return IndiceScreening(df_fund, indicadores), path
+
+
+def parsear_consulta(linea):
+    """'<filtro> [orden <métrica> [asc|desc]] [top <k>]' → (filtro, métrica, ascendente, k)"""
+    filtro, metrica, ascendente, k = linea, None, True, None
+    m = re.search(r"\btop\s+(\d+)\s*$", filtro)
+    if m:
+        k = int(m.group(1))
+        filtro = filtro[:m.start()]
+    m = re.search(r"\borden\s+([A-Za-z_0-9]+)(?:\s+(asc|desc))?\s*$", filtro)
+    if m:
+        metrica = m.group(1).lower()
+        ascendente = m.group(2) != 'desc'
+        filtro = filtro[:m.start()]
+    return filtro.strip(), metrica, ascendente, k
+
+
+def ejecutar(indice, filtro, metrica=None, ascendente=True, k=None):
+    if metrica:
+        return indice.top(metrica, k or indice.n, ascendente, filtro)
+    posiciones = indice.filtrar(filtro)
+    return posiciones[:k] if k else posiciones
+
+
+def imprimir_resultado(indice, posiciones, metrica=None):
+    metricas = [m for m in ('precio', 'pe', 'roe', 'dy', 'de', 'cr') if m in indice.valores]
+    if metrica and metrica not in metricas:
+        metricas.append(metrica)
+    for m in INDICADORES:
+        if m in indice.valores and m not in metricas:
+            metricas.append(m)
+    if len(posiciones) == 0:
+        print("   (sin resultados)")
+        return
+    print(indice.tabla(posiciones, metricas).to_string(index=False, float_format=lambda x: f"{x:.2f}"))
+    print(f"\n   {len(posiciones)}/{indice.n} tickers")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Screening indexado de fundamentales MERVAL")
+    parser.add_argument('filtro', nargs='?', help="Ej: \"pe < 10 and roe > 15 and dy > 2\"")
+    parser.add_argument('--orden', help="Métrica para ordenar (top-K)")
+    parser.add_argument('--desc', action='store_true', help="Orden descendente")
+    parser.add_argument('--k', type=int, help="Cantidad de resultados")
+    parser.add_argument('--fecha', help="Usar el snapshot histórico a esa fecha (YYYY-MM-DD)")
+    parser.add_argument('--indicadores', action='store_true', help="Agregar ret_1m, ret_1a, vol_1a")
+    parser.add_argument('--snapshots', action='store_true', help="Listar snapshots históricos")
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("screening")
+
+    print("="*80)
+    print("🔎 SCREENING MERVAL (índices ordenados)")
+    print("="*80 + "\n")
+
+    if args.snapshots:
+        snapshots = listar_snapshots()
+        for fecha, path in snapshots:
+            print(f"   📅 {fecha}  {path.name}")
+        print(f"\n📊 {len(snapshots)} snapshots en {HISTORICO_DIR.absolute()}\n")
+        exit(0)
+
+    try:
+        with PERFIL.etapa("indexado"):
+            indice, path = cargar_indice(args.fecha, args.indicadores)
+    except FileNotFoundError as e:
+        print(f"❌ Error: {e}")
+        print(f"Ejecuta primero: python descarga_merval_yahoo_completo.py")
+        exit(1)
+
+    print(f"📁 Snapshot: {path}")
+    print(f"📊 {indice.n} tickers | métricas: {', '.join(indice.orden)}\n")
+
+    if args.filtro is not None or args.orden:
+        try:
+            with PERFIL.etapa("consulta"):
+                posiciones = ejecutar(indice, args.filtro, args.orden, not args.desc, args.k)
+        except ErrorFiltro as e:
+            print(f"❌ Filtro inválido: {e}")
+            exit(1)
+        imprimir_resultado(indice, posiciones, args.orden)
+        print()
+        exit(0)
+
+    # Modo interactivo: el índice se construye una vez y cada consulta es instantánea
+    print("Escribe un filtro (Enter vacío o 'salir' para terminar)")
+    print("Ej: pe < 10 and roe > 15 orden dy desc top 5\n")
+    while True:
+        try:
+            linea = input("🔎 > ").strip()
+        except (EOFError, KeyboardInterrupt):
+            print()
+            break
+        if not linea or linea.lower() in ('salir', 'exit', 'quit'):
+            break
+        try:
+            posiciones = ejecutar(indice, *parsear_consulta(linea))
+        except ErrorFiltro as e:
+            print(f"   ❌ {e}\n")
+            continue
+        imprimir_resultado(indice, posiciones, parsear_consulta(linea)[1])
+        print()
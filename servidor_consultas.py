@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Servicio LOCAL de consultas sobre los datos ya descargados (read-through cache)
+
+Dashboards y notebooks consultan este servicio en lugar de re-leer y
+re-parsear los CSV de MERVAL_Datos_Limpio / MERVAL_Fundamentales:
+  - Rango de precios:  /precios?ticker=GGAL.BA&desde=2024-01-01&hasta=2024-06-30&campos=Close,Volume
+  - Fundamentales:     /fundamentales?ticker=GGAL.BA
+  - Screening:         /screening?filtro=pe<10 and roe>15&orden=dy&desc=1&k=10&fecha=2025-06-01
+  - Estado del cache:  /estado
+
+Formato: JSON (default) o Arrow IPC (&formato=arrow, requiere pyarrow)
+
+Cache:
+  • LRU en memoria acotado por tamaño (--cache-mb)
+  • Cada CSV se parsea UNA sola vez para todos los consumidores
+  • Se invalida solo: si el descargador reescribe un archivo cambia su
+    mtime/tamaño y la próxima consulta lo vuelve a cargar
+
+EJECUTA:
+  python servidor_consultas.py                       # http://127.0.0.1:8765
+  python servidor_consultas.py --puerto 9000 --cache-mb 256
+  python servidor_consultas.py --profile            # Perfil al detener (Ctrl+C)
+"""
+
+import argparse
+import json
+import sys
+import threading
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+import pandas as pd
+
+from esquema_fundamentales import cargar_fundamentales as leer_fundamentales
+from perfilador import perfilador_desde_argv
+from screening import IndiceScreening, ErrorFiltro, ejecutar, ruta_snapshot
+
+try:
+    import pyarrow as pa
+except ImportError:  # Arrow es opcional: sin pyarrow solo se sirve JSON
+    pa = None
+
+DATA_DIR = Path("MERVAL_Datos_Limpio")
+FUND_PATH = Path("MERVAL_Fundamentales/MERVAL_Fundamentales_Completo.csv")
+
+CAMPOS_PRECIOS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+
+class CacheLRU:
+    """
+    Cache LRU thread-safe acotado por bytes.
+
+    Cada entrada guarda la firma (mtime_ns, tamaño) del archivo de origen:
+    si el archivo cambió, la entrada se descarta y se vuelve a cargar.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.bytes_usados = 0
+        self.entradas = OrderedDict()
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.expulsiones = 0
+
+    def obtener(self, clave, firma, cargar):
+        with self.lock:
+            entrada = self.entradas.get(clave)
+            if entrada is not None and entrada[0] == firma:
+                self.entradas.move_to_end(clave)
+                self.hits += 1
+                return entrada[1]
+            self.misses += 1
+
+        # Cargar fuera del lock para no bloquear consultas a otros archivos
+        valor, tamanio = cargar()
+
+        with self.lock:
+            anterior = self.entradas.pop(clave, None)
+            if anterior is not None:
+                self.bytes_usados -= anterior[2]
+            self.entradas[clave] = (firma, valor, tamanio)
+            self.bytes_usados += tamanio
+            while self.bytes_usados > self.max_bytes and len(self.entradas) > 1:
+                _, (_, _, tam_viejo) = self.entradas.popitem(last=False)
+                self.bytes_usados -= tam_viejo
+                self.expulsiones += 1
+        return valor
+
+    def estado(self):
+        with self.lock:
+            return {
+                'entradas': len(self.entradas),
+                'bytes_usados': self.bytes_usados,
+                'max_bytes': self.max_bytes,
+                'hits': self.hits,
+                'misses': self.misses,
+                'expulsiones': self.expulsiones,
+            }
+
+
+def firma_archivo(path):
+    """Firma barata (un stat) que cambia cada vez que el archivo se reescribe"""
+    st = path.stat()
+    return (st.st_mtime_ns, st.st_size)
+
+
+def ruta_precios(ticker):
+    return DATA_DIR / f"{ticker.upper().replace('.BA', '')}_precios_5A.csv"
+
+
+def cargar_precios(path):
+    df = pd.read_csv(path, parse_dates=['fecha'], index_col='fecha')
+    df = df.sort_index()
+    return df, int(df.memory_usage(deep=True).sum())
+
+
+def cargar_fundamentales(path):
+    df = leer_fundamentales(path)
+    df['Ticker'] = df['Ticker'].str.upper()
+    df = df.set_index('Ticker')
+    return df, int(df.memory_usage(deep=True).sum())
+
+
+def cargar_indice_screening(path):
+    df = leer_fundamentales(path)
+    indice = IndiceScreening(df)
+    return indice, int(df.memory_usage(deep=True).sum()) * 2  # Frame + arrays del índice
+
+
+def a_json(obj):
+    return json.dumps(obj, ensure_ascii=False, allow_nan=False).encode('utf-8')
+
+
+def limpiar_valor(x):
+    """NaN → None para que el JSON sea estándar"""
+    if isinstance(x, float) and x != x:
+        return None
+    if hasattr(x, 'item'):
+        return limpiar_valor(x.item())
+    return x
+
+
+class ErrorConsulta(Exception):
+    def __init__(self, status, mensaje):
+        super().__init__(mensaje)
+        self.status = status
+
+
+class ServicioConsultas:
+    """Resuelve consultas contra el cache; independiente del transporte HTTP"""
+
+    def __init__(self, cache_mb=128):
+        self.cache = CacheLRU(cache_mb * 1024 * 1024)
+
+    def _frame(self, path, cargador):
+        try:
+            firma = firma_archivo(path)
+        except FileNotFoundError:
+            raise ErrorConsulta(404, f"No existe {path}")
+        # El cargador es parte de la clave: el mismo CSV puede servir como frame o como índice
+        return self.cache.obtener(('frame', str(path), cargador.__name__), firma, lambda: cargador(path)), firma
+
+    def precios(self, ticker, desde=None, hasta=None, campos=None, formato='json'):
+        path = ruta_precios(ticker)
+        df, firma = self._frame(path, cargar_precios)
+
+        campos = campos or [c for c in CAMPOS_PRECIOS if c in df.columns]
+        faltantes = [c for c in campos if c not in df.columns]
+        if faltantes:
+            raise ErrorConsulta(400, f"Campos desconocidos: {', '.join(faltantes)}")
+
+        # Respuesta serializada cacheada: las lecturas repetidas son un stat + lookup
+        clave = ('precios', str(path), desde, hasta, tuple(campos), formato)
+
+        def serializar():
+            try:
+                rango = df.loc[desde:hasta, campos]  # índice ordenado → búsqueda binaria
+            except (TypeError, ValueError) as e:
+                raise ErrorConsulta(400, f"Rango de fechas inválido: {e}")
+            if formato == 'arrow':
+                cuerpo = serializar_arrow(rango)
+            else:
+                cuerpo = a_json({
+                    'ticker': ticker.upper(),
+                    'campos': campos,
+                    'fechas': rango.index.strftime('%Y-%m-%d').tolist(),
+                    'datos': {c: [limpiar_valor(v) for v in rango[c].tolist()] for c in campos},
+                })
+            return cuerpo, len(cuerpo)
+
+        return self.cache.obtener(clave, firma, serializar)
+
+    def fundamentales(self, ticker, formato='json'):
+        df, firma = self._frame(FUND_PATH, cargar_fundamentales)
+        ticker = ticker.upper()
+        if ticker not in df.index and f"{ticker}.BA" in df.index:
+            ticker = f"{ticker}.BA"
+        if ticker not in df.index:
+            raise ErrorConsulta(404, f"Sin fundamentales para {ticker}")
+
+        clave = ('fundamentales', ticker, formato)
+
+        def serializar():
+            fila = df.loc[[ticker]]
+            if formato == 'arrow':
+                cuerpo = serializar_arrow(fila)
+            else:
+                cuerpo = a_json({'ticker': ticker,
+                                 'datos': {k: limpiar_valor(v) for k, v in fila.iloc[0].items()}})
+            return cuerpo, len(cuerpo)
+
+        return self.cache.obtener(clave, firma, serializar)
+
+    def screening(self, filtro=None, orden=None, desc=False, k=None, fecha=None):
+        try:
+            path = ruta_snapshot(fecha)
+        except FileNotFoundError as e:
+            raise ErrorConsulta(404, str(e))
+        indice, _ = self._frame(path, cargar_indice_screening)  # Índice ordenado cacheado
+        try:
+            posiciones = ejecutar(indice, filtro, orden and orden.lower(), not desc, k)
+        except ErrorFiltro as e:
+            raise ErrorConsulta(400, f"Filtro inválido: {e}")
+        tabla = indice.tabla(posiciones, list(indice.valores))
+        return a_json({
+            'snapshot': path.name,
+            'total': int(indice.n),
+            'resultados': [{c: limpiar_valor(v) for c, v in fila.items()}
+                           for fila in tabla.to_dict(orient='records')],
+        })
+
+
+def serializar_arrow(df):
+    if pa is None:
+        raise ErrorConsulta(406, "Formato arrow no disponible: pip install pyarrow")
+    tabla = pa.Table.from_pandas(df.reset_index(), preserve_index=False)
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, tabla.schema) as writer:
+        writer.write_table(tabla)
+    return sink.getvalue().to_pybytes()
+
+
+def crear_handler(servicio, verbose=False):
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            url = urlparse(self.path)
+            params = {k: v[-1] for k, v in parse_qs(url.query).items()}
+            formato = params.get('formato', 'json').lower()
+            try:
+                if formato not in ('json', 'arrow'):
+                    raise ErrorConsulta(400, f"Formato desconocido: {formato}")
+                if url.path == '/precios':
+                    cuerpo = servicio.precios(
+                        self._requerido(params, 'ticker'),
+                        desde=params.get('desde'),
+                        hasta=params.get('hasta'),
+                        campos=[c for c in params['campos'].split(',') if c] if params.get('campos') else None,
+                        formato=formato,
+                    )
+                elif url.path == '/fundamentales':
+                    cuerpo = servicio.fundamentales(self._requerido(params, 'ticker'), formato=formato)
+                elif url.path == '/screening':
+                    k = params.get('k')
+                    if k is not None and not k.isdigit():
+                        raise ErrorConsulta(400, f"k inválido: {k}")
+                    cuerpo, formato = servicio.screening(
+                        filtro=params.get('filtro'),
+                        orden=params.get('orden'),
+                        desc=params.get('desc', '0').lower() in ('1', 'true', 'si'),
+                        k=int(k) if k else None,
+                        fecha=params.get('fecha'),
+                    ), 'json'
+                elif url.path == '/estado':
+                    cuerpo, formato = a_json(servicio.cache.estado()), 'json'
+                else:
+                    raise ErrorConsulta(404, f"Ruta desconocida: {url.path}")
+            except ErrorConsulta as e:
+                self._responder(e.status, a_json({'error': str(e)}), 'json')
+                return
+            self._responder(200, cuerpo, formato)
+
+        def _requerido(self, params, nombre):
+            if not params.get(nombre):
+                raise ErrorConsulta(400, f"Falta el parámetro '{nombre}'")
+            return params[nombre]
+
+        def _responder(self, status, cuerpo, formato):
+            self.send_response(status)
+            if formato == 'arrow':
+                self.send_header('Content-Type', 'application/vnd.apache.arrow.stream')
+            else:
+                self.send_header('Content-Type', 'application/json; charset=utf-8')
+            self.send_header('Content-Length', str(len(cuerpo)))
+            self.end_headers()
+            self.wfile.write(cuerpo)
+
+        def log_message(self, format, *args):
+            if verbose:
+                super().log_message(format, *args)
+
+    return Handler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Servicio local de consultas MERVAL")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--puerto', type=int, default=8765)
+    parser.add_argument('--cache-mb', type=int, default=128)
+    parser.add_argument('--verbose', action='store_true')
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("servidor_consultas")
+
+    print("="*80)
+    print("🛰️  SERVICIO DE CONSULTAS MERVAL (cache LRU en memoria)")
+    print("="*80 + "\n")
+    print(f"📁 Datos: {DATA_DIR.absolute()}")
+    print(f"📁 Fundamentales: {FUND_PATH.absolute()}")
+    print(f"💾 Cache: {args.cache_mb} MB")
+    print(f"📦 Arrow: {'✅ disponible' if pa is not None else '⚠️  no instalado (solo JSON)'}\n")
+
+    with PERFIL.etapa("iniciar_servicio"):
+        servicio = ServicioConsultas(cache_mb=args.cache_mb)
+        server = ThreadingHTTPServer((args.host, args.puerto), crear_handler(servicio, args.verbose))
+    print(f"🌐 Escuchando en http://{args.host}:{args.puerto}")
+    print(f"   Ejemplo: http://{args.host}:{args.puerto}/precios?ticker=GGAL.BA&desde=2024-01-01&campos=Close\n")
+    try:
+        with PERFIL.etapa("servir"):  # Las consultas corren en hilos: cuenta tiempo, no funciones
+            server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n⏹️  Servicio detenido")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,143 @@
+"""
+SESIÓN YAHOO persistente (cookie + crumb) compartida entre corridas e hilos
+
+El handshake cookie → crumb es la parte más lenta y frágil de hablar con
+Yahoo (ver SOLUCION_ERRORES.md, "_get_cookie_and_crumb"). Acá se hace UNA
+vez y se guarda validado en:
+
+  MERVAL_Sesion/sesion_yahoo.json     (o $MERVAL_SESION_YAHOO)
+
+con vencimiento (TTL o la expiración de la cookie, lo que ocurra antes).
+Las corridas siguientes y todos los hilos lo reutilizan; solo se vuelve a
+negociar cuando Yahoo responde 401 (crumb/cookie rechazados). Si otro
+proceso ya lo renovó, se toma el suyo en vez de repetir el handshake.
+
+yfinance negocia su propia sesión (curl_cffi) y guarda la cookie en su
+cache: configurar_cache_yfinance() lo apunta a MERVAL_Sesion/yfinance
+para que persista entre corridas y lo compartan los workers de shards.
+"""
+
+import json
+import os
+from pathlib import Path
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+COOKIE_URL = "https://fc.yahoo.com"
+CRUMB_URL = "https://query1.finance.yahoo.com/v1/test/getcrumb"
+
+SESION_PATH = Path(os.environ.get('MERVAL_SESION_YAHOO', "MERVAL_Sesion/sesion_yahoo.json"))
+TTL_HORAS = 24
+
+MAX_WORKERS = 8
+TIMEOUT = 15
+
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
+    'Accept': 'application/json',
+}
+
+
+class ErrorYahoo(Exception):
+    pass
+
+
+class SesionYahoo:
+    """Sesión requests compartida entre hilos con cookie + crumb de Yahoo (persistidos)"""
+
+    def __init__(self, pool=MAX_WORKERS, path=SESION_PATH, ttl_horas=TTL_HORAS):
+        self.session = requests.Session()
+        self.session.headers.update(HEADERS)
+        retry = Retry(total=3, backoff_factor=1.0, status_forcelist=(429, 500, 502, 503, 504),
+                      allowed_methods=('GET',))
+        adapter = HTTPAdapter(pool_connections=pool, pool_maxsize=pool, max_retries=retry)
+        self.session.mount('https://', adapter)
+        self.crumb = None
+        self.lock = threading.Lock()
+        self.path = path
+        self.ttl = ttl_horas * 3600
+        self.handshakes = 0
+        self.desde_cache = self.cargar()
+
+    # ------------------------------------------------------------------ persistencia
+
+    def cargar(self):
+        """Toma cookie + crumb del cache si no vencieron. Devuelve True si los usó."""
+        if self.path is None or not self.path.exists():
+            return False
+        try:
+            datos = json.loads(self.path.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            return False
+        if not datos.get('crumb') or datos.get('vence', 0) <= time.time():
+            return False
+        self.session.cookies.clear()
+        for c in datos.get('cookies', []):
+            self.session.cookies.set(c['name'], c['value'], domain=c['domain'], path=c['path'],
+                                     expires=c.get('expires'), secure=c.get('secure', False))
+        self.crumb = datos['crumb']
+        return True
+
+    def guardar(self):
+        """Escritura atómica; si falla, la sesión sigue sirviendo en memoria"""
+        if self.path is None:
+            return
+        ahora = time.time()
+        cookies = [{'name': c.name, 'value': c.value, 'domain': c.domain, 'path': c.path,
+                    'expires': c.expires, 'secure': c.secure} for c in self.session.cookies]
+        vence = min([ahora + self.ttl] + [c['expires'] for c in cookies if c['expires']])
+        datos = {'crumb': self.crumb, 'cookies': cookies, 'creado': ahora, 'vence': vence}
+        try:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.path.with_suffix(f'.{os.getpid()}.tmp')
+            tmp.write_text(json.dumps(datos), encoding='utf-8')
+            os.chmod(tmp, 0o600)  # Contiene cookies de sesión
+            os.replace(tmp, self.path)
+        except OSError:
+            pass
+
+    # ------------------------------------------------------------------ handshake
+
+    def renovar_crumb(self, vencido=None):
+        """Handshake cookie → crumb; si otro hilo o proceso ya lo renovó, no se repite"""
+        with self.lock:
+            if self.crumb is not None and self.crumb != vencido:
+                return self.crumb
+            if self.cargar() and self.crumb != vencido:  # Renovado por otro proceso
+                return self.crumb
+            self.session.cookies.clear()
+            try:
+                self.session.get(COOKIE_URL, timeout=TIMEOUT)  # Solo importa la cookie (responde 404)
+            except requests.RequestException:
+                pass
+            response = self.session.get(CRUMB_URL, timeout=TIMEOUT)
+            crumb = response.text.strip()
+            if response.status_code != 200 or not crumb or '<' in crumb:
+                raise ErrorYahoo(f"No se pudo obtener el crumb (HTTP {response.status_code})")
+            self.crumb = crumb
+            self.handshakes += 1
+            self.guardar()
+            return crumb
+
+    def get(self, url, params):
+        crumb = self.crumb or self.renovar_crumb()
+        response = self.session.get(url, params={**params, 'crumb': crumb}, timeout=TIMEOUT)
+        if response.status_code == 401:  # Crumb/cookie rechazados: un reintento con sesión nueva
+            crumb = self.renovar_crumb(vencido=crumb)
+            response = self.session.get(url, params={**params, 'crumb': crumb}, timeout=TIMEOUT)
+        return response
+
+
+def configurar_cache_yfinance(path=SESION_PATH):
+    """Cache de yfinance (cookie + zonas horarias) junto a la sesión persistida"""
+    try:
+        import yfinance as yf
+        directorio = (path.parent / "yfinance").absolute()
+        directorio.mkdir(parents=True, exist_ok=True)
+        yf.set_tz_cache_location(str(directorio))
+    except (ImportError, AttributeError, OSError):
+        pass
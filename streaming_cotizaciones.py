@@ -0,0 +1,357 @@
+#!/usr/bin/env python3
+"""
+STREAMING de cotizaciones en vivo para el universo .BA
+
+Se suscribe al streamer websocket de Yahoo (yf.WebSocket, yfinance 0.2.54+)
+o a una fuente local de reemplazo, y mantiene en memoria, por ticker:
+
+  último precio, OHLC intradía, volumen, cantidad de ticks
+
+en arrays numpy (una posición fija por ticker). Cada tick recalcula SOLO
+lo que depende del precio para ESE ticker: variación vs. cierre previo,
+P/E y dividend yield al precio actual, y el score de compra (la parte
+que no depende del precio se calcula una vez al arrancar).
+
+Publica cada --publicar-cada segundos (solo si hubo cambios):
+  MERVAL_Streaming/cotizaciones.json      → foto completa (escritura atómica)
+  MERVAL_Streaming/cambios.jsonl          → una línea por ticker modificado
+
+Fuentes:
+  --fuente yahoo             websocket de Yahoo (requiere yfinance 0.2.54+)
+  --fuente ticks.jsonl       JSON lines {"id": "GGAL.BA", "price": 1234.5, "time": 1718000000000, "day_volume": 100}
+  --fuente -                 las mismas líneas por stdin
+  --simular 200000           ticks sintéticos (prueba de throughput, sin red)
+
+EJECUTA:
+  python streaming_cotizaciones.py
+  python streaming_cotizaciones.py --fuente ticks.jsonl --publicar-cada 0.5
+  python streaming_cotizaciones.py --simular 200000
+"""
+
+import argparse
+from datetime import datetime
+import json
+import math
+import os
+from pathlib import Path
+import sys
+import time
+import warnings
+
+import numpy as np
+
+from calculo_score import puntaje_pe, puntaje_dividendo, score_sin_precio, rating
+from esquema_fundamentales import FUND_PATH, cargar_fundamentales
+from matriz_precios import cargar_matriz_precios
+from perfilador import perfilador_desde_argv
+from universo_merval import ACCIONES_BA
+
+warnings.filterwarnings('ignore')
+
+STREAMING_DIR = Path("MERVAL_Streaming")
+FOTO_PATH = STREAMING_DIR / "cotizaciones.json"
+CAMBIOS_PATH = STREAMING_DIR / "cambios.jsonl"
+
+PUBLICAR_CADA = 1.0  # Segundos
+
+
+class EstadoCotizaciones:
+    """
+    Estado intradía del universo en arrays numpy de largo fijo.
+
+    Referencias (fijas durante la sesión): cierre previo, precio de los
+    fundamentales, P/E y dividend yield a ese precio, puntos sin precio.
+    """
+
+    def __init__(self, tickers, cierre_previo=None, fundamentales=None):
+        self.tickers = list(tickers)
+        self.indice = {t: i for i, t in enumerate(self.tickers)}
+        n = len(self.tickers)
+
+        self.ultimo = np.full(n, np.nan)
+        self.apertura = np.full(n, np.nan)
+        self.maximo = np.full(n, np.nan)
+        self.minimo = np.full(n, np.nan)
+        self.volumen = np.zeros(n)
+        self.ticks = np.zeros(n, dtype=np.int64)
+        self.hora = np.zeros(n, dtype=np.int64)   # ms epoch del último tick
+        self.dia = np.zeros(n, dtype=np.int64)    # día (epoch // 86400000) de la sesión en curso
+        self.sucio = np.zeros(n, dtype=bool)       # Cambió desde la última publicación
+
+        # Métricas que dependen del precio (se actualizan tick a tick)
+        self.variacion = np.full(n, np.nan)
+        self.pe_vivo = np.full(n, np.nan)
+        self.dy_vivo = np.full(n, np.nan)
+        self.score_vivo = np.full(n, np.nan)
+
+        self.cierre_previo = np.full(n, np.nan)
+        self.precio_ref = np.full(n, np.nan)
+        self.pe_ref = np.full(n, np.nan)
+        self.dy_ref = np.full(n, np.nan)
+        self.base_score = np.full(n, np.nan)
+        self.score_cierre = np.full(n, np.nan)
+
+        if cierre_previo:
+            for t, precio in cierre_previo.items():
+                if t in self.indice:
+                    self.cierre_previo[self.indice[t]] = precio
+        if fundamentales is not None:
+            self._cargar_referencias(fundamentales)
+
+        self.total_ticks = 0
+        self.ignorados = 0
+
+    def _cargar_referencias(self, df_fund):
+        for row in df_fund.to_dict('records'):
+            i = self.indice.get(row['Ticker'])
+            if i is None:
+                continue
+            self.precio_ref[i] = row['Precio']
+            self.pe_ref[i] = row['P/E Ratio (Trailing)']
+            self.dy_ref[i] = row['Dividend Yield']
+            self.base_score[i] = score_sin_precio(row)
+            self.score_cierre[i] = (self.base_score[i] + puntaje_pe(row['P/E Ratio (Trailing)'])[0]
+                                    + puntaje_dividendo(row['Dividend Yield'])[0])
+        # Sin precio de referencia en fundamentales → se usa el cierre previo
+        faltan = np.isnan(self.precio_ref)
+        self.precio_ref[faltan] = self.cierre_previo[faltan]
+
+    def actualizar(self, ticker, precio, hora_ms=None, volumen_dia=None, maximo=None, minimo=None):
+        """Aplica un tick. O(1): solo toca la posición del ticker"""
+        i = self.indice.get(ticker)
+        if i is None or precio is None or not precio > 0:
+            self.ignorados += 1
+            return False
+        hora_ms = int(hora_ms) if hora_ms else int(time.time() * 1000)
+        dia = hora_ms // 86400000
+
+        if dia != self.dia[i]:  # Primer tick de la sesión: reinicia OHLC
+            self.dia[i] = dia
+            self.apertura[i] = self.maximo[i] = self.minimo[i] = precio
+            self.volumen[i] = 0.0
+            self.ticks[i] = 0
+        elif hora_ms < self.hora[i]:  # Tick atrasado: no pisa el último precio
+            self.ignorados += 1
+            return False
+
+        self.ultimo[i] = precio
+        if precio > self.maximo[i]:
+            self.maximo[i] = precio
+        if precio < self.minimo[i]:
+            self.minimo[i] = precio
+        if maximo is not None and maximo > self.maximo[i]:
+            self.maximo[i] = maximo
+        if minimo is not None and 0 < minimo < self.minimo[i]:
+            self.minimo[i] = minimo
+        if volumen_dia is not None:
+            self.volumen[i] = volumen_dia
+        self.ticks[i] += 1
+        self.hora[i] = hora_ms
+        self.total_ticks += 1
+
+        # Métricas dependientes del precio: solo para este ticker
+        self.variacion[i] = precio / self.cierre_previo[i] - 1.0
+        escala = self.precio_ref[i] / precio
+        self.pe_vivo[i] = self.pe_ref[i] / escala
+        self.dy_vivo[i] = self.dy_ref[i] * escala
+        if self.base_score[i] == self.base_score[i]:
+            self.score_vivo[i] = (self.base_score[i] + puntaje_pe(float(self.pe_vivo[i]))[0]
+                                  + puntaje_dividendo(float(self.dy_vivo[i]))[0])
+        self.sucio[i] = True
+        return True
+
+    def filas(self, posiciones):
+        """Dicts JSON-serializables para las posiciones dadas"""
+        salida = []
+        for i in posiciones:
+            score = self.score_vivo[i]
+            salida.append({
+                'ticker': self.tickers[i],
+                'ultimo': _limpio(self.ultimo[i]),
+                'apertura': _limpio(self.apertura[i]),
+                'maximo': _limpio(self.maximo[i]),
+                'minimo': _limpio(self.minimo[i]),
+                'volumen': _limpio(self.volumen[i]),
+                'variacion': _limpio(self.variacion[i]),
+                'pe': _limpio(self.pe_vivo[i]),
+                'dividend_yield': _limpio(self.dy_vivo[i]),
+                'score': _limpio(score),
+                'score_cierre': _limpio(self.score_cierre[i]),
+                'rating': rating(score) if score == score else None,
+                'ticks': int(self.ticks[i]),
+                'hora': datetime.fromtimestamp(self.hora[i] / 1000).isoformat(timespec='seconds'),
+            })
+        return salida
+
+    def tomar_cambios(self):
+        """Posiciones modificadas desde la última llamada (y limpia las marcas)"""
+        posiciones = np.flatnonzero(self.sucio)
+        self.sucio[posiciones] = False
+        return posiciones
+
+
+def _limpio(x):
+    x = float(x)
+    return None if math.isnan(x) else round(x, 6)
+
+
+class Publicador:
+    """Escribe la foto completa + los cambios cada `intervalo` segundos"""
+
+    def __init__(self, estado, intervalo=PUBLICAR_CADA, salida=STREAMING_DIR):
+        self.estado = estado
+        self.intervalo = intervalo
+        self.foto_path = salida / FOTO_PATH.name
+        self.cambios_path = salida / CAMBIOS_PATH.name
+        salida.mkdir(exist_ok=True)
+        self.proxima = time.monotonic() + intervalo
+        self.publicaciones = 0
+
+    def quizas_publicar(self):
+        """Llamado en cada tick: barato si todavía no toca publicar"""
+        if time.monotonic() >= self.proxima:
+            self.publicar()
+
+    def publicar(self):
+        self.proxima = time.monotonic() + self.intervalo
+        cambios = self.estado.tomar_cambios()
+        if len(cambios) == 0:
+            return 0
+        filas = self.estado.filas(cambios)
+        with open(self.cambios_path, 'a', encoding='utf-8') as f:
+            for fila in filas:
+                f.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+        con_datos = np.flatnonzero(self.estado.ticks > 0)
+        foto = {
+            'actualizado': datetime.now().isoformat(timespec='seconds'),
+            'ticks': int(self.estado.total_ticks),
+            'cotizaciones': self.estado.filas(con_datos),
+        }
+        tmp = self.foto_path.with_suffix('.json.tmp')
+        tmp.write_text(json.dumps(foto, ensure_ascii=False), encoding='utf-8')
+        os.replace(tmp, self.foto_path)  # Los lectores nunca ven un archivo a medio escribir
+        self.publicaciones += 1
+        return len(cambios)
+
+
+def cierres_previos():
+    """Último cierre guardado de cada ticker (MERVAL_Datos_Limpio)"""
+    matriz = cargar_matriz_precios()
+    if matriz.empty:
+        return {}
+    ultimos = matriz.ffill().iloc[-1]
+    return {f"{t}.BA": float(p) for t, p in ultimos.items() if p == p}
+
+
+def _numero(x):
+    try:
+        return float(x) if x is not None and x != '' else None
+    except (TypeError, ValueError):
+        return None
+
+
+def procesar_mensaje(estado, msg):
+    """Mensaje del streamer (dict) → tick"""
+    return estado.actualizar(
+        msg.get('id'),
+        _numero(msg.get('price')),
+        hora_ms=_numero(msg.get('time')),
+        volumen_dia=_numero(msg.get('day_volume')),
+        maximo=_numero(msg.get('day_high')),
+        minimo=_numero(msg.get('day_low')),
+    )
+
+
+def escuchar_yahoo(estado, publicador):
+    try:
+        import yfinance as yf
+        WebSocket = yf.WebSocket
+    except (ImportError, AttributeError):
+        raise RuntimeError("yf.WebSocket no disponible: pip install 'yfinance>=0.2.54' --upgrade")
+
+    def handler(msg):
+        procesar_mensaje(estado, msg)
+        publicador.quizas_publicar()
+
+    with WebSocket(verbose=False) as ws:
+        ws.subscribe(estado.tickers)
+        ws.listen(handler)
+
+
+def escuchar_lineas(estado, publicador, lineas):
+    for linea in lineas:
+        linea = linea.strip()
+        if not linea:
+            continue
+        try:
+            msg = json.loads(linea)
+        except json.JSONDecodeError:
+            estado.ignorados += 1
+            continue
+        procesar_mensaje(estado, msg)
+        publicador.quizas_publicar()
+
+
+def ticks_simulados(estado, cantidad, semilla=42):
+    """Paseo aleatorio desde el cierre previo (o 100) para medir throughput"""
+    rng = np.random.default_rng(semilla)
+    base = np.where(np.isnan(estado.cierre_previo), 100.0, estado.cierre_previo)
+    quien = rng.integers(0, len(estado.tickers), size=cantidad)
+    pasos = rng.normal(0, 0.001, size=cantidad)
+    ahora = int(time.time() * 1000)
+    for k in range(cantidad):
+        i = quien[k]
+        base[i] *= 1.0 + pasos[k]
+        yield {'id': estado.tickers[i], 'price': base[i], 'time': ahora + k}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cotizaciones en vivo con métricas incrementales")
+    parser.add_argument('--fuente', default='yahoo', help="yahoo | archivo .jsonl | - (stdin)")
+    parser.add_argument('--simular', type=int, help="Cantidad de ticks sintéticos (sin red)")
+    parser.add_argument('--publicar-cada', type=float, default=PUBLICAR_CADA, help="Segundos")
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("streaming_cotizaciones")
+
+    print("="*80)
+    print("📡 STREAMING DE COTIZACIONES - UNIVERSO .BA")
+    print("="*80 + "\n")
+
+    with PERFIL.etapa("referencias"):
+        fundamentales = cargar_fundamentales() if FUND_PATH.exists() else None
+        estado = EstadoCotizaciones(ACCIONES_BA, cierres_previos(), fundamentales)
+    print(f"📋 {len(estado.tickers)} tickers | cierres previos: {int((~np.isnan(estado.cierre_previo)).sum())}"
+          f" | con fundamentales: {int((~np.isnan(estado.base_score)).sum())}")
+    publicador = Publicador(estado, args.publicar_cada)
+    print(f"📄 Publicando en {STREAMING_DIR.absolute()} cada {args.publicar_cada}s\n")
+
+    t0 = time.perf_counter()
+    try:
+        with PERFIL.etapa("stream"):
+            if args.simular:
+                print(f"🎲 Simulando {args.simular} ticks...\n")
+                for msg in ticks_simulados(estado, args.simular):
+                    procesar_mensaje(estado, msg)
+                    publicador.quizas_publicar()
+            elif args.fuente == 'yahoo':
+                print("🌐 Conectando al streamer de Yahoo (Ctrl+C para terminar)...\n")
+                escuchar_yahoo(estado, publicador)
+            elif args.fuente == '-':
+                escuchar_lineas(estado, publicador, sys.stdin)
+            else:
+                with open(args.fuente, encoding='utf-8') as f:
+                    escuchar_lineas(estado, publicador, f)
+    except KeyboardInterrupt:
+        print("\n⏹️  Streaming detenido")
+    except RuntimeError as e:
+        print(f"❌ Error: {e}")
+        exit(1)
+    finally:
+        publicador.publicar()
+
+    segundos = time.perf_counter() - t0
+    print(f"📊 {estado.total_ticks} ticks en {segundos:.2f}s "
+          f"({estado.total_ticks / max(segundos, 1e-9):,.0f} ticks/s) | ignorados: {estado.ignorados}")
+    print(f"📄 Publicaciones: {publicador.publicaciones} → {publicador.foto_path}\n")
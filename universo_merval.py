@@ -0,0 +1,95 @@
+"""
+UNIVERSO de acciones .BA (fuente única para descargadores y herramientas)
+
+LISTA COMPLETA: 64 acciones .BA
+  • 19 del MERVAL principal
+  • 45 adicionales de IOL/BCBA
+"""
+
+ACCIONES_BA = {
+    # MERVAL PRINCIPAL (19)
+    "GGAL.BA": "Grupo Financiero Galicia",
+    "BMA.BA": "Banco Macro",
+    "BBAR.BA": "Banco BBVA Argentina",
+    "VALO.BA": "Banco de Valores",
+    "YPFD.BA": "YPF",
+    "PAMP.BA": "Pampa Energía",
+    "EDN.BA": "Edenor",
+    "TGNO4.BA": "Transportadora Gas del Norte",
+    "TGSU2.BA": "Transportadora Gas del Sur",
+    "CEPU.BA": "Central Puerto",
+    "TRAN.BA": "Transener",
+    "METR.BA": "Metrogas",
+    "TECO2.BA": "Telecom Argentina",
+    "ALUA.BA": "Aluar",
+    "TXAR.BA": "Ternium Argentina",
+    "LOMA.BA": "Loma Negra",
+    "CELU.BA": "Celulosa Argentina",
+    "BYMA.BA": "Bolsas y Mercados Argentinos",
+    "COME.BA": "Sociedad Comercial del Plata",
+    
+    # ADICIONALES IOL/BCBA (45)
+    "A3.BA": "Matba Rofex S.A.",
+    "AGRO.BA": "Agrometal",
+    "AUSO.BA": "Autopistas del Sol",
+    "BHIP.BA": "Banco Hipotecario",
+    "BOLT.BA": "Boldt",
+    "BPAT.BA": "Banco Patagonia",
+    "CADO.BA": "Carlos Casado",
+    "CAPX.BA": "Capex",
+    "CARC.BA": "Carboclor S.A.",
+    "CECO2.BA": "Endesa Costanera",
+    "CGPA2.BA": "Camuzzi Gas Pampeana",
+    "CTIO.BA": "Consultatio",
+    "CVH.BA": "Cablevisión Holding",
+    "DGCU2.BA": "Distribuidora de Gas Cuyana",
+    "DOME.BA": "Suscripción Preferente",
+    "FERR.BA": "Ferrum",
+    "FIPL.BA": "Fiplasto",
+    "GAMI.BA": "B-Gaming S.A.",
+    "GARO.BA": "Garovaglio y Zorraquin",
+    "GBAN.BA": "Gas Natural BAN",
+    "GCDI.BA": "Gcdi S.A.",
+    "GCLA.BA": "Grupo Clarín",
+    "GRIM.BA": "Grimoldi",
+    "HARG.BA": "Holcim Argentina",
+    "HAVA.BA": "Havanna Holding",
+    "IEB.BA": "Dycasa",
+    "INTR.BA": "Compania Introductora",
+    "INVJ.BA": "Inversora Juramento",
+    "IRSA.BA": "Irsa",
+    "LEDE.BA": "Ledesma",
+    "LONG.BA": "Longvie",
+    "MERA.BA": "MERANOL S.A.C.I.",
+    "MIRG.BA": "Mirgor",
+    "MOLA.BA": "Molinos Agro S.A.",
+    "MOLI.BA": "Molinos Río De La Plata",
+    "MORI.BA": "Morixe Hermanos",
+    "OEST.BA": "Grupo Concesionario Oeste",
+    "PATA.BA": "Imp. y Exportadora de la Patagonia",
+    "PGR.BA": "Phoenix Global Resources",
+    "POLL.BA": "Polledo",
+    "RICH.BA": "Laboratorios Richmond",
+    "RIGO.BA": "Rigolleau",
+    "ROSE.BA": "Instituto Rosenbusch",
+    "SAMI.BA": "San Miguel",
+    "SEMI.BA": "Molinos Juan Semino",
+}
+
+# Panel líder: las 19 primeras (constituyentes por defecto de indice_merval.py)
+MERVAL_PRINCIPAL = list(ACCIONES_BA)[:19]
+
+# Investing.com: ticker → URL del instrumento (el slug lo identifica).
+# Fuente única para descarga_merval_investing.py y descarga_merval_selenium.py
+ACCIONES_INVESTING = {
+    "GGAL": "https://es.investing.com/equities/grupo-financiero-galicia-sa-adr",
+    "YPFD": "https://es.investing.com/equities/ypf-sociedad",
+    "BMA": "https://es.investing.com/equities/banco-macro-sa",
+    "LOMA": "https://es.investing.com/equities/loma-negra-compania-industrial",
+    "CEPU": "https://es.investing.com/equities/central-puerto-sa",
+    "EDN": "https://es.investing.com/equities/edenor-sa",
+    "SUPV": "https://es.investing.com/equities/grupo-supervielle-sa",
+    "PAMP": "https://es.investing.com/equities/pampa-energia-sa",
+    "ALUA": "https://es.investing.com/equities/aluar-aluminio-argentino-saic",
+    "BBAR": "https://es.investing.com/equities/bbva-argentina-sa",
+}
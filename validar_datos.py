@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""
+VALIDADOR DE CALIDAD de los datos OHLCV descargados (todo el universo .BA)
+
+Revisa TODAS las acciones en una sola pasada vectorizada:
+  - High < Low
+  - OHLC inconsistente (High bajo Open/Close, Low sobre Open/Close)
+  - Precios <= 0
+  - Volumen cero en día operado
+  - Saltos de precio sospechosos (splits no ajustados, ej. 10x)
+  - Fechas duplicadas
+  - Huecos de calendario (demasiados días hábiles sin datos)
+
+Genera:
+  MERVAL_Calidad/reporte_calidad.csv   → resumen por ticker
+  MERVAL_Calidad/fechas_marcadas.csv   → cada fecha marcada y sus problemas
+
+Con --cuarentena mueve las filas con errores GRAVES a
+MERVAL_Calidad/cuarentena/ y reescribe el CSV limpio.
+
+EJECUTA:
+  python validar_datos.py
+  python validar_datos.py --cuarentena
+"""
+
+import argparse
+import os
+from pathlib import Path
+import warnings
+
+import numpy as np
+import pandas as pd
+
+from perfilador import perfilador_desde_argv
+
+warnings.filterwarnings('ignore')
+
+DATA_DIR = Path("MERVAL_Datos_Limpio")
+CALIDAD_DIR = Path("MERVAL_Calidad")
+
+COLUMNAS = ['Open', 'High', 'Low', 'Close', 'Adj Close', 'Volume']
+
+SALTO_MAX = 3.0        # Cierre/cierre previo > 3x (o < 1/3) → posible split sin ajustar
+HUECO_MAX_DIAS = 5     # Más de 5 días hábiles entre filas → hueco de calendario
+TOLERANCIA = 1e-6      # Tolerancia relativa para comparar OHLC
+
+# Problemas que invalidan la fila (se pueden poner en cuarentena).
+# Saltos, huecos y volumen cero son advertencias: la fila puede ser real.
+CHEQUEOS_GRAVES = ['high_menor_low', 'ohlc_inconsistente', 'precio_no_positivo', 'fecha_duplicada']
+CHEQUEOS = CHEQUEOS_GRAVES + ['volumen_cero', 'salto_precio', 'hueco_calendario']
+
+
+def cargar_universo(data_dir=DATA_DIR):
+    """Lee todos los *_precios_5A.csv en {ticker: DataFrame}"""
+    frames = {}
+    for path in sorted(data_dir.glob("*_precios_5A.csv")):
+        ticker = path.name.replace('_precios_5A.csv', '')
+        frames[ticker] = pd.read_csv(path)
+    return frames
+
+
+def concatenar_universo(frames):
+    """Une todos los tickers en un único frame largo ordenado por (ticker, fecha)"""
+    partes = []
+    for ticker, df in frames.items():
+        parte = df[['fecha'] + COLUMNAS].copy()
+        parte.insert(0, 'ticker', ticker)
+        partes.append(parte)
+    universo = pd.concat(partes, ignore_index=True)
+    universo['fecha'] = pd.to_datetime(universo['fecha'], format='%Y-%m-%d')
+    return universo.sort_values(['ticker', 'fecha'], kind='stable', ignore_index=True)
+
+
+def validar_universo(universo, salto_max=SALTO_MAX, hueco_max=HUECO_MAX_DIAS):
+    """
+    Devuelve un DataFrame booleano (una columna por chequeo) alineado con `universo`.
+    Todo es aritmética de arrays: no hay loops por ticker ni por fila.
+    """
+    tickers = universo['ticker'].to_numpy()
+    # True donde la fila anterior es del mismo ticker (comparaciones contra el día previo)
+    mismo = np.r_[False, tickers[1:] == tickers[:-1]]
+
+    o = universo['Open'].to_numpy(dtype=float)
+    h = universo['High'].to_numpy(dtype=float)
+    l = universo['Low'].to_numpy(dtype=float)
+    c = universo['Close'].to_numpy(dtype=float)
+    v = universo['Volume'].to_numpy(dtype=float)
+
+    cuerpo_max = np.maximum(o, c)
+    cuerpo_min = np.minimum(o, c)
+
+    c_prev = np.r_[np.nan, c[:-1]]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        ratio = c / c_prev
+
+    fechas = universo['fecha'].to_numpy().astype('datetime64[D]')
+    fechas_prev = np.r_[fechas[:1], fechas[:-1]]
+    dias_habiles = np.busday_count(fechas_prev, fechas)
+
+    flags = {
+        'high_menor_low': h < l,
+        'ohlc_inconsistente': (h < cuerpo_max * (1 - TOLERANCIA)) | (l > cuerpo_min * (1 + TOLERANCIA)),
+        'precio_no_positivo': (o <= 0) | (h <= 0) | (l <= 0) | (c <= 0),
+        'fecha_duplicada': mismo & (fechas == fechas_prev),
+        'volumen_cero': v == 0,
+        'salto_precio': mismo & ((ratio > salto_max) | (ratio < 1 / salto_max)),
+        'hueco_calendario': mismo & (dias_habiles > hueco_max),
+    }
+    return pd.DataFrame(flags, index=universo.index)[CHEQUEOS]
+
+
+def armar_reporte(universo, flags):
+    """Resumen por ticker + detalle de fechas marcadas"""
+    marcada = flags.any(axis=1)
+    grave = flags[CHEQUEOS_GRAVES].any(axis=1)
+
+    por_ticker = flags.groupby(universo['ticker']).sum()
+    por_ticker.insert(0, 'filas', universo.groupby('ticker').size())
+    por_ticker['filas_marcadas'] = marcada.groupby(universo['ticker']).sum()
+    por_ticker['filas_graves'] = grave.groupby(universo['ticker']).sum()
+    por_ticker['inicio'] = universo.groupby('ticker')['fecha'].min().dt.strftime('%Y-%m-%d')
+    por_ticker['fin'] = universo.groupby('ticker')['fecha'].max().dt.strftime('%Y-%m-%d')
+    reporte = por_ticker.reset_index()
+
+    detalle = universo.loc[marcada, ['ticker', 'fecha']].copy()
+    detalle['fecha'] = detalle['fecha'].dt.strftime('%Y-%m-%d')
+    sub = flags.loc[marcada]
+    # Nombres de los chequeos activos por fila, sin loops por fila
+    nombres = np.array(CHEQUEOS, dtype=object)
+    detalle['problemas'] = [';'.join(nombres[fila]) for fila in sub.to_numpy()]
+    detalle['grave'] = grave.loc[marcada].to_numpy()
+    return reporte, detalle
+
+
+def _escribir_csv_atomico(df, path):
+    """tmp + os.replace: un corte a mitad de escritura no deja el CSV truncado"""
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    try:
+        df.to_csv(tmp, index=False, float_format='%.8f')
+        os.replace(tmp, path)
+    finally:
+        tmp.unlink(missing_ok=True)
+
+
+def poner_en_cuarentena(universo, flags, data_dir=DATA_DIR, salida=CALIDAD_DIR):
+    """Saca las filas graves del CSV limpio y las guarda aparte. Devuelve filas movidas.
+
+    Una fecha que ya estaba en cuarentena (re-corrida sobre la misma descarga) no se duplica.
+    """
+    grave = flags[CHEQUEOS_GRAVES].any(axis=1)
+    if not grave.any():
+        return 0
+
+    dir_cuarentena = salida / "cuarentena"
+    dir_cuarentena.mkdir(parents=True, exist_ok=True)
+
+    for ticker in universo.loc[grave, 'ticker'].unique():
+        del_ticker = universo['ticker'] == ticker
+        malas = universo[del_ticker & grave].drop(columns='ticker')
+        buenas = universo[del_ticker & ~grave].drop(columns='ticker')
+        malas['fecha'] = malas['fecha'].dt.strftime('%Y-%m-%d')
+        buenas['fecha'] = buenas['fecha'].dt.strftime('%Y-%m-%d')
+
+        path_cuarentena = dir_cuarentena / f"{ticker}_cuarentena.csv"
+        if path_cuarentena.exists():
+            previas = pd.read_csv(path_cuarentena)
+            malas = pd.concat([previas, malas], ignore_index=True)
+            malas = malas.drop_duplicates('fecha', keep='last').sort_values('fecha')
+        # Primero la cuarentena: si se corta antes de reescribir el CSV, ninguna fila se pierde
+        _escribir_csv_atomico(malas, path_cuarentena)
+        _escribir_csv_atomico(buenas, data_dir / f"{ticker}_precios_5A.csv")
+
+    return int(grave.sum())
+
+
+def validar_y_reportar(frames, salida=CALIDAD_DIR, cuarentena=False, data_dir=DATA_DIR):
+    """Punto de entrada para los descargadores: valida frames en memoria y escribe el reporte"""
+    if not frames:
+        return None, 0
+    universo = concatenar_universo(frames)
+    flags = validar_universo(universo)
+    reporte, detalle = armar_reporte(universo, flags)
+
+    salida.mkdir(exist_ok=True)
+    reporte.to_csv(salida / "reporte_calidad.csv", index=False)
+    detalle.to_csv(salida / "fechas_marcadas.csv", index=False)
+
+    movidas = poner_en_cuarentena(universo, flags, data_dir, salida) if cuarentena else 0
+    return reporte, movidas
+
+
+def imprimir_resumen(reporte, movidas=0, salida=CALIDAD_DIR):
+    """Resumen por consola; salida = la misma carpeta que recibió validar_y_reportar"""
+    con_problemas = reporte[reporte['filas_marcadas'] > 0]
+    print(f"🔎 Calidad: {len(reporte)} tickers, {int(reporte['filas'].sum())} filas revisadas")
+    if len(con_problemas) == 0:
+        print("   ✅ Sin problemas detectados")
+    for _, row in con_problemas.iterrows():
+        activos = [f"{c}={int(row[c])}" for c in CHEQUEOS if row[c] > 0]
+        icono = "❌" if row['filas_graves'] > 0 else "⚠️ "
+        print(f"   {icono} {row['ticker']:8} | {int(row['filas_marcadas']):4d} filas | " + " ".join(activos))
+    if movidas:
+        print(f"   🚧 {movidas} filas graves movidas a {salida / 'cuarentena'}")
+    print(f"   📄 Reporte: {salida / 'reporte_calidad.csv'} (detalle: {salida / 'fechas_marcadas.csv'})")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validador de calidad OHLCV")
+    parser.add_argument('--cuarentena', action='store_true',
+                        help="Mover filas con errores graves a MERVAL_Calidad/cuarentena")
+    parser.add_argument('--profile', action='store_true', help="Perfil por etapa en MERVAL_Perfil/")
+    args = parser.parse_args()
+    PERFIL = perfilador_desde_argv("validar_datos")
+
+    print("="*80)
+    print("🔎 VALIDACIÓN DE CALIDAD - DATOS OHLCV")
+    print("="*80 + "\n")
+
+    with PERFIL.etapa("lectura_csv"):
+        frames = cargar_universo()
+    if not frames:
+        print(f"❌ Error: No hay CSVs en {DATA_DIR}")
+        print(f"Ejecuta primero: python descarga_merval_yahoo_completo.py")
+        exit(1)
+
+    with PERFIL.etapa("validacion"):
+        reporte, movidas = validar_y_reportar(frames, salida=CALIDAD_DIR, cuarentena=args.cuarentena)
+    imprimir_resumen(reporte, movidas, salida=CALIDAD_DIR)
+    print()